@@ -0,0 +1,97 @@
+"""
+Per-turn usage metrics for strands agents.
+
+TurnMetrics is a hook provider: register it on an Agent and it records, for
+every invocation, the input/output tokens spent, the number of model calls,
+wall time, prompt-cache reads/writes (when the model caches), tool calls that
+timed out or were cancelled by the turn budget, and an estimate of the
+conversation size the next turn will send.
+"""
+import time
+
+from strands.hooks import (
+    HookProvider, HookRegistry, BeforeInvocationEvent, AfterInvocationEvent, AfterModelCallEvent, AfterToolCallEvent,
+)
+
+from conversation_memory import estimate_tokens
+from deadlines import timeout_reason
+
+
+class TurnMetrics(HookProvider):
+    """
+    Record token usage per agent turn.
+
+    Attributes:
+        turns: One dict per completed turn, oldest first
+    """
+
+    def __init__(self, max_turns=500):
+        self.max_turns = max_turns
+        self.turns = []
+        self.turn_count = 0  # turns ever recorded; self.turns only keeps the last max_turns
+        self._usage_before = {}
+        self._model_calls = 0
+        self._timeouts = 0
+        self._cancelled = 0
+        self._started = 0.0
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._on_start)
+        registry.add_callback(AfterModelCallEvent, self._on_model_call)
+        registry.add_callback(AfterToolCallEvent, self._on_tool_call)
+        registry.add_callback(AfterInvocationEvent, self._on_end)
+
+    def _on_start(self, event: BeforeInvocationEvent) -> None:
+        self._usage_before = dict(event.agent.event_loop_metrics.accumulated_usage)
+        self._model_calls = 0
+        self._timeouts = 0
+        self._cancelled = 0
+        self._started = time.perf_counter()
+
+    def _on_model_call(self, event: AfterModelCallEvent) -> None:
+        self._model_calls += 1
+
+    def _on_tool_call(self, event: AfterToolCallEvent) -> None:
+        reason = timeout_reason(event.result)
+        if reason == "tool_timeout":
+            self._timeouts += 1
+        elif reason == "turn_budget_exhausted":
+            self._cancelled += 1
+
+    def _on_end(self, event: AfterInvocationEvent) -> None:
+        usage = event.agent.event_loop_metrics.accumulated_usage
+        delta = {name: usage.get(name, 0) - self._usage_before.get(name, 0) for name in usage}
+        self.turn_count += 1
+        self.turns.append({
+            "turn": self.turn_count,
+            "input_tokens": delta.get("inputTokens", 0),
+            "output_tokens": delta.get("outputTokens", 0),
+            "cache_read_tokens": delta.get("cacheReadInputTokens", 0),
+            "cache_write_tokens": delta.get("cacheWriteInputTokens", 0),
+            "model_calls": self._model_calls,
+            "tool_timeouts": self._timeouts,
+            "tool_cancellations": self._cancelled,
+            "context_tokens": estimate_tokens(event.agent.messages),
+            "messages": len(event.agent.messages),
+            "elapsed_s": round(time.perf_counter() - self._started, 3),
+        })
+        del self.turns[:-self.max_turns]
+
+    @property
+    def last(self):
+        return self.turns[-1] if self.turns else None
+
+    def format_last(self):
+        """One-line summary of the latest turn for printing after a response."""
+        turn = self.last
+        if turn is None:
+            return "[tokens] no turns recorded yet"
+        line = (
+            f"[tokens] turn {turn['turn']}: input={turn['input_tokens']} output={turn['output_tokens']} "
+            f"model_calls={turn['model_calls']} context~{turn['context_tokens']} ({turn['messages']} messages)"
+        )
+        if turn["cache_read_tokens"] or turn["cache_write_tokens"]:
+            line += f" cache read={turn['cache_read_tokens']} write={turn['cache_write_tokens']}"
+        if turn["tool_timeouts"] or turn["tool_cancellations"]:
+            line += f" tool_timeouts={turn['tool_timeouts']} cancelled={turn['tool_cancellations']}"
+        return line
@@ -0,0 +1,114 @@
+"""
+Shared HTTP plumbing for the direct Atlassian REST tools.
+
+Every Jira/Confluence call goes through one pooled requests.Session, so the
+interactive REPL and all server sessions reuse the same TCP/TLS connections
+instead of opening a new connection per tool call. Calls also pass through the
+per-host token bucket in rate_limit, which queues them and retries 429s.
+"""
+import os
+import base64
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+import deadlines
+import rate_limit
+
+
+# Load environment variables
+load_dotenv()
+
+# Atlassian configuration
+JIRA_URL = os.getenv("JIRA_URL")
+JIRA_USERNAME = os.getenv("JIRA_USERNAME")
+JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
+CONFLUENCE_URL = os.getenv("CONFLUENCE_URL")
+CONFLUENCE_USERNAME = os.getenv("CONFLUENCE_USERNAME")
+CONFLUENCE_API_TOKEN = os.getenv("CONFLUENCE_API_TOKEN")
+
+# Maximum number of pooled connections kept open per Atlassian host
+POOL_SIZE = int(os.getenv("ATLASSIAN_POOL_SIZE", "20"))
+
+# How many times a throttled (429/503) call is re-queued before the error is returned
+MAX_THROTTLE_RETRIES = int(os.getenv("ATLASSIAN_MAX_RETRIES", "4"))
+
+# Methods that may be sent again after a 503; a 503 from a proxy can arrive after a POST
+# was already applied, so POST/PATCH are only retried on 429, which means "not processed"
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Socket timeout for calls made outside a tool deadline (inside one, the time left is used)
+REQUEST_TIMEOUT = float(os.getenv("ATLASSIAN_TIMEOUT", "30"))
+
+
+def _build_session():
+    """Create the process-wide session with a connection pool sized for concurrent agents."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+session = _build_session()
+
+
+def basic_auth_headers(username, api_token):
+    """Basic-auth JSON headers for an Atlassian account."""
+    auth_str = f"{username}:{api_token}"
+    auth_bytes = auth_str.encode('ascii')
+    auth_b64 = base64.b64encode(auth_bytes).decode('ascii')
+    return {
+        "Authorization": f"Basic {auth_b64}",
+        "Content-Type": "application/json"
+    }
+
+
+def get_jira_auth_headers():
+    """Get authentication headers for Jira API calls."""
+    return basic_auth_headers(JIRA_USERNAME, JIRA_API_TOKEN)
+
+
+def get_confluence_auth_headers():
+    """Get authentication headers for Confluence API calls."""
+    return basic_auth_headers(CONFLUENCE_USERNAME, CONFLUENCE_API_TOKEN)
+
+
+def atlassian_request(method, url, **kwargs):
+    """
+    Send a request to Jira or Confluence through the shared connection pool.
+
+    The call waits for a token from the host's rate limiter first. Throttled
+    responses (429/503) pause the limiter for Retry-After and the call is
+    queued again, up to ATLASSIAN_MAX_RETRIES times; non-idempotent methods
+    (POST, PATCH) are only re-sent after a 429.
+
+    Inside a tool call the deadline set by deadlines.TurnBudget bounds both the
+    wait for a token and the socket timeout; outside one, ATLASSIAN_TIMEOUT applies.
+
+    Args:
+        method: HTTP method (e.g., "GET", "POST")
+        url: Full request URL
+        **kwargs: Passed through to requests.Session.request
+
+    Returns:
+        The requests.Response object
+
+    Raises:
+        requests.Timeout: If the deadline passes before the call could be sent or answered
+    """
+    limiter = rate_limit.limiter_for(url)
+    retry_statuses = rate_limit.THROTTLE_STATUSES if method.upper() in IDEMPOTENT_METHODS else (429,)
+    explicit_timeout = kwargs.pop("timeout", None)
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        if not limiter.acquire(timeout=deadlines.remaining()):
+            raise requests.Timeout(f"Deadline passed while queued for the {method} {url} rate limit")
+        timeout = explicit_timeout or deadlines.remaining(REQUEST_TIMEOUT)
+        if timeout <= 0:
+            raise requests.Timeout(f"Deadline passed before {method} {url} was sent")
+        response = session.request(method, url, timeout=timeout, **kwargs)
+        limiter.observe(response.status_code, response.headers)
+        if response.status_code not in retry_statuses or attempt == MAX_THROTTLE_RETRIES:
+            return response
+        # Release the pooled connection (held open by stream=True) before the next attempt
+        response.close()
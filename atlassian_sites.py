@@ -0,0 +1,208 @@
+"""
+Multiple Atlassian sites, queried in parallel.
+
+We run several Jira/Confluence sites (e.g. corp, ops, acquisition). With
+ATLASSIAN_SITES set, jira_search_issues and confluence_search_content send
+the same JQL/CQL to every site at once:
+- results are merged and tagged with the site they came from
+- an issue found on several sites (same key and summary) is listed once,
+  with "also_on" naming the other sites; Confluence pages are only merged
+  when their URL is the same, since page ids differ from site to site
+- each site's status, result count and latency are reported
+- a site that has not answered within ATLASSIAN_SITE_TIMEOUT seconds (or
+  before the tool's deadline) is reported as "timeout", and the other sites'
+  results are returned without it
+
+jira_get_issue, jira_download_attachments, confluence_get_page and
+confluence_get_page_sections take the site tag to read an item from that
+site. All other tools, writes included, keep using JIRA_URL and
+CONFLUENCE_URL.
+
+Each site has its own rate-limit bucket, because rate_limit keys buckets on
+the host.
+
+Configure with:
+    ATLASSIAN_SITES=corp,ops,acquisition
+    ATLASSIAN_CORP_JIRA_URL=https://corp.atlassian.net
+    ATLASSIAN_CORP_CONFLUENCE_URL=https://corp.atlassian.net
+    ATLASSIAN_CORP_USERNAME=...            (default: JIRA_USERNAME / CONFLUENCE_USERNAME)
+    ATLASSIAN_CORP_API_TOKEN=...           (default: JIRA_API_TOKEN / CONFLUENCE_API_TOKEN)
+    ... likewise for OPS and ACQUISITION
+    ATLASSIAN_SITE_TIMEOUT=15
+Without ATLASSIAN_SITES there is a single site, "default", built from
+JIRA_URL / CONFLUENCE_URL and their credentials.
+"""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+
+import deadlines
+from atlassian_http import (
+    JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN,
+    CONFLUENCE_URL, CONFLUENCE_USERNAME, CONFLUENCE_API_TOKEN,
+    basic_auth_headers,
+)
+
+
+SITE_TIMEOUT = float(os.getenv("ATLASSIAN_SITE_TIMEOUT", "15"))
+
+
+class Site:
+    """One Jira/Confluence site and its credentials."""
+
+    def __init__(self, name, jira_url, confluence_url, jira_auth, confluence_auth):
+        self.name = name
+        self.jira_url = (jira_url or "").rstrip("/")
+        self.confluence_url = (confluence_url or "").rstrip("/")
+        self.jira_auth = jira_auth
+        self.confluence_auth = confluence_auth
+
+    def jira_headers(self):
+        return basic_auth_headers(*self.jira_auth)
+
+    def confluence_headers(self):
+        return basic_auth_headers(*self.confluence_auth)
+
+
+def _site_from_env(name):
+    prefix = f"ATLASSIAN_{name.upper()}_"
+    username = os.getenv(prefix + "USERNAME")
+    token = os.getenv(prefix + "API_TOKEN")
+    return Site(
+        name,
+        os.getenv(prefix + "JIRA_URL"),
+        os.getenv(prefix + "CONFLUENCE_URL") or os.getenv(prefix + "JIRA_URL"),
+        (username or JIRA_USERNAME, token or JIRA_API_TOKEN),
+        (username or CONFLUENCE_USERNAME, token or CONFLUENCE_API_TOKEN),
+    )
+
+
+_sites = None
+_pool = None
+_lock = threading.Lock()
+
+
+def configured():
+    """The configured sites, first one first (a single "default" site without ATLASSIAN_SITES)."""
+    global _sites
+    if _sites is None:
+        names = [name.strip() for name in os.getenv("ATLASSIAN_SITES", "").split(",") if name.strip()]
+        if names:
+            _sites = [_site_from_env(name) for name in names]
+        else:
+            _sites = [Site("default", JIRA_URL, CONFLUENCE_URL,
+                           (JIRA_USERNAME, JIRA_API_TOKEN), (CONFLUENCE_USERNAME, CONFLUENCE_API_TOKEN))]
+    return _sites
+
+
+def get(name=None):
+    """
+    The site called name, or the first site when name is empty.
+
+    Raises:
+        ValueError: if no site has that name
+    """
+    sites = configured()
+    if not name:
+        return sites[0]
+    for site in sites:
+        if site.name.lower() == name.strip().lower():
+            return site
+    raise ValueError(f"unknown site '{name}' (configured: {', '.join(site.name for site in sites)})")
+
+
+def _error_text(error):
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return f"HTTP {error.response.status_code}: {error.response.text[:200]}"
+    return str(error)[:200]
+
+
+def _timed(fn, site):
+    started = time.monotonic()
+    try:
+        return {"status": "ok", "value": fn(site), "latency_ms": int((time.monotonic() - started) * 1000)}
+    except Exception as e:
+        return {"status": "error", "error": _error_text(e), "latency_ms": int((time.monotonic() - started) * 1000)}
+
+
+def fan_out(fn, sites=None, timeout=None):
+    """
+    Call fn(site) for every site concurrently.
+
+    Args:
+        fn: Called once per site on a worker thread, with the caller's context (and tool deadline)
+        sites: Sites to query (default: all configured)
+        timeout: Seconds to wait (default: ATLASSIAN_SITE_TIMEOUT, capped by the tool deadline)
+
+    Returns:
+        {site name: {"status": "ok" | "error" | "timeout", "latency_ms", "value" or "error"}}, in site order
+    """
+    global _pool
+    sites = sites or configured()
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max(4, 2 * len(configured())), thread_name_prefix="atlassian-site")
+    budget = timeout or SITE_TIMEOUT
+    left = deadlines.remaining()
+    if left is not None:
+        budget = min(budget, max(0.0, left - 0.5))
+    started = time.monotonic()
+    futures = {site.name: _pool.submit(contextvars.copy_context().run, _timed, fn, site) for site in sites}
+    # Slow sites keep running in the background until their own request deadline; only the wait stops here
+    wait(futures.values(), timeout=budget)
+    results = {}
+    for name, future in futures.items():
+        if future.done():
+            results[name] = future.result()
+        else:
+            results[name] = {"status": "timeout", "latency_ms": int((time.monotonic() - started) * 1000),
+                             "error": f"no answer within {budget:.1f}s"}
+    return results
+
+
+def merge(per_site, identity, sort_key=None, reverse=False):
+    """
+    Merge per-site result lists into one list tagged with "site".
+
+    Args:
+        per_site: {site name: [result dicts]}, in site order
+        identity: Function giving the de-duplication key of a result
+        sort_key: Optional sort key for the merged list; without one, sites are interleaved by rank
+        reverse: Sort descending
+
+    Returns:
+        The merged results; a duplicate is dropped and its site added to the kept one's "also_on"
+    """
+    ranked = []
+    for name, items in per_site.items():
+        for rank, item in enumerate(items):
+            ranked.append((rank, {**item, "site": name}))
+    ranked.sort(key=lambda entry: entry[0])  # stable: rank first, then site order
+    merged = {}
+    for _, item in ranked:
+        key = identity(item)
+        if key in merged:
+            merged[key].setdefault("also_on", []).append(item["site"])
+        else:
+            merged[key] = item
+    items = list(merged.values())
+    if sort_key:
+        items.sort(key=sort_key, reverse=reverse)
+    return items
+
+
+def site_report(results, count=len):
+    """Per-site status, result count and latency for the tool output."""
+    report = {}
+    for name, result in results.items():
+        entry = {"status": result["status"], "latency_ms": result["latency_ms"]}
+        if result["status"] == "ok":
+            entry["count"] = count(result["value"])
+        else:
+            entry["error"] = result["error"]
+        report[name] = entry
+    return report
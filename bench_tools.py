@@ -0,0 +1,78 @@
+"""
+Benchmark: turn latency with 1 vs N tool calls executed in parallel.
+
+Runs the direct-API agent offline (FakeModel + stand-in Atlassian server with
+per-request latency). Each turn asks for N confluence_get_page calls plus one
+jira_search_issues in a single assistant message, and is timed under
+sequential execution, a concurrent executor with a 1-thread pool, and a
+concurrent executor with an N-thread pool.
+
+Usage:
+    python bench_tools.py [--calls 1 2 4 8] [--latency 0.25] [--repeat 3]
+"""
+import argparse
+import os
+import statistics
+import time
+
+from fake_services import FakeModel, start_fake_atlassian
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--calls", type=int, nargs="+", default=[1, 2, 4, 8], help="Tool calls per turn")
+    parser.add_argument("--latency", type=float, default=0.25, help="Seconds per Atlassian request")
+    parser.add_argument("--repeat", type=int, default=3, help="Turns timed per configuration")
+    args = parser.parse_args()
+
+    server, base_url = start_fake_atlassian(latency=args.latency)
+    os.environ.update(JIRA_URL=base_url, CONFLUENCE_URL=base_url, ATLASSIAN_RATE="1000", ATLASSIAN_BURST="1000")
+    # Every timed turn repeats the same calls; the tool memo would answer them without any request
+    os.environ["TOOL_MEMO"] = "0"
+
+    import cc_agent_api_direct
+    import tool_executor
+    from strands.tools.executors import SequentialToolExecutor
+
+    def plan_for(calls):
+        def plan(prompt):
+            pages = [("confluence_get_page", {"page_id": str(5001 + i)}) for i in range(calls - 1)]
+            return pages + [("jira_search_issues", {"jql": "status != Done", "max_results": 20})]
+        return plan
+
+    configurations = [
+        ("sequential", lambda: (SequentialToolExecutor(), tool_executor.ToolConcurrencyLimiter())),
+        ("concurrent, pool=1", lambda: (tool_executor.OrderedConcurrentToolExecutor(),
+                                        tool_executor.ToolConcurrencyLimiter({"atlassian": 1}))),
+        ("concurrent, pool=N", lambda: (tool_executor.OrderedConcurrentToolExecutor(),
+                                        tool_executor.ToolConcurrencyLimiter({"atlassian": 16}))),
+    ]
+
+    print(f"Atlassian latency {args.latency:.2f}s per request, {args.repeat} turn(s) per cell, median shown\n")
+    header = f"{'tools/turn':>10} | " + " | ".join(f"{name:>18}" for name, _ in configurations)
+    print(header)
+    print("-" * len(header))
+    for calls in args.calls:
+        cells = []
+        for _name, build in configurations:
+            executor, limiter = build()
+            agent = cc_agent_api_direct.create_agent(
+                model=FakeModel(tool_plan=plan_for(calls), latency=0.0),
+                tool_executor=executor,
+                hooks=[limiter],
+                callback_handler=None,
+            )
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                agent("benchmark turn")
+                samples.append(time.perf_counter() - started)
+            limiter.shutdown()
+            cells.append(f"{statistics.median(samples):>17.2f}s")
+        print(f"{calls:>10} | " + " | ".join(cells))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
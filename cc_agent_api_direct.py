@@ -1,55 +1,90 @@
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
-from strands_tools import http_request, generate_image
+from strands_tools import http_request
 from strands_tools.tavily import tavily_search
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
+import argparse
+import contextvars
 import os
 import json
-import base64
-import requests  # Use standard requests library for HTTP calls
-from dotenv import load_dotenv
-
-
-# Load environment variables
-load_dotenv()
-
-# Atlassian configuration
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USERNAME = os.getenv("JIRA_USERNAME")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-CONFLUENCE_URL = os.getenv("CONFLUENCE_URL")
-CONFLUENCE_USERNAME = os.getenv("CONFLUENCE_USERNAME")
-CONFLUENCE_API_TOKEN = os.getenv("CONFLUENCE_API_TOKEN")
-
-
-def get_jira_auth_headers():
-    """Get authentication headers for Jira API calls."""
-    auth_str = f"{JIRA_USERNAME}:{JIRA_API_TOKEN}"
-    auth_bytes = auth_str.encode('ascii')
-    auth_b64 = base64.b64encode(auth_bytes).decode('ascii')
-    return {
-        "Authorization": f"Basic {auth_b64}",
-        "Content-Type": "application/json"
-    }
+import time
+import requests
+from atlassian_http import (
+    JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN,
+    CONFLUENCE_URL, CONFLUENCE_USERNAME, CONFLUENCE_API_TOKEN,
+    get_jira_auth_headers, get_confluence_auth_headers, atlassian_request,
+)
+from agent_metrics import TurnMetrics
+import atlassian_sites
+import confluence_paging
+import conversation_memory
+import deadlines
+import prompt_cache
+import response_cache
+import session_log
+import spill_store
+import image_store
+import issue_index
+import issue_prefetch
+from jira_analytics import jira_aggregate
+from jira_attachments import jira_download_attachments
+from confluence_sections import confluence_get_page_sections
+import tool_executor
+import tool_memo
+import web_cache
+from repl import run_repl
+
+
+MODEL_ID = "us.amazon.nova-lite-v1:0"
+
+# Issues processed at once by jira_bulk_update (requests still pass the shared rate limiter)
+BULK_WORKERS = int(os.getenv("JIRA_BULK_WORKERS", "8"))
+BULK_MAX_ITEMS = 200
 
 
-def get_confluence_auth_headers():
-    """Get authentication headers for Confluence API calls."""
-    auth_str = f"{CONFLUENCE_USERNAME}:{CONFLUENCE_API_TOKEN}"
-    auth_bytes = auth_str.encode('ascii')
-    auth_b64 = base64.b64encode(auth_bytes).decode('ascii')
-    return {
-        "Authorization": f"Basic {auth_b64}",
-        "Content-Type": "application/json"
-    }
+# ============= JIRA TOOLS =============
 
+def _search_jira(jql, max_results, site=None):
+    """
+    One JQL search on a site (default: JIRA_URL).
+
+    Returns:
+        (issues, total)
+    """
+    # Use the new /search/jql endpoint (migrated from /search in August 2025)
+    url = f"{site.jira_url if site else JIRA_URL}/rest/api/3/search/jql"
+    params = {
+        "jql": jql,
+        "maxResults": max_results,
+        "fields": "summary,status,assignee,priority,created,updated"
+    }
+    headers = site.jira_headers() if site else get_jira_auth_headers()
+    
+    response = atlassian_request("GET", url, headers=headers, params=params)
+    response.raise_for_status()
+    data = response.json()
+    if "issues" not in data:
+        raise ValueError(f"unexpected response: {json.dumps(data)[:200]}")
+    
+    issues = []
+    for issue in data["issues"]:
+        issues.append({
+            "key": issue["key"],
+            "summary": issue["fields"]["summary"],
+            "status": issue["fields"]["status"]["name"],
+            "assignee": issue["fields"]["assignee"]["displayName"] if issue["fields"].get("assignee") else "Unassigned",
+            "priority": issue["fields"]["priority"]["name"] if issue["fields"].get("priority") else "None",
+            "created": issue["fields"]["created"],
+            "updated": issue["fields"]["updated"]
+        })
+    return issues, data.get("total", len(issues))
 
-# ============= JIRA TOOLS =============
 
 @tool
 def jira_search_issues(jql: str, max_results: int = 50) -> str:
     """
     Search for Jira issues using JQL (Jira Query Language).
+    With several Atlassian sites configured, every site is searched and each issue is tagged with its site.
     
     Args:
         jql: JQL query string (e.g., "project = PROJ AND status = Open")
@@ -57,55 +92,58 @@ def jira_search_issues(jql: str, max_results: int = 50) -> str:
     
     Returns:
         JSON string containing search results with issue keys, summaries, and statuses
+        (and, across sites, each site's status and latency)
     """
+    if len(atlassian_sites.configured()) > 1:
+        return _search_jira_sites(jql, max_results)
     try:
-        # Use the new /search/jql endpoint (migrated from /search in August 2025)
-        url = f"{JIRA_URL}/rest/api/3/search/jql"
-        params = {
-            "jql": jql,
-            "maxResults": max_results,
-            "fields": "summary,status,assignee,priority,created,updated"
-        }
-        
-        response = requests.get(url, headers=get_jira_auth_headers(), params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        if "issues" in data:
-            issues = []
-            for issue in data["issues"]:
-                issues.append({
-                    "key": issue["key"],
-                    "summary": issue["fields"]["summary"],
-                    "status": issue["fields"]["status"]["name"],
-                    "assignee": issue["fields"]["assignee"]["displayName"] if issue["fields"].get("assignee") else "Unassigned",
-                    "priority": issue["fields"]["priority"]["name"] if issue["fields"].get("priority") else "None",
-                    "created": issue["fields"]["created"],
-                    "updated": issue["fields"]["updated"]
-                })
-            return json.dumps({"total": data["total"], "issues": issues}, indent=2)
-        return json.dumps(data, indent=2)
+        issues, total = _search_jira(jql, max_results)
+        return json.dumps({"total": total, "issues": issues}, indent=2)
     except requests.exceptions.HTTPError as e:
         return f"Error searching Jira (HTTP {e.response.status_code}): {e.response.text}"
     except Exception as e:
         return f"Error searching Jira: {str(e)}"
 
 
+def _search_jira_sites(jql, max_results):
+    """Run a JQL search on every site at once and merge the results, most recently updated first."""
+    results = atlassian_sites.fan_out(lambda site: _search_jira(jql, max_results, site))
+    found = {name: result["value"][0] for name, result in results.items() if result["status"] == "ok"}
+    if not found:
+        errors = "; ".join(f"{name}: {result['error']}" for name, result in results.items())
+        return f"Error searching Jira on every site: {errors}"
+    issues = atlassian_sites.merge(
+        found, identity=lambda issue: (issue["key"], issue["summary"]),
+        sort_key=lambda issue: issue["updated"], reverse=True,
+    )
+    return json.dumps({
+        "total": sum(result["value"][1] for result in results.values() if result["status"] == "ok"),
+        "complete": len(found) == len(results),
+        "sites": atlassian_sites.site_report(results, count=lambda value: len(value[0])),
+        "issues": issues[:max_results],
+    }, indent=2)
+
+
 @tool
-def jira_get_issue(issue_key: str) -> str:
+def jira_get_issue(issue_key: str, site: str = None) -> str:
     """
     Get detailed information about a specific Jira issue.
     
     Args:
         issue_key: The issue key (e.g., "PROJ-123")
+        site: Site tag from jira_search_issues, when several Atlassian sites are configured
     
     Returns:
         JSON string with detailed issue information
     """
     try:
-        url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}"
+        if site:
+            target = atlassian_sites.get(site)
+            url, headers = f"{target.jira_url}/rest/api/3/issue/{issue_key}", target.jira_headers()
+        else:
+            url, headers = f"{JIRA_URL}/rest/api/3/issue/{issue_key}", get_jira_auth_headers()
         
-        response = requests.get(url, headers=get_jira_auth_headers())
+        response = atlassian_request("GET", url, headers=headers)
         response.raise_for_status()
         data = response.json()
         issue_info = {
@@ -120,6 +158,11 @@ def jira_get_issue(issue_key: str) -> str:
             "updated": data["fields"]["updated"],
             "issue_type": data["fields"]["issuetype"]["name"]
         }
+        if data["fields"].get("attachment"):
+            # Names and sizes only; jira_download_attachments fetches the files themselves
+            issue_info["attachments"] = [
+                {"filename": a.get("filename"), "size": a.get("size")} for a in data["fields"]["attachment"]
+            ]
         return json.dumps(issue_info, indent=2)
     except Exception as e:
         return f"Error getting Jira issue: {str(e)}"
@@ -165,7 +208,7 @@ def jira_create_issue(project_key: str, summary: str, description: str, issue_ty
             }
         }
         
-        response = requests.post(url, headers=get_jira_auth_headers(), json=payload)
+        response = atlassian_request("POST", url, headers=get_jira_auth_headers(), json=payload)
         response.raise_for_status()
         data = response.json()
         return json.dumps({
@@ -217,13 +260,13 @@ def jira_update_issue(issue_key: str, summary: str = None, description: str = No
         
         if fields:
             payload = {"fields": fields}
-            response = requests.put(url, headers=get_jira_auth_headers(), json=payload)
+            response = atlassian_request("PUT", url, headers=get_jira_auth_headers(), json=payload)
             response.raise_for_status()
         
         # Handle status transition separately
         if status:
             transitions_url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}/transitions"
-            transitions_response = requests.get(transitions_url, headers=get_jira_auth_headers())
+            transitions_response = atlassian_request("GET", transitions_url, headers=get_jira_auth_headers())
             transitions_response.raise_for_status()
             transitions_data = transitions_response.json()
             
@@ -238,7 +281,7 @@ def jira_update_issue(issue_key: str, summary: str = None, description: str = No
                 transition_payload = {
                     "transition": {"id": transition_id}
                 }
-                response = requests.post(transitions_url, headers=get_jira_auth_headers(), json=transition_payload)
+                response = atlassian_request("POST", transitions_url, headers=get_jira_auth_headers(), json=transition_payload)
                 response.raise_for_status()
             else:
                 return f"Warning: Could not find transition to status '{status}'. Fields updated successfully."
@@ -281,7 +324,7 @@ def jira_add_comment(issue_key: str, comment: str) -> str:
             }
         }
         
-        response = requests.post(url, headers=get_jira_auth_headers(), json=payload)
+        response = atlassian_request("POST", url, headers=get_jira_auth_headers(), json=payload)
         response.raise_for_status()
         
         return json.dumps({"success": True, "message": f"Comment added to {issue_key}"})
@@ -289,77 +332,277 @@ def jira_add_comment(issue_key: str, comment: str) -> str:
         return f"Error adding comment: {str(e)}"
 
 
+def _bulk_apply(issue_key, operations):
+    """Run one issue's operations in order; stop at its first failure. Returns per-operation results."""
+    if not issue_key:
+        return [{"key": "", "action": str(op.get("action", "")).lower(), "ok": False, "error": "issue_key is required"}
+                for op in operations]
+    results = []
+    for operation in operations:
+        action = str(operation.get("action", "")).lower()
+        if action == "comment":
+            if not operation.get("comment"):
+                outcome = "Error: comment text is required"
+            else:
+                outcome = jira_add_comment(issue_key=issue_key, comment=operation["comment"])
+        elif action == "update" and not any(operation.get(field) for field in ("summary", "description", "status")):
+            outcome = "Error: update needs a summary, description and/or status"
+        elif action in ("transition", "update"):
+            outcome = jira_update_issue(
+                issue_key=issue_key,
+                summary=operation.get("summary"),
+                description=operation.get("description"),
+                status=operation.get("status"),
+            )
+        else:
+            outcome = f"Error: unknown action '{action}' (use comment, transition or update)"
+        ok = outcome.startswith("{")
+        results.append({"key": issue_key, "action": action, "ok": ok, "error": None if ok else outcome[:200]})
+        if not ok:
+            break
+    skipped = operations[len(results):]
+    results.extend(
+        {"key": issue_key, "action": str(op.get("action", "")).lower(), "ok": False,
+         "error": "skipped: an earlier operation on this issue failed"}
+        for op in skipped
+    )
+    return results
+
+
+def _bulk_run(issues):
+    """
+    Apply each issue's operations on the bulk worker pool, stopping before the tool deadline.
+
+    An issue is only started while there is time for it (twice the slowest issue so far,
+    plus a second), and the run returns shortly before the deadline, so the report reaches
+    the model instead of a bare timeout.
+
+    Args:
+        issues: [(issue key, operations)]
+
+    Returns:
+        (per-operation results, stop reason or None when every issue finished)
+    """
+    def timed(key, ops):
+        issue_started = time.monotonic()
+        return _bulk_apply(key, ops), time.monotonic() - issue_started
+
+    def not_done(key, ops, error):
+        return [{"key": key, "action": str(op.get("action", "")).lower(), "ok": False, "error": error} for op in ops]
+
+    pending = list(issues)
+    running = {}
+    results = []
+    slowest = 0.0
+    note = None
+    pool = ThreadPoolExecutor(min(BULK_WORKERS, len(pending)), thread_name_prefix="jira-bulk")
+    try:
+        while pending or running:
+            left = deadlines.remaining()
+            if pending and left is not None and left < 2 * slowest + 1:
+                note = "stopped before the tool deadline"
+                for key, ops in pending:
+                    results.extend(not_done(key, ops, "not attempted: stopped before the tool deadline"))
+                pending = []
+            while pending and len(running) < BULK_WORKERS:
+                key, ops = pending.pop(0)
+                # Each worker gets a copy of this context, so the tool deadline bounds its requests too
+                running[pool.submit(contextvars.copy_context().run, timed, key, ops)] = (key, ops)
+            if not running:
+                break
+            timeout = None if left is None else max(0.0, left - 0.5)
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                note = "stopped at the tool deadline"
+                for key, ops in running.values():
+                    results.extend(not_done(key, ops, "no answer before the tool deadline; it may still be applied"))
+                break
+            for future in done:
+                issue_results, elapsed = future.result()
+                results.extend(issue_results)
+                slowest = max(slowest, elapsed)
+                del running[future]
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results, note
+
+
+@tool
+def jira_bulk_update(operations: list[dict] = None, issue_keys: list[str] = None, comment: str = None,
+                     status: str = None) -> str:
+    """
+    Comment on, transition or update many Jira issues in one call (e.g., at sprint close or during an incident).
+    Use this instead of repeated jira_add_comment / jira_update_issue calls.
+
+    Args:
+        operations: List of per-issue operations, each {"issue_key": "PROJ-1", "action": "comment" | "transition" |
+            "update", "comment": "...", "status": "Done", "summary": "...", "description": "..."}
+        issue_keys: Alternatively, issue keys that all get the same comment and/or status
+        comment: Comment added to every issue in issue_keys
+        status: Status every issue in issue_keys is transitioned to (after the comment)
+
+    Returns:
+        JSON report: counts, the keys that succeeded per action, and each failure with its error;
+        complete is false when the tool deadline stopped the run (the rest are listed as not attempted)
+    """
+    items = [dict(operation) for operation in operations or []]
+    for key in issue_keys or []:
+        if comment:
+            items.append({"issue_key": key, "action": "comment", "comment": comment})
+        if status:
+            items.append({"issue_key": key, "action": "transition", "status": status})
+    if not items:
+        return "Error: pass operations, or issue_keys with a comment and/or status"
+    if len(items) > BULK_MAX_ITEMS:
+        return f"Error: {len(items)} operations requested; at most {BULK_MAX_ITEMS} per call"
+
+    # Operations on one issue run in order on one worker; different issues run in parallel
+    by_issue = {}
+    for item in items:
+        key = str(item.get("issue_key", "")).strip().upper()
+        by_issue.setdefault(key, []).append(item)
+    started = time.monotonic()
+    results, note = _bulk_run(list(by_issue.items()))
+
+    succeeded = {}
+    for result in results:
+        if result["ok"]:
+            succeeded.setdefault(result["action"], []).append(result["key"])
+    failed = [{key: result[key] for key in ("key", "action", "error")} for result in results if not result["ok"]]
+    report = {
+        "total": len(results),
+        "succeeded": sum(len(keys) for keys in succeeded.values()),
+        "failed": len(failed),
+        "complete": note is None,
+        "elapsed_s": round(time.monotonic() - started, 2),
+        "ok": succeeded,
+        "errors": failed,
+    }
+    if note:
+        report["note"] = note
+    return json.dumps(report, indent=2)
+
+
 # ============= CONFLUENCE TOOLS =============
 
+def _search_confluence(link, limit, site=None):
+    """
+    Follow a content search from link until limit results are collected.
+
+    Returns:
+        (results, total, next link or None)
+    """
+    base = site.confluence_url if site else CONFLUENCE_URL
+    if limit <= 0:
+        _, _, data = confluence_paging.fetch_page(link, {"limit": 1}, site)
+        return [], data.get("totalSize", data.get("size", 0)), None
+    items, total, link = confluence_paging.collect(link, limit, site)
+    results = [
+        {
+            "id": item["id"],
+            "title": item["title"],
+            "type": item["type"],
+            "url": f"{base}/wiki{item['_links']['webui']}"
+        }
+        for item in items
+    ]
+    return results, total if total is not None else len(results), link
+
+
 @tool
-def confluence_search_content(query: str, limit: int = 25) -> str:
+def confluence_search_content(query: str, limit: int = 25, cursor: str = None) -> str:
     """
     Search for Confluence content.
+    With several Atlassian sites configured, every site is searched (limit applies per site)
+    and each result is tagged with its site.
     
     Args:
         query: Search query string
-        limit: Maximum number of results (default: 25)
+        limit: Maximum number of results (default: 25; 0 returns only the total)
+        cursor: next_cursor from a previous call, to get the following results of the same search
     
     Returns:
-        JSON string with search results
+        JSON string with the total number of matches, this page of results and,
+        if more follow, a next_cursor
     """
+    if len(atlassian_sites.configured()) > 1:
+        return _search_confluence_sites(query, limit, cursor)
     try:
-        url = f"{CONFLUENCE_URL}/wiki/rest/api/content/search"
-        params = {
-            "cql": f"text ~ \"{query}\"",
-            "limit": limit
-        }
-        
-        response = requests.get(url, headers=get_confluence_auth_headers(), params=params)
-        response.raise_for_status()
-        data = response.json()
-        if "results" in data:
-            results = []
-            for item in data["results"]:
-                results.append({
-                    "id": item["id"],
-                    "title": item["title"],
-                    "type": item["type"],
-                    "url": f"{CONFLUENCE_URL}/wiki{item['_links']['webui']}"
-                })
-            return json.dumps({"total": data.get("totalSize", len(results)), "results": results}, indent=2)
-        return response
+        link = confluence_paging.search_links(query, cursor)[None]
+        results, total, link = _search_confluence(link, limit)
+        output = {"total": total, "results": results} if limit > 0 else {"total": total}
+        if link:
+            output["next_cursor"] = confluence_paging.encode_cursor(link)
+        return json.dumps(output, indent=2)
     except Exception as e:
         return f"Error searching Confluence: {str(e)}"
 
 
+def _search_confluence_sites(query, limit, cursor):
+    """Run a content search on every site at once; the cursor carries each site's next link."""
+    try:
+        links = confluence_paging.search_links(query, cursor, [site.name for site in atlassian_sites.configured()])
+        sites = [atlassian_sites.get(name) for name in links]
+    except ValueError as e:
+        return f"Error searching Confluence: {str(e)}"
+    results = atlassian_sites.fan_out(lambda site: _search_confluence(links[site.name], limit, site), sites)
+    found = {name: result["value"][0] for name, result in results.items() if result["status"] == "ok"}
+    if not found:
+        errors = "; ".join(f"{name}: {result['error']}" for name, result in results.items())
+        return f"Error searching Confluence on every site: {errors}"
+    # Sites that failed or timed out continue from where they were, so nothing is skipped
+    next_links = {
+        name: result["value"][2] if result["status"] == "ok" else links[name]
+        for name, result in results.items()
+    }
+    next_links = {name: link for name, link in next_links.items() if link}
+    output = {
+        "total": sum(result["value"][1] for result in results.values() if result["status"] == "ok"),
+        "complete": len(found) == len(results),
+        "sites": atlassian_sites.site_report(results, count=lambda value: len(value[0])),
+    }
+    if limit > 0:
+        # Page ids are per site, so pages are only the same when their URL is (two tags for one site);
+        # a "Runbook" on each of two sites stays two results, each fetchable with its own id and site
+        output["results"] = atlassian_sites.merge(found, identity=lambda item: item["url"])
+    if next_links and limit > 0:
+        output["next_cursor"] = confluence_paging.encode_cursor(json.dumps(next_links))
+    return json.dumps(output, indent=2)
+
+
 @tool
-def confluence_get_page(page_id: str) -> str:
+def confluence_get_page(page_id: str, site: str = None) -> str:
     """
     Get content from a Confluence page.
+    For long pages, confluence_get_page_sections returns only the relevant sections.
     
     Args:
         page_id: The page ID
+        site: Site tag from confluence_search_content, when several Atlassian sites are configured
     
     Returns:
         JSON string with page content
     """
     try:
-        url = f"{CONFLUENCE_URL}/wiki/rest/api/content/{page_id}"
+        base, headers = CONFLUENCE_URL, get_confluence_auth_headers()
+        if site:
+            target = atlassian_sites.get(site)
+            base, headers = target.confluence_url, target.confluence_headers()
+        url = f"{base}/wiki/rest/api/content/{page_id}"
         params = {
             "expand": "body.storage,version"
         }
         
-        response = http_request(
-            url=url,
-            method="GET",
-            headers=get_confluence_auth_headers(),
-            params=params
-        )
-        
-        data = json.loads(response)
+        response = atlassian_request("GET", url, headers=headers, params=params)
+        response.raise_for_status()
+        data = response.json()
         page_info = {
             "id": data["id"],
             "title": data["title"],
             "type": data["type"],
             "version": data["version"]["number"],
             "content": data["body"]["storage"]["value"],
-            "url": f"{CONFLUENCE_URL}/wiki{data['_links']['webui']}"
+            "url": f"{base}/wiki{data['_links']['webui']}"
         }
         return json.dumps(page_info, indent=2)
     except Exception as e:
@@ -367,37 +610,27 @@ def confluence_get_page(page_id: str) -> str:
 
 
 @tool
-def confluence_list_spaces() -> str:
+def confluence_list_spaces(limit: int = 100, cursor: str = None) -> str:
     """
-    List all Confluence spaces.
+    List Confluence spaces.
+    
+    Args:
+        limit: Maximum number of spaces to return (default: 100)
+        cursor: next_cursor from a previous call, to continue the listing
     
     Returns:
-        JSON string with list of spaces
+        JSON string with the spaces, the total number of spaces (null until total_known
+        is true) and, if more follow, a next_cursor
     """
+    if cursor and not str(cursor).isdigit():
+        return "Error listing Confluence spaces: invalid cursor"
     try:
-        url = f"{CONFLUENCE_URL}/wiki/rest/api/space"
-        params = {
-            "limit": 50
-        }
-        
-        response = http_request(
-            url=url,
-            method="GET",
-            headers=get_confluence_auth_headers(),
-            params=params
-        )
-        
-        data = json.loads(response)
-        if "results" in data:
-            spaces = []
-            for space in data["results"]:
-                spaces.append({
-                    "key": space["key"],
-                    "name": space["name"],
-                    "type": space["type"]
-                })
-            return json.dumps({"spaces": spaces}, indent=2)
-        return response
+        start = int(cursor) if cursor else 0
+        spaces, total, more = confluence_paging.spaces().slice(start, max(1, limit))
+        output = {"total": total, "total_known": total is not None, "spaces": spaces}
+        if more:
+            output["next_cursor"] = str(start + len(spaces))
+        return json.dumps(output, indent=2)
     except Exception as e:
         return f"Error listing Confluence spaces: {str(e)}"
 
@@ -508,90 +741,168 @@ def list_files(directory: str = ".") -> str:
 
 # ============= CONFIGURE AND RUN AGENT =============
 
-# Initialize the model
-model = BedrockModel(model_id="us.amazon.nova-lite-v1:0")
-
-# Create the agent with all tools
-agent = Agent(
-    model=model,
-    tools=[
-        # Jira tools
-        jira_search_issues,
-        jira_get_issue,
-        jira_create_issue,
-        jira_update_issue,
-        jira_add_comment,
-        # Confluence tools
-        confluence_search_content,
-        confluence_get_page,
-        confluence_list_spaces,
-        # Utility tools
-        get_current_datetime,
-        calculate,
-        write_file,
-        read_file,
-        list_files,
-        # External tools
-        http_request,
-        generate_image,
-        tavily_search
-    ]
-)
+# All tools exposed by this entry point (shared with cc_agent_server.py)
+TOOLS = [
+    # Jira tools
+    jira_search_issues,
+    jira_aggregate,
+    jira_get_issue,
+    issue_index.find_similar_issues,
+    jira_create_issue,
+    jira_update_issue,
+    jira_add_comment,
+    jira_bulk_update,
+    jira_download_attachments,
+    # Confluence tools
+    confluence_search_content,
+    confluence_get_page,
+    confluence_get_page_sections,
+    confluence_list_spaces,
+    # Utility tools
+    get_current_datetime,
+    calculate,
+    write_file,
+    read_file,
+    list_files,
+    spill_store.read_spilled_result,
+    # External tools (repeated web requests and searches are answered from web_cache)
+    web_cache.cached_http_request(http_request),
+    image_store.stored_generate_image(),
+    image_store.image_job_status,
+    web_cache.cached_search(tavily_search)
+]
+
+
+def create_model():
+    """Create the Bedrock model client used by the agent, with prompt caching where the model supports it."""
+    return prompt_cache.create_model(MODEL_ID)
+
+
+def create_agent(model=None, **kwargs):
+    """
+    Create an agent with the full direct-API toolset.
 
-print("\nStrands Agent with Direct Atlassian API Integration")
-print("=" * 60)
-print("\n[Available Tools]")
-print("\n[Jira Tools]:")
-print("  - jira_search_issues: Search for issues using JQL")
-print("  - jira_get_issue: Get detailed info about a specific issue")
-print("  - jira_create_issue: Create a new issue")
-print("  - jira_update_issue: Update an existing issue")
-print("  - jira_add_comment: Add a comment to an issue")
-print("\n[Confluence Tools]:")
-print("  - confluence_search_content: Search for Confluence content")
-print("  - confluence_get_page: Get content from a specific page")
-print("  - confluence_list_spaces: List all Confluence spaces")
-print("\n[Utility Tools]:")
-print("  - get_current_datetime: Get current date and time")
-print("  - calculate: Perform math calculations")
-print("  - write_file, read_file, list_files: File operations")
-print("  - http_request: Make HTTP requests to APIs")
-print("  - generate_image: Generate AI images")
-print("  - tavily_search: Search the web")
-print("\n" + "=" * 60)
-
-# Verify credentials are configured
-if not all([JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN]):
-    print("\n[WARNING] Jira credentials not fully configured in .env file")
-if not all([CONFLUENCE_URL, CONFLUENCE_USERNAME, CONFLUENCE_API_TOKEN]):
-    print("[WARNING] Confluence credentials not fully configured in .env file")
-
-if all([JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN, CONFLUENCE_URL, CONFLUENCE_USERNAME, CONFLUENCE_API_TOKEN]):
-    print("\n[OK] All Atlassian credentials configured!")
-    print(f"   Jira URL: {JIRA_URL}")
-    print(f"   Confluence URL: {CONFLUENCE_URL}")
-
-print("\n" + "=" * 60)
-
-# Interactive loop
-while True:
-    command = input("\nEnter a command (or 'exit' to quit): ")
-    
-    if command.lower() in ['exit', 'quit', 'q']:
-        print("\nGoodbye!")
-        break
-    
-    if not command.strip():
-        continue
-    
+    Args:
+        model: Model to use; a shared instance can be passed so several agents reuse one client
+        **kwargs: Extra arguments passed through to Agent (e.g., callback_handler, hooks)
+
+    Returns:
+        A configured Agent whose history is kept under the CONTEXT_TOKEN_BUDGET,
+        whose tools run according to the TOOL_EXECUTION settings and whose tool
+        calls are bounded by TOOL_TIMEOUTS and TURN_BUDGET_S; oversized tool results
+        are spilled to disk and read back with read_spilled_result, and (with
+        JIRA_PREFETCH_TOP_N) the top search results are prefetched; repeated
+        identical calls are answered from the conversation's TOOL_MEMO, and Jira
+        issues the tools return are added to the find_similar_issues index
+    """
+    executor, limiter = tool_executor.from_env()
+    kwargs.setdefault("conversation_manager", conversation_memory.from_env())
+    kwargs.setdefault("tool_executor", executor)
+    # The limiter has to wrap each tool before the turn budget wraps it in a deadline, and the
+    # prefetcher sits between them so prefetch misses still use the pools and waits stay bounded.
+    # The memo goes last so a repeated call skips all of them. After-tool callbacks run in reverse
+    # order, so the spiller goes first: it must shorten a result only after the prefetcher, the memo
+    # and the indexer have read it in full.
+    hooks = list(kwargs.get("hooks", []))
+    limiters = [hook for hook in hooks if isinstance(hook, tool_executor.ToolConcurrencyLimiter)] or [limiter]
+    prefetchers = [hook for hook in hooks if isinstance(hook, issue_prefetch.IssuePrefetcher)]
+    if not prefetchers and issue_prefetch.from_env(jira_get_issue):
+        prefetchers = [issue_prefetch.from_env(jira_get_issue)]
+    budgets = [hook for hook in hooks if isinstance(hook, deadlines.TurnBudget)] or [deadlines.from_env()]
+    memos = [hook for hook in hooks if isinstance(hook, tool_memo.ToolMemo)]
+    if not memos and tool_memo.from_env():
+        memos = [tool_memo.from_env()]
+    spillers = [hook for hook in hooks if isinstance(hook, spill_store.ResultSpiller)] or [spill_store.spiller()]
+    ordered = [*spillers, *limiters, *prefetchers, *budgets, *memos]
+    others = [hook for hook in hooks if hook not in ordered]
+    if not any(isinstance(hook, issue_index.IssueIndexer) for hook in others):
+        others.extend(filter(None, [issue_index.indexer()]))
+    kwargs["hooks"] = [*ordered, *others]
+    return Agent(model=model or create_model(), tools=TOOLS, **kwargs)
+
+
+def print_banner():
+    """Print the available tools and the credential status."""
+    print("\nStrands Agent with Direct Atlassian API Integration")
+    print("=" * 60)
+    print("\n[Available Tools]")
+    print("\n[Jira Tools]:")
+    print("  - jira_search_issues: Search for issues using JQL")
+    print("  - jira_aggregate: Count issues by status/assignee/priority/week without listing them")
+    print("  - jira_get_issue: Get detailed info about a specific issue")
+    print("  - find_similar_issues: Find look-alike issues in the local index (duplicate detection)")
+    print("  - jira_create_issue: Create a new issue")
+    print("  - jira_update_issue: Update an existing issue")
+    print("  - jira_add_comment: Add a comment to an issue")
+    print("  - jira_bulk_update: Comment on / transition many issues in one call")
+    print("  - jira_download_attachments: Save an issue's attachments (logs, dumps) to local files")
+    print("\n[Confluence Tools]:")
+    print("  - confluence_search_content: Search for Confluence content")
+    print("  - confluence_get_page: Get content from a specific page")
+    print("  - confluence_get_page_sections: Get only the sections of a long page that match a query")
+    print("  - confluence_list_spaces: List all Confluence spaces")
+    print("\n[Utility Tools]:")
+    print("  - get_current_datetime: Get current date and time")
+    print("  - calculate: Perform math calculations")
+    print("  - write_file, read_file, list_files: File operations")
+    print("  - read_spilled_result: Page/grep/slice large stored tool results")
+    print("  - http_request: Make HTTP requests to APIs")
+    print("  - generate_image: Generate AI images (stored locally, optional background jobs)")
+    print("  - image_job_status: Check a background image job")
+    print("  - tavily_search: Search the web")
     print("\n" + "=" * 60)
-    print("Agent Response:")
-    print("=" * 60 + "\n")
-    
-    try:
-        response = agent(command)
-        print(response)
-    except Exception as e:
-        print(f"[ERROR] {e}")
-    
+
+    # Verify credentials are configured
+    if not all([JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN]):
+        print("\n[WARNING] Jira credentials not fully configured in .env file")
+    if not all([CONFLUENCE_URL, CONFLUENCE_USERNAME, CONFLUENCE_API_TOKEN]):
+        print("[WARNING] Confluence credentials not fully configured in .env file")
+
+    if all([JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN, CONFLUENCE_URL, CONFLUENCE_USERNAME, CONFLUENCE_API_TOKEN]):
+        print("\n[OK] All Atlassian credentials configured!")
+        print(f"   Jira URL: {JIRA_URL}")
+        print(f"   Confluence URL: {CONFLUENCE_URL}")
+
     print("\n" + "=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interactive agent with direct Jira/Confluence API tools")
+    parser.add_argument("--resume", nargs="?", const="latest", metavar="NAME",
+                        help="Resume a logged session (default: the latest one)")
+    args = parser.parse_args()
+
+    turn_metrics = TurnMetrics()
+    model = create_model()
+    session, resuming = session_log.from_env(args.resume)
+    hooks = [turn_metrics, session] if session else [turn_metrics]
+    agent = create_agent(model=model, hooks=hooks, callback_handler=None)
+    cache = response_cache.from_env()
+    print_banner()
+    print(f"[INFO] Prompt caching: {model.caching_summary()}")
+    if cache:
+        print(f"[INFO] Response cache enabled ({cache.stats()['entries']} entries at {cache.path})")
+    if session and resuming:
+        loaded = session.resume(agent, agent.conversation_manager.token_budget)
+        print(f"[OK] Resumed session {session.name}: {loaded} messages in {session.resume_ms:.1f}ms")
+    elif session:
+        print(f"[INFO] Session log: {session.path} (resume with --resume {session.name})")
+
+    # Interactive loop (streams responses as they are generated)
+    # /bg jobs get an agent of their own that shares the model client, pools and caches
+    run_repl(agent, turn_metrics=turn_metrics, cache=cache, session=session,
+             agent_factory=lambda: create_agent(model=model, callback_handler=None))
+
+    web = web_cache.from_env()
+    if web and (web.hits or web.misses):
+        print(web.format_stats())
+    prefetcher = issue_prefetch.from_env(jira_get_issue)
+    if prefetcher and prefetcher.prefetched:
+        print(prefetcher.format_stats())
+    memo = tool_memo.from_env()
+    if memo and memo.hits:
+        print(memo.format_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
-from strands_tools import http_request, generate_image
+from strands_tools import http_request
 from strands_tools.tavily import tavily_search
-from strands.tools.mcp import MCPClient
-from mcp import stdio_client, StdioServerParameters
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from repl import StreamingDisplay
+import prompt_cache
+import deadlines
+import image_store
+import mcp_manager
+import tool_executor
+import tool_memo
+import spill_store
+import web_cache
 
 
 # load environment variables
@@ -118,39 +124,17 @@ def list_files(directory: str = ".") -> str:
 
 
 # Configure the agent with tools
-model = BedrockModel(model_id="us.amazon.nova-lite-v1:0")
+model = prompt_cache.create_model("us.amazon.nova-lite-v1:0")
+print(f"[INFO] Prompt caching: {model.caching_summary()}")
 
-# Create MCP client for Atlassian (self-hosted via stdio)
-print("Initializing Atlassian MCP client...")
-try:
-    # Create server parameters
-    # Use python to run mcp-atlassian directly (more reliable on Windows)
-    import sys
-    
-    server_params = StdioServerParameters(
-        command=sys.executable,  # Use current Python interpreter
-        args=["-m", "mcp_atlassian"],
-        env={
-            "JIRA_URL": os.getenv("JIRA_URL"),
-            "JIRA_USERNAME": os.getenv("JIRA_USERNAME"),
-            "JIRA_API_TOKEN": os.getenv("JIRA_API_TOKEN"),
-            "CONFLUENCE_URL": os.getenv("CONFLUENCE_URL"),
-            "CONFLUENCE_USERNAME": os.getenv("CONFLUENCE_USERNAME"),
-            "CONFLUENCE_API_TOKEN": os.getenv("CONFLUENCE_API_TOKEN"),
-        }
-    )
-    
-    # MCPClient expects a callable that returns the transport
-    atlassian_mcp = MCPClient(
-        lambda: stdio_client(server_params)
-    )
-    print("[OK] Atlassian MCP client initialized successfully!")
-    mcp_tools = [atlassian_mcp]
-except Exception as e:
-    print(f"[WARNING] Could not initialize Atlassian MCP: {e}")
-    print("  Make sure you've configured your .env file with Atlassian credentials")
-    mcp_tools = []
+# Start the configured MCP servers concurrently (default: self-hosted Atlassian via stdio).
+# Servers that miss their startup deadline are added to the agent once they are ready.
+print("Starting MCP servers...")
+mcp = mcp_manager.from_env()
+mcp_tools = mcp.start()
 
+memo = [tool_memo.from_env()] if tool_memo.from_env() else []  # TOOL_MEMO / TOOL_MEMO_POLICY
+executor, tool_limiter = tool_executor.from_env()  # TOOL_EXECUTION / TOOL_POOL_SIZES / TOOL_CAPS
 agent = Agent(
     model=model,
     tools=[
@@ -159,12 +143,19 @@ agent = Agent(
         write_file,
         read_file,
         list_files,
-        http_request,
-        generate_image,
-        tavily_search,
-        *mcp_tools  # Add Atlassian MCP if available
-    ]
+        spill_store.read_spilled_result,
+        web_cache.cached_http_request(http_request),
+        image_store.stored_generate_image(),
+        image_store.image_job_status,
+        web_cache.cached_search(tavily_search),
+        *mcp_tools  # Tools from MCP servers that were ready in time
+    ],
+    tool_executor=executor,
+    hooks=[tool_limiter, deadlines.from_env(), *memo, spill_store.spiller(), mcp],
+    callback_handler=None  # the response is streamed by StreamingDisplay
 )
+display = StreamingDisplay()
+agent.hooks.add_hook(display)
 
 print("\nStrands Agent with Tools")
 print("=" * 50)
@@ -174,11 +165,13 @@ print("  - calculate: Perform math calculations")
 print("  - write_file: Write content to a file")
 print("  - read_file: Read content from a file")
 print("  - list_files: List files in a directory")
+print("  - read_spilled_result: Page/grep/slice large stored tool results")
 print("  - http_request: Make HTTP requests to APIs")
-print("  - generate_image: Generate AI images using AWS Bedrock")
+print("  - generate_image: Generate AI images using AWS Bedrock (stored locally, optional background jobs)")
+print("  - image_job_status: Check a background image job")
 print("  - tavily_search: Search the web for real-time information")
-if mcp_tools:
-    print("  - Atlassian MCP: Access Jira and Confluence (via self-hosted MCP server)")
+for name, status in mcp.status().items():
+    print(f"  - MCP server '{name}': {status['state']} ({status['tools']} tools)")
 print("=" * 50)
 
 test_command = input("\nEnter a command: ")
@@ -188,9 +181,12 @@ print("Agent Response:")
 print("=" * 50 + "\n")
 
 try:
-    response = agent(test_command)
-    print(response)
+    response, timing = display.run_turn(agent, test_command)
+    print("\n" + display.format_timing(timing))
 except Exception as e:
     print(f"Error: {e}")
 
+if mcp.format_status():
+    print("\n" + mcp.format_status())
+
 print("\n" + "=" * 50)
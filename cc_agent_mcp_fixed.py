@@ -2,16 +2,27 @@ from strands import Agent, tool
 from strands.models.bedrock import BedrockModel
 from strands_tools import http_request, generate_image
 from strands_tools.tavily import tavily_search
-from mcp import stdio_client, StdioServerParameters
-from strands.tools.mcp import MCPClient
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+import mcp_manager
 
 
 # load environment variables
 load_dotenv()
 
+# MCP servers used when no MCP_SERVERS_FILE / mcp_servers.json is present
+DEFAULT_SERVERS = {
+    "aws-documentation": {
+        "command": "uvx",
+        "args": [
+            "--from",
+            "awslabs.aws-documentation-mcp-server@latest",
+            "awslabs.aws-documentation-mcp-server.exe"
+        ],
+    },
+}
+
 # Define custom tools using the @tool decorator
 
 @tool
@@ -123,130 +134,42 @@ model = BedrockModel(model_id="us.amazon.nova-lite-v1:0")
 print("\nStrands Agent with MCP Atlassian Integration (Windows)")
 print("=" * 60)
 
-# Create MCP client for Atlassian using proper Windows stdio format
-print("\n[INFO] Initializing Atlassian MCP client...")
-try:
-    # Windows-specific stdio parameters following Strands documentation
-    mcp_client = MCPClient(lambda: stdio_client(
-        StdioServerParameters(
-            command="uvx",
-            # args=[
-            #     "--from",
-            #     "mcp-atlassian",  # Package name from PyPI
-            #     "mcp-atlassian"    # Executable name (without .exe, uvx handles it)
-            # ],
-            args=[
-            "--from",
-            "awslabs.aws-documentation-mcp-server@latest",
-            "awslabs.aws-documentation-mcp-server.exe"
-        ]
-            # env={
-            #     "JIRA_URL": os.getenv("JIRA_URL"),
-            #     "JIRA_USERNAME": os.getenv("JIRA_USERNAME"),
-            #     "JIRA_API_TOKEN": os.getenv("JIRA_API_TOKEN"),
-            #     "CONFLUENCE_URL": os.getenv("CONFLUENCE_URL"),
-            #     "CONFLUENCE_USERNAME": os.getenv("CONFLUENCE_USERNAME"),
-            #     "CONFLUENCE_API_TOKEN": os.getenv("CONFLUENCE_API_TOKEN"),
-            # }
-        )
-    ))
-    
-    # Use context manager as per Strands documentation
-    with mcp_client:
-        print("[INFO] Loading tools from MCP server...")
-        mcp_tools = mcp_client.list_tools_sync()
-        print(f"[OK] Loaded {len(mcp_tools)} tools from Atlassian MCP server!")
-        
-        # Create agent with MCP tools
-        agent = Agent(
-            model=model,
-            tools=mcp_tools
-            # tools=[
-            #     get_current_datetime,
-            #     calculate,
-            #     write_file,
-            #     read_file,
-            #     list_files,
-            #     http_request,
-            #     generate_image,
-            #     tavily_search,
-            #     *mcp_tools  # Add all Atlassian MCP tools
-            # ]
-        )
-
-        response = agent("What is AWS Lambda?")
-        print(response.message)
-        
-        # print("\n" + "=" * 60)
-        # print("\n[Available Tools]")
-        # print("\n[Standard Tools]:")
-        # print("  - get_current_datetime, calculate")
-        # print("  - write_file, read_file, list_files")
-        # print("  - http_request, generate_image, tavily_search")
-        # print(f"\n[Atlassian MCP Tools]: {len(mcp_tools)} tools loaded")
-        # print("  (Jira and Confluence operations)")
-        # print("\n" + "=" * 60)
-        
-        # # Verify credentials
-        # if not all([os.getenv("JIRA_URL"), os.getenv("JIRA_USERNAME"), os.getenv("JIRA_API_TOKEN")]):
-        #     print("\n[WARNING] Jira credentials not fully configured in .env file")
-        # if not all([os.getenv("CONFLUENCE_URL"), os.getenv("CONFLUENCE_USERNAME"), os.getenv("CONFLUENCE_API_TOKEN")]):
-        #     print("[WARNING] Confluence credentials not fully configured in .env file")
-        
-        # if all([os.getenv("JIRA_URL"), os.getenv("JIRA_USERNAME"), os.getenv("JIRA_API_TOKEN"), 
-        #         os.getenv("CONFLUENCE_URL"), os.getenv("CONFLUENCE_USERNAME"), os.getenv("CONFLUENCE_API_TOKEN")]):
-        #     print("\n[OK] All Atlassian credentials configured!")
-        #     print(f"   Jira URL: {os.getenv('JIRA_URL')}")
-        #     print(f"   Confluence URL: {os.getenv('CONFLUENCE_URL')}")
-        
-        # print("\n" + "=" * 60)
-        
-        # Interactive loop
-        # while True:
-        #     test_command = input("\nEnter a command (or 'exit' to quit): ")
-            
-        #     if test_command.lower() in ['exit', 'quit', 'q']:
-        #         print("\nGoodbye!")
-        #         break
-            
-        #     if not test_command.strip():
-        #         continue
-            
-        #     print("\n" + "=" * 60)
-        #     print("Agent Response:")
-        #     print("=" * 60 + "\n")
-            
-        #     try:
-        #         response = agent(test_command)
-        #         print(response)
-        #     except Exception as e:
-        #         print(f"[ERROR] {e}")
-            
-        #     print("\n" + "=" * 60)
-
-except Exception as e:
-    print(f"\n[ERROR] Failed to initialize Atlassian MCP client: {e}")
+# Start the MCP servers through mcp_manager: concurrent startup with per-server
+# deadlines, health checks and reconnects. A server that is not ready in time is
+# skipped and its tools are added once it comes up, so one slow or broken server
+# no longer leaves the agent without MCP tools altogether.
+print("\n[INFO] Starting MCP servers...")
+mcp = mcp_manager.from_env(default_servers=DEFAULT_SERVERS)
+mcp_tools = mcp.start()
+
+agent = Agent(
+    model=model,
+    tools=[
+        get_current_datetime,
+        calculate,
+        write_file,
+        read_file,
+        list_files,
+        http_request,
+        generate_image,
+        tavily_search,
+        *mcp_tools  # Tools from MCP servers that were ready in time
+    ],
+    hooks=[mcp],
+)
+
+for name, status in mcp.status().items():
+    print(f"  - MCP server '{name}': {status['state']} ({status['tools']} tools)")
+if not mcp_tools:
     print("\nPossible solutions:")
     print("  1. Make sure 'uv' is installed: pip install uv")
     print("  2. Make sure 'uvx' is accessible from command line")
     print("  3. Check your .env file has all Atlassian credentials")
     print("  4. Try running: uvx --from mcp-atlassian mcp-atlassian --help")
-    print("\nFalling back to agent without MCP tools...")
-    
-    # Fallback: create agent without MCP tools
-    agent = Agent(
-        model=model,
-        tools=[
-            get_current_datetime,
-            calculate,
-            write_file,
-            read_file,
-            list_files,
-            http_request,
-            generate_image,
-            tavily_search
-        ]
-    )
-    
-    print("\n" + "=" * 60)
-    print("\nAgent running WITHOUT Atlassian MCP integration")
+print("\n" + "=" * 60)
+
+response = agent("What is AWS Lambda?")
+print(response.message)
+
+if mcp.format_status():
+    print("\n" + mcp.format_status())
@@ -0,0 +1,422 @@
+"""
+HTTP service mode for the direct Atlassian agent.
+
+Exposes the cc_agent_api_direct toolset over HTTP with one Agent per session.
+All sessions share one model client and the pooled Atlassian session from
+atlassian_http, and turns are admitted through global and per-session
+concurrency limits with bounded queueing.
+
+Endpoints:
+    POST   /v1/sessions                  -> {"session_id": ...}
+    POST   /v1/sessions/<id>/messages    {"prompt": "..."} -> {"response": ..., "usage": ...}
+    POST   /v1/chat                      {"prompt": "...", "session_id": optional}
+    DELETE /v1/sessions/<id>
+    GET    /v1/stats
+    GET    /healthz
+
+Usage:
+    python cc_agent_server.py --port 8080
+    python fake_services.py --port 8081 &   # stand-in Atlassian server
+    JIRA_URL=http://127.0.0.1:8081 CONFLUENCE_URL=http://127.0.0.1:8081 python cc_agent_server.py --fake-model
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from http import HTTPStatus
+
+import rate_limit
+import confluence_paging
+import confluence_sections
+import image_store
+import issue_index
+import issue_prefetch
+import response_cache
+import spill_store
+import tool_memo
+import web_cache
+from cc_agent_api_direct import create_agent, create_model, jira_get_issue
+
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class ServiceError(Exception):
+    """An error that maps directly onto an HTTP error response."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class SessionEntry:
+    """One session's agent plus the bookkeeping used for admission and eviction."""
+
+    def __init__(self, session_id, agent):
+        self.session_id = session_id
+        self.agent = agent
+        self.lock = asyncio.Lock()  # an Agent cannot run two turns at once
+        self.pending = 0
+        self.turns = 0
+        self.created = time.monotonic()
+        self.last_used = self.created
+
+
+class AgentPool:
+    """
+    Agents keyed by session id, created on demand and evicted when idle.
+
+    Args:
+        agent_factory: Zero-argument callable returning a new Agent
+        idle_timeout: Seconds a session may stay unused before eviction
+        max_sessions: Upper bound on live sessions; the least recently used idle one is evicted first
+    """
+
+    def __init__(self, agent_factory, idle_timeout=900, max_sessions=200):
+        self.agent_factory = agent_factory
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions = {}
+        self.evicted = 0
+
+    async def create(self, session_id=None):
+        """Return the session's entry, building its agent on a worker thread if it is new."""
+        session_id = session_id or uuid.uuid4().hex
+        if session_id in self.sessions:
+            return self.sessions[session_id]
+        # Building an agent (tool registry, hooks) off the loop keeps a burst of new
+        # sessions from stalling turns that are already running
+        agent = await asyncio.to_thread(self.agent_factory)
+        if session_id in self.sessions:
+            return self.sessions[session_id]
+        if len(self.sessions) >= self.max_sessions:
+            idle = [entry for entry in self.sessions.values() if entry.pending == 0]
+            if not idle:
+                raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE, "Session limit reached")
+            self.remove(min(idle, key=lambda entry: entry.last_used).session_id)
+            self.evicted += 1
+        entry = SessionEntry(session_id, agent)
+        self.sessions[session_id] = entry
+        return entry
+
+    def get(self, session_id):
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            raise ServiceError(HTTPStatus.NOT_FOUND, f"Unknown session: {session_id}")
+        return entry
+
+    def remove(self, session_id):
+        return self.sessions.pop(session_id, None) is not None
+
+    def evict_idle(self):
+        """Drop sessions idle longer than idle_timeout; returns the number evicted."""
+        cutoff = time.monotonic() - self.idle_timeout
+        stale = [sid for sid, entry in self.sessions.items() if entry.pending == 0 and entry.last_used < cutoff]
+        for session_id in stale:
+            self.remove(session_id)
+        self.evicted += len(stale)
+        return len(stale)
+
+
+class TurnScheduler:
+    """
+    Admission control for agent turns.
+
+    Args:
+        max_concurrent: Turns allowed to run at once across all sessions
+        max_queue: Turns allowed to wait for a global slot before new ones are rejected
+        per_session: Turns allowed in flight (running + queued) for a single session
+    """
+
+    def __init__(self, max_concurrent=8, max_queue=32, per_session=2):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.per_session = per_session
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.running = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, entry, prompt, on_complete=None):
+        """
+        Run one turn for a session once a global slot is free.
+
+        Args:
+            entry: The session's SessionEntry
+            prompt: User prompt
+            on_complete: Optional coroutine function(agent, result) awaited while the session is still locked
+        """
+        if entry.pending >= self.per_session:
+            self.rejected += 1
+            raise ServiceError(HTTPStatus.TOO_MANY_REQUESTS, "Too many requests in flight for this session")
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE, "Server queue is full, retry later")
+
+        entry.pending += 1
+        self.queued += 1
+        enqueued = time.monotonic()
+        admitted = False
+        try:
+            async with entry.lock:
+                async with self.slots:
+                    self.queued -= 1
+                    admitted = True
+                    self.running += 1
+                    started = time.monotonic()
+                    try:
+                        before = dict(entry.agent.event_loop_metrics.accumulated_usage)
+                        result = await entry.agent.invoke_async(prompt)
+                    finally:
+                        self.running -= 1
+                if on_complete is not None:
+                    await on_complete(entry.agent, result)
+            after = result.metrics.accumulated_usage
+            usage = {name: after.get(name, 0) - before.get(name, 0) for name in after}
+            entry.turns += 1
+            self.completed += 1
+            return {
+                "session_id": entry.session_id,
+                "response": str(result),
+                "stop_reason": result.stop_reason,
+                "usage": usage,
+                "queued_ms": round((started - enqueued) * 1000, 1),
+                "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+            }
+        finally:
+            if not admitted:
+                self.queued -= 1
+            entry.pending -= 1
+            entry.last_used = time.monotonic()
+
+
+class AgentService:
+    """Routes HTTP requests onto the agent pool and scheduler."""
+
+    def __init__(self, pool, scheduler, cache=None):
+        self.pool = pool
+        self.scheduler = scheduler
+        self.cache = cache
+        self.started = time.monotonic()
+
+    async def handle(self, method, path, body):
+        parts = [part for part in path.split("?", 1)[0].split("/") if part]
+
+        if method == "GET" and parts == ["healthz"]:
+            return HTTPStatus.OK, {"status": "ok"}
+        if method == "GET" and parts == ["v1", "stats"]:
+            return HTTPStatus.OK, self.stats()
+        if method == "POST" and parts == ["v1", "sessions"]:
+            entry = await self.pool.create(body.get("session_id"))
+            return HTTPStatus.CREATED, {"session_id": entry.session_id}
+        if method == "POST" and parts == ["v1", "chat"]:
+            entry = await self.pool.create(body.get("session_id"))
+            return HTTPStatus.OK, await self.turn(entry, self._prompt(body))
+        if len(parts) == 3 and parts[:2] == ["v1", "sessions"] and method == "DELETE":
+            if not self.pool.remove(parts[2]):
+                raise ServiceError(HTTPStatus.NOT_FOUND, f"Unknown session: {parts[2]}")
+            return HTTPStatus.OK, {"deleted": parts[2]}
+        if len(parts) == 4 and parts[:2] == ["v1", "sessions"] and parts[3] == "messages" and method == "POST":
+            entry = self.pool.get(parts[2])
+            return HTTPStatus.OK, await self.turn(entry, self._prompt(body))
+
+        raise ServiceError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+
+    async def turn(self, entry, prompt):
+        """Answer from the response cache when possible, otherwise schedule a real turn."""
+        if self.cache is None:
+            return await self.scheduler.run(entry, prompt)
+
+        # Under the session lock, so another turn of this session cannot change the history
+        # between the lookup (which keys on it) and recording the cached exchange
+        async with entry.lock:
+            hit = await asyncio.to_thread(self.cache.lookup, entry.agent, prompt)
+            if hit:
+                response_cache.remember_exchange(entry.agent, prompt, hit.text)
+        if hit:
+            entry.last_used = time.monotonic()
+            return {
+                "session_id": entry.session_id,
+                "response": hit.text,
+                "cached": True,
+                "cache_age_s": round(time.time() - hit.created, 1),
+                "elapsed_ms": round(hit.elapsed_ms, 1),
+            }
+        async def store(agent, result):
+            await asyncio.to_thread(self.cache.store, agent, prompt, result)
+
+        result = await self.scheduler.run(entry, prompt, on_complete=store)
+        return {**result, "cached": False}
+
+    @staticmethod
+    def _prompt(body):
+        prompt = body.get("prompt")
+        if not isinstance(prompt, str) or not prompt.strip():
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Body must contain a non-empty 'prompt'")
+        return prompt
+
+    def stats(self):
+        web = web_cache.from_env()
+        prefetcher = issue_prefetch.from_env(jira_get_issue)
+        memo = tool_memo.from_env()
+        return {
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "sessions": len(self.pool.sessions),
+            "sessions_evicted": self.pool.evicted,
+            "running": self.scheduler.running,
+            "queued": self.scheduler.queued,
+            "completed": self.scheduler.completed,
+            "rejected": self.scheduler.rejected,
+            "response_cache": self.cache.stats() if self.cache else None,
+            "atlassian_rate_limits": rate_limit.stats(),
+            "web_cache": web.stats() if web else None,
+            "image_store": image_store.from_env().stats(),
+            "spill_store": spill_store.from_env().stats(),
+            "jira_prefetch": prefetcher.stats() if prefetcher else None,
+            "tool_memo": memo.stats() if memo else None,
+            "issue_index": issue_index.from_env().stats(),
+            "confluence_sections": confluence_sections.from_env().stats(),
+            "confluence_spaces": confluence_paging.spaces().stats(),
+            "limits": {
+                "max_concurrent": self.scheduler.max_concurrent,
+                "max_queue": self.scheduler.max_queue,
+                "per_session": self.scheduler.per_session,
+                "idle_timeout_s": self.pool.idle_timeout,
+            },
+        }
+
+
+async def _read_request(reader):
+    """Read one HTTP/1.1 request; returns None when the client closed the connection."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, target, _version = request_line.decode("latin-1").split()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_BYTES:
+        raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    raw = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, raw
+
+
+def _write_response(writer, status, body, keep_alive):
+    payload = json.dumps(body, default=str).encode()
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + payload)
+
+
+async def _handle_connection(service, reader, writer):
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, raw = request
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+                body = json.loads(raw) if raw else {}
+                if not isinstance(body, dict):
+                    raise ServiceError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+                status, payload = await service.handle(method, target, body)
+            except ServiceError as e:
+                status, payload = HTTPStatus(e.status), {"error": e.message}
+            except (ValueError, json.JSONDecodeError) as e:
+                status, payload = HTTPStatus.BAD_REQUEST, {"error": f"Malformed request: {e}"}
+            except asyncio.IncompleteReadError:
+                break
+            except Exception as e:
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+            _write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _evict_loop(pool, interval):
+    while True:
+        await asyncio.sleep(interval)
+        evicted = pool.evict_idle()
+        if evicted:
+            print(f"[INFO] Evicted {evicted} idle session(s)")
+
+
+async def serve(host, port, service, evict_interval=30):
+    server = await asyncio.start_server(lambda r, w: _handle_connection(service, r, w), host, port)
+    evictor = asyncio.create_task(_evict_loop(service.pool, evict_interval))
+    print(f"[OK] Agent service listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        evictor.cancel()
+
+
+def build_service(model, max_concurrent=8, max_queue=32, per_session=2, idle_timeout=900, max_sessions=200,
+                  cache=None):
+    """
+    Wire a pool and scheduler around a single shared model client.
+
+    Args:
+        model: Model instance shared by every session's agent
+        cache: Optional ResponseCache shared by all sessions
+
+    Returns:
+        An AgentService ready to pass to serve()
+    """
+    pool = AgentPool(lambda: create_agent(model=model, callback_handler=None), idle_timeout, max_sessions)
+    scheduler = TurnScheduler(max_concurrent, max_queue, per_session)
+    return AgentService(pool, scheduler, cache)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the direct Atlassian agent over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrent", type=int, default=8, help="Turns running at once across sessions")
+    parser.add_argument("--max-queue", type=int, default=32, help="Turns allowed to wait for a slot")
+    parser.add_argument("--per-session", type=int, default=2, help="Turns in flight per session")
+    parser.add_argument("--idle-timeout", type=float, default=900, help="Seconds before an idle session is evicted")
+    parser.add_argument("--max-sessions", type=int, default=200)
+    parser.add_argument("--fake-model", action="store_true", help="Use the offline FakeModel instead of Bedrock")
+    parser.add_argument("--response-cache", action="store_true", help="Serve repeated prompts from the response cache")
+    args = parser.parse_args()
+
+    if args.fake_model:
+        from fake_services import FakeModel
+        model = FakeModel()
+    else:
+        model = create_model()
+
+    if args.response_cache:
+        os.environ["RESPONSE_CACHE"] = "1"
+    service = build_service(model, args.max_concurrent, args.max_queue, args.per_session,
+                            args.idle_timeout, args.max_sessions, response_cache.from_env())
+    try:
+        asyncio.run(serve(args.host, args.port, service))
+    except KeyboardInterrupt:
+        print("\nGoodbye!")
+
+
+if __name__ == "__main__":
+    main()
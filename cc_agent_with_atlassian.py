@@ -1,10 +1,20 @@
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
-from strands_tools import http_request, generate_image, mcp_client
+from strands_tools import http_request, mcp_client
 from strands_tools.tavily import tavily_search
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from agent_metrics import TurnMetrics
+import conversation_memory
+import prompt_cache
+import deadlines
+import image_store
+import tool_executor
+import tool_memo
+import session_log
+import spill_store
+import web_cache
+from repl import run_repl
 
 
 # load environment variables
@@ -116,22 +126,41 @@ def list_files(directory: str = ".") -> str:
 
 
 # Configure the agent with tools
-model = BedrockModel(model_id="us.amazon.nova-lite-v1:0")
-
-agent = Agent(
-    model=model,
-    tools=[
-        get_current_datetime,
-        calculate,
-        write_file,
-        read_file,
-        list_files,
-        http_request,
-        generate_image,
-        tavily_search,
-        mcp_client  # Dynamic MCP client for Atlassian and other MCP servers
-    ]
-)
+model = prompt_cache.create_model("us.amazon.nova-lite-v1:0")
+print(f"[INFO] Prompt caching: {model.caching_summary()}")
+turn_metrics = TurnMetrics()
+memo = [tool_memo.from_env()] if tool_memo.from_env() else []  # TOOL_MEMO / TOOL_MEMO_POLICY
+executor, tool_limiter = tool_executor.from_env()  # TOOL_EXECUTION / TOOL_POOL_SIZES / TOOL_CAPS
+session, resuming = session_log.from_env()  # SESSION_LOG / SESSION_RESUME
+
+tools = [
+    get_current_datetime,
+    calculate,
+    write_file,
+    read_file,
+    list_files,
+    spill_store.read_spilled_result,
+    web_cache.cached_http_request(http_request),
+    image_store.stored_generate_image(),
+    image_store.image_job_status,
+    web_cache.cached_search(tavily_search),
+    mcp_client  # Dynamic MCP client for Atlassian and other MCP servers
+]
+
+
+def build_agent(*extra_hooks):
+    """An agent with this script's tools and limits; /bg jobs get one each, without metrics or session log."""
+    return Agent(
+        model=model,
+        conversation_manager=conversation_memory.from_env(),  # keep history under CONTEXT_TOKEN_BUDGET
+        tool_executor=executor,
+        hooks=[tool_limiter, deadlines.from_env(), *memo, spill_store.spiller(), *extra_hooks],
+        callback_handler=None,  # responses are streamed by run_repl
+        tools=tools
+    )
+
+
+agent = build_agent(turn_metrics, *filter(None, [session]))
 
 print("Strands Agent with Tools")
 print("=" * 50)
@@ -141,8 +170,10 @@ print("  - calculate: Perform math calculations")
 print("  - write_file: Write content to a file")
 print("  - read_file: Read content from a file")
 print("  - list_files: List files in a directory")
+print("  - read_spilled_result: Page/grep/slice large stored tool results")
 print("  - http_request: Make HTTP requests to APIs")
-print("  - generate_image: Generate AI images using AWS Bedrock")
+print("  - generate_image: Generate AI images using AWS Bedrock (stored locally, optional background jobs)")
+print("  - image_job_status: Check a background image job")
 print("  - tavily_search: Search the web for real-time information")
 print("  - mcp_client: Connect to MCP servers (Atlassian, etc.) for Jira/Confluence access")
 print("=" * 50)
@@ -161,22 +192,11 @@ except Exception as e:
 
 print("=" * 50)
 
-# Main interaction loop
-while True:
-    test_command = input("\nEnter a command (or 'exit' to quit): ")
-    
-    if test_command.lower() in ['exit', 'quit', 'q']:
-        print("\nGoodbye!")
-        break
-    
-    print("\n" + "=" * 50)
-    print("Agent Response:")
-    print("=" * 50 + "\n")
-    
-    try:
-        response = agent(test_command)
-        print(response)
-    except Exception as e:
-        print(f"Error: {e}")
-    
-    print("\n" + "=" * 50)
+if session and resuming:
+    loaded = session.resume(agent, agent.conversation_manager.token_budget)
+    print(f"[OK] Resumed session {session.name}: {loaded} messages in {session.resume_ms:.1f}ms")
+elif session:
+    print(f"[INFO] Session log: {session.path} (resume with SESSION_RESUME={session.name})")
+
+# Main interaction loop (streams responses as they are generated)
+run_repl(agent, turn_metrics=turn_metrics, session=session, width=50, agent_factory=build_agent)
@@ -0,0 +1,194 @@
+"""
+Cursor pagination for the Confluence REST API.
+
+Confluence list endpoints return one page of results and a `_links.next`
+link to the rest. confluence_list_spaces used to request a single page of 50,
+and confluence_search_content a single page of 25, so anything beyond that was
+silently dropped. This module follows the next links lazily (only as far as
+the caller needs) and gives the model an opaque continuation cursor instead.
+
+The space list rarely changes, so SpaceDirectory caches it for
+CONFLUENCE_SPACE_TTL seconds. It grows the list one page at a time as callers
+ask for further spaces. Once the last page has been read, the total is known
+and every later listing within the TTL is served from memory.
+
+Configure with:
+    CONFLUENCE_PAGE_SIZE=100     results per request
+    CONFLUENCE_SPACE_TTL=600
+"""
+import base64
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from atlassian_http import CONFLUENCE_URL, get_confluence_auth_headers, atlassian_request
+
+
+PAGE_SIZE = int(os.getenv("CONFLUENCE_PAGE_SIZE", "100"))
+SEARCH_ENDPOINT = "/rest/api/content/search"
+
+
+def encode_cursor(next_link):
+    """Opaque cursor for a `_links.next` link (relative to /wiki)."""
+    return base64.urlsafe_b64encode(next_link.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, endpoint):
+    """
+    The next link a cursor stands for.
+
+    Args:
+        cursor: A cursor returned by encode_cursor
+        endpoint: Path the link must point at (e.g., "/rest/api/content/search")
+
+    Raises:
+        ValueError: if the cursor is malformed or points somewhere else
+    """
+    try:
+        link = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except Exception:
+        raise ValueError("invalid cursor")
+    if not link.startswith(endpoint):
+        raise ValueError("invalid cursor")
+    return link
+
+
+def fetch_page(path, params=None, site=None):
+    """
+    One page from a Confluence list endpoint.
+
+    Args:
+        path: Endpoint path relative to /wiki, optionally with a query string (a `_links.next` link)
+        params: Query parameters to add to (or replace in) the path's own
+        site: atlassian_sites.Site to query (default: CONFLUENCE_URL)
+
+    Returns:
+        (results, next link or None, raw response JSON)
+    """
+    parts = urlsplit(path)
+    query = {**dict(parse_qsl(parts.query)), **(params or {})}
+    base = site.confluence_url if site else CONFLUENCE_URL
+    headers = site.confluence_headers() if site else get_confluence_auth_headers()
+    response = atlassian_request("GET", f"{base}/wiki{parts.path}", headers=headers, params=query)
+    response.raise_for_status()
+    data = response.json()
+    if "results" not in data:
+        raise ValueError(f"unexpected response from {path}: {str(data)[:200]}")
+    return data["results"], (data.get("_links") or {}).get("next"), data
+
+
+def search_links(query, cursor=None, site_names=None):
+    """
+    Where a content search for query continues: {site name or None: link}.
+
+    Args:
+        query: The search text
+        cursor: A cursor from a previous call, or None for the first page
+        site_names: Names of the sites searched when there are several (see atlassian_sites), else None
+
+    Raises:
+        ValueError: if the cursor is malformed or from another kind of call
+    """
+    first = SEARCH_ENDPOINT + "?" + urlencode({"cql": f"text ~ \"{query}\""})
+    if not site_names:
+        return {None: decode_cursor(cursor, SEARCH_ENDPOINT) if cursor else first}
+    if not cursor:
+        return {name: first for name in site_names}
+    # Across sites the cursor holds each site's own next link
+    links = json.loads(decode_cursor(cursor, "{"))
+    if not all(str(link).startswith(SEARCH_ENDPOINT) for link in links.values()):
+        raise ValueError("invalid cursor")
+    return links
+
+
+def collect(link, limit, site=None):
+    """
+    Follow a list endpoint from link until limit results are collected.
+
+    Returns:
+        (results, totalSize or None, next link or None)
+    """
+    results, total = [], None
+    # Asking each page for only the remainder keeps the next link exactly at the next unseen result
+    while link and len(results) < limit:
+        page, link, data = fetch_page(link, {"limit": limit - len(results)}, site)
+        total = data.get("totalSize", total)
+        results.extend(page)
+        if not page:
+            break
+    return results, total, link
+
+
+class SpaceDirectory:
+    """
+    The Confluence space list, fetched lazily page by page and cached with a TTL.
+
+    Args:
+        ttl: Seconds the list is kept before it is fetched again from the start
+        page_size: Spaces per request
+    """
+
+    def __init__(self, ttl=600.0, page_size=PAGE_SIZE):
+        self.ttl = ttl
+        self.page_size = page_size
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+        self._reset()
+
+    def _reset(self):
+        self.spaces = []
+        self.next_link = f"/rest/api/space?limit={self.page_size}"
+        self.expires = time.monotonic() + self.ttl
+
+    @property
+    def complete(self):
+        return self.next_link is None
+
+    def slice(self, start, count):
+        """
+        Spaces [start, start + count), fetching further pages only if needed.
+
+        Returns:
+            (spaces, total or None while not all pages have been read, more spaces follow?)
+        """
+        with self.lock:
+            if time.monotonic() >= self.expires:
+                self._reset()
+            fetched = False
+            while len(self.spaces) < start + count and self.next_link:
+                results, self.next_link, _ = fetch_page(self.next_link)
+                self.requests += 1
+                fetched = True
+                self.spaces.extend(
+                    {"key": space["key"], "name": space["name"], "type": space["type"]} for space in results
+                )
+                if not results:
+                    self.next_link = None
+            if not fetched:
+                self.hits += 1
+            total = len(self.spaces) if self.complete else None
+            more = len(self.spaces) > start + count or not self.complete
+            return self.spaces[start:start + count], total, more
+
+    def stats(self):
+        with self.lock:
+            return {
+                "spaces_cached": len(self.spaces),
+                "complete": self.complete,
+                "requests": self.requests,
+                "hits": self.hits,
+            }
+
+
+_shared_directory = None
+
+
+def spaces():
+    """Return the process-wide SpaceDirectory."""
+    global _shared_directory
+    if _shared_directory is None:
+        _shared_directory = SpaceDirectory(ttl=float(os.getenv("CONFLUENCE_SPACE_TTL", "600")))
+    return _shared_directory
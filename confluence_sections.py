@@ -0,0 +1,279 @@
+"""
+Section-level retrieval within large Confluence pages.
+
+confluence_get_page returns a whole page, while the model usually needs one
+part of it. For our runbooks with 100+ sections that is an order of magnitude
+more text than necessary. confluence_get_page_sections does this instead:
+- splits the page's storage format into heading-delimited sections, each
+  with its heading path (e.g. "Database > Failover > Manual steps")
+- ranks the sections against a query locally with BM25, where heading words
+  count twice
+- returns only the top-k sections
+
+Without a query it returns the page outline (heading paths and sizes), so the
+model can pick the headings it wants to ask about.
+
+Split pages are cached in a ContentStore (CC_AGENT_CACHE_DIR/confluence_sections),
+keyed on page id and tagged with the version they were split from. A cached page is used as-is for
+CONFLUENCE_SECTION_TTL seconds. After that, one small request checks the
+current version number, and the body is downloaded and split again only if
+the page has changed.
+
+Configure with:
+    CONFLUENCE_SECTION_TTL=300
+    CONFLUENCE_SECTION_CACHE_MB=64
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from html.parser import HTMLParser
+
+import requests
+from strands import tool
+
+import atlassian_sites
+from atlassian_http import CONFLUENCE_URL, get_confluence_auth_headers, atlassian_request
+from content_store import CACHE_DIR, ContentStore
+from issue_index import STOPWORDS
+
+
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+BLOCK_TAGS = {"p", "div", "li", "tr", "br", "pre", "blockquote", "table", "ul", "ol", "ac:structured-macro"}
+MAX_SECTION_CHARS = 4000
+
+
+class _SectionSplitter(HTMLParser):
+    """Collect (heading level, heading text, body text) from Confluence storage format."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.sections = [[0, None, []]]
+        self.heading = None  # [level, text parts] while inside a heading
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HEADINGS:
+            self.heading = [HEADINGS[tag], []]
+        elif tag in BLOCK_TAGS:
+            self.sections[-1][2].append("\n")
+        elif tag in ("td", "th"):
+            self.sections[-1][2].append(" | ")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == "br":
+            self.sections[-1][2].append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in HEADINGS and self.heading is not None:
+            level, parts = self.heading
+            self.heading = None
+            self.sections.append([level, " ".join("".join(parts).split()), []])
+        elif tag in BLOCK_TAGS:
+            self.sections[-1][2].append("\n")
+
+    def handle_data(self, data):
+        (self.heading[1] if self.heading is not None else self.sections[-1][2]).append(data)
+
+    def unknown_decl(self, data):
+        # Code and no-format macros keep their body in CDATA
+        if data.startswith("CDATA["):
+            self.handle_data(data[len("CDATA["):])
+
+
+def _clean(parts):
+    lines = (" ".join(line.split()) for line in "".join(parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def split_sections(storage, title=""):
+    """
+    Split a page body into heading-delimited sections.
+
+    Args:
+        storage: The page's storage-format (XHTML) body
+        title: Page title, used as the heading of any text before the first heading
+
+    Returns:
+        List of {"path": [headings from the outermost down], "text": section text}
+    """
+    splitter = _SectionSplitter()
+    splitter.feed(storage or "")
+    splitter.close()
+    sections = []
+    stack = []  # (level, heading) of the enclosing headings
+    for level, heading, parts in splitter.sections:
+        if heading is not None:
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, heading))
+        text = _clean(parts)
+        if heading is None and not text:
+            continue
+        path = [name for _, name in stack] if heading is not None else [title or "(introduction)"]
+        sections.append({"path": path, "text": text})
+    return sections
+
+
+def _terms(text):
+    """Words plus adjacent word pairs, so "node 7 3" prefers sections with that exact sequence."""
+    words = [word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def rank_sections(sections, query, k1=1.2, b=0.75):
+    """
+    BM25 scores of sections against a query, with heading words counted twice.
+
+    Returns:
+        List of (score, section index), best first, sections without any query word left out
+    """
+    terms = set(_terms(query))
+    if not terms or not sections:
+        return []
+    documents = [Counter(_terms(" ".join(s["path"] * 2) + " " + s["text"])) for s in sections]
+    lengths = [sum(doc.values()) for doc in documents]
+    average = sum(lengths) / len(lengths) or 1.0
+    frequency = {term: sum(1 for doc in documents if term in doc) for term in terms}
+    scores = []
+    for i, (doc, length) in enumerate(zip(documents, lengths)):
+        score = 0.0
+        for term in terms:
+            tf = doc.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(documents) - frequency[term] + 0.5) / (frequency[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average))
+        if score > 0:
+            scores.append((score, i))
+    scores.sort(key=lambda item: (-item[0], item[1]))
+    return scores
+
+
+class SectionCache:
+    """
+    Split Confluence pages, cached per page version.
+
+    Args:
+        store: ContentStore holding the split pages
+        ttl: Seconds a cached page is used before its version is checked again
+    """
+
+    def __init__(self, store, ttl=300.0):
+        self.store = store
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.fetched = 0
+
+    def _fetch(self, page_id, expand, site=None):
+        base = site.confluence_url if site else CONFLUENCE_URL
+        headers = site.confluence_headers() if site else get_confluence_auth_headers()
+        response = atlassian_request("GET", f"{base}/wiki/rest/api/content/{page_id}", headers=headers,
+                                     params={"expand": expand})
+        response.raise_for_status()
+        return response.json()
+
+    def page(self, page_id, site=None):
+        """
+        The split page: {"id", "title", "version", "url", "sections"}.
+
+        Args:
+            page_id: The page ID
+            site: atlassian_sites.Site the page is on (default: CONFLUENCE_URL)
+
+        Raises:
+            requests.exceptions.HTTPError: if Confluence rejects a request
+        """
+        key = f"confluence_page:{site.name}:{page_id}" if site else f"confluence_page:{page_id}"
+        entry = self.store.get(key)
+        if entry is not None and entry.fresh():
+            with self.lock:
+                self.hits += 1
+            return json.loads(self.store.read(entry))
+        if entry is not None:
+            # Stale: compare versions with a request that leaves out the body
+            current = self._fetch(page_id, "version", site)["version"]["number"]
+            if current == entry.meta.get("version"):
+                self.store.update(key, expires=time.time() + self.ttl)
+                with self.lock:
+                    self.revalidated += 1
+                return json.loads(self.store.read(entry))
+        data = self._fetch(page_id, "body.storage,version", site)
+        page = {
+            "id": data["id"],
+            "title": data["title"],
+            "version": data["version"]["number"],
+            "url": f"{site.confluence_url if site else CONFLUENCE_URL}/wiki{data['_links']['webui']}",
+            "sections": split_sections(data["body"]["storage"]["value"], data["title"]),
+        }
+        self.store.put(key, json.dumps(page), meta={"version": page["version"]}, expires=time.time() + self.ttl)
+        with self.lock:
+            self.fetched += 1
+        return page
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "revalidated": self.revalidated, "fetched": self.fetched}
+
+
+_shared_cache = None
+
+
+def from_env():
+    """Return the process-wide SectionCache built from CONFLUENCE_SECTION_* settings."""
+    global _shared_cache
+    if _shared_cache is None:
+        max_bytes = int(float(os.getenv("CONFLUENCE_SECTION_CACHE_MB", "64")) * 1024 * 1024)
+        _shared_cache = SectionCache(
+            ContentStore(os.path.join(CACHE_DIR, "confluence_sections"), max_bytes),
+            ttl=float(os.getenv("CONFLUENCE_SECTION_TTL", "300")),
+        )
+    return _shared_cache
+
+
+@tool
+def confluence_get_page_sections(page_id: str, query: str = "", top_k: int = 3, site: str = None) -> str:
+    """
+    Get only the sections of a Confluence page that are relevant to a query.
+    Prefer this over confluence_get_page for long pages such as runbooks.
+    Without a query, returns the page outline (section heading paths and sizes).
+
+    Args:
+        page_id: The page ID
+        query: What you are looking for (e.g., "database failover manual steps")
+        top_k: Number of sections to return (default: 3)
+        site: Site tag from confluence_search_content, when several Atlassian sites are configured
+
+    Returns:
+        JSON with the page title, version and the best matching sections, each with its heading path
+    """
+    try:
+        page = from_env().page(page_id, atlassian_sites.get(site) if site else None)
+    except requests.exceptions.HTTPError as e:
+        return f"Error getting Confluence page (HTTP {e.response.status_code}): {e.response.text}"
+    except Exception as e:
+        return f"Error getting Confluence page: {str(e)}"
+
+    sections = page["sections"]
+    result = {key: page[key] for key in ("id", "title", "version", "url")}
+    result["sections_total"] = len(sections)
+    if not query.strip():
+        result["outline"] = [{"path": " > ".join(s["path"]), "chars": len(s["text"])} for s in sections]
+        return json.dumps(result, indent=2)
+
+    ranked = rank_sections(sections, query)
+    result["matched"] = len(ranked)
+    result["sections"] = []
+    for score, i in ranked[:max(1, top_k)]:
+        text = sections[i]["text"]
+        if len(text) > MAX_SECTION_CHARS:
+            text = text[:MAX_SECTION_CHARS] + f"\n... ({len(sections[i]['text']) - MAX_SECTION_CHARS} more chars)"
+        result["sections"].append({"path": " > ".join(sections[i]["path"]), "score": round(score, 2), "text": text})
+    if not ranked:
+        result["note"] = "No section mentions the query words; outline below"
+        result["outline"] = [" > ".join(s["path"]) for s in sections]
+    return json.dumps(result, indent=2)
@@ -0,0 +1,230 @@
+"""
+Content-addressed blob storage on disk with a size-bounded LRU index.
+
+Blobs are written once under <root>/blobs/<aa>/<sha256> and shared by every
+key that maps to the same bytes. A SQLite index maps cache keys to blobs plus
+a small JSON metadata record and an optional expiry. When the referenced
+bytes exceed max_bytes, the least recently used keys are dropped and blobs no
+key points to any more are deleted.
+
+SingleFlight collapses concurrent fills of the same key into one call; the
+other callers wait for (and share) the first caller's result.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+
+CACHE_DIR = os.getenv("CC_AGENT_CACHE_DIR", ".cc_agent_cache")
+
+
+class Entry:
+    """One key in a ContentStore."""
+
+    def __init__(self, key, digest, size, meta, created, expires):
+        self.key = key
+        self.digest = digest
+        self.size = size
+        self.meta = meta
+        self.created = created
+        self.expires = expires
+
+    def fresh(self, now=None):
+        return self.expires is not None and (now or time.time()) < self.expires
+
+
+class ContentStore:
+    """
+    Keyed, content-addressed blob store.
+
+    Args:
+        root: Directory holding the index and the blobs
+        max_bytes: Total size of referenced blobs kept before LRU eviction
+    """
+
+    def __init__(self, root, max_bytes=256 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, digest TEXT, size INTEGER, meta TEXT,"
+            " created REAL, expires REAL, last_access REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)")
+        self.db.commit()
+        self.evictions = 0
+
+    def path(self, digest):
+        """Filesystem path of a blob."""
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def get(self, key, touch=True):
+        """Return the Entry for key (marking it recently used), or None if absent or its blob is gone."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT digest, size, meta, created, expires FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if not os.path.exists(self.path(row[0])):
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.db.commit()
+                return None
+            if touch:
+                self.db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+                self.db.commit()
+        return Entry(key, row[0], row[1], json.loads(row[2]), row[3], row[4])
+
+    def read(self, entry):
+        """Return the bytes of an entry's blob."""
+        with open(self.path(entry.digest), "rb") as f:
+            return f.read()
+
+    def put(self, key, data, meta=None, expires=None):
+        """
+        Store bytes under key, reusing an identical blob if one exists.
+
+        Args:
+            key: Cache key
+            data: Blob contents (bytes or str)
+            meta: JSON-serialisable metadata kept with the key
+            expires: Absolute time after which the entry is stale (None: no expiry)
+
+        Returns:
+            The stored Entry
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, digest, len(data), json.dumps(meta or {}), now, expires, now),
+            )
+            self.db.commit()
+        self._evict()
+        return Entry(key, digest, len(data), meta or {}, now, expires)
+
+    def update(self, key, meta=None, expires=None):
+        """Replace an entry's metadata and expiry without touching its blob."""
+        with self.lock:
+            if meta is not None:
+                self.db.execute("UPDATE entries SET meta = ? WHERE key = ?", (json.dumps(meta), key))
+            self.db.execute("UPDATE entries SET expires = ?, last_access = ? WHERE key = ?", (expires, time.time(), key))
+            self.db.commit()
+
+    def delete(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT digest FROM entries WHERE key = ?", (key,)).fetchone()
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.db.commit()
+            if row:
+                self._drop_blob_if_unused(row[0])
+
+    def _drop_blob_if_unused(self, digest):
+        if self.db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+            try:
+                os.remove(self.path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _total_bytes(self):
+        return self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+        ).fetchone()[0]
+
+    def _evict(self):
+        with self.lock:
+            while self._total_bytes() > self.max_bytes:
+                row = self.db.execute("SELECT key, digest FROM entries ORDER BY last_access LIMIT 1").fetchone()
+                if row is None:
+                    break
+                self.db.execute("DELETE FROM entries WHERE key = ?", (row[0],))
+                self._drop_blob_if_unused(row[1])
+                self.evictions += 1
+            self.db.commit()
+
+    def stats(self):
+        with self.lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            blobs = self.db.execute("SELECT COUNT(DISTINCT digest) FROM entries").fetchone()[0]
+            total = self._total_bytes()
+        return {
+            "entries": entries,
+            "blobs": blobs,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class SingleFlight:
+    """Run at most one fill per key at a time; concurrent callers for the same key share its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def _begin(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if isinstance(error, asyncio.CancelledError):
+            # Waiters were not cancelled themselves; give them an ordinary error instead
+            error = TimeoutError("The identical request this call was waiting on was cancelled")
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        """Call fn() for key, or wait for the call already in flight (blocking)."""
+        future, leader = self._begin(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key, fn):
+        """Await fn() for key, or await the call already in flight (from any thread or event loop)."""
+        future, leader = self._begin(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
@@ -0,0 +1,200 @@
+"""
+Bounded conversation memory for long-running agents.
+
+BudgetConversationManager keeps an agent's history under a token budget:
+1. old, large tool results are replaced with short stubs
+2. if still over budget, older turns are summarized (or dropped, with the
+   "window" strategy) by delegating to the strands managers
+
+Configure from the environment with from_env():
+    CONTEXT_TOKEN_BUDGET=24000
+    CONTEXT_STRATEGY=summarize        # summarize | window | stub
+    CONTEXT_KEEP_TOOL_RESULTS=2       # most recent tool results kept verbatim
+"""
+import json
+import os
+import logging
+
+from strands.agent.conversation_manager import (
+    ConversationManager,
+    SlidingWindowConversationManager,
+    SummarizingConversationManager,
+)
+
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+MEDIA_TOKEN_ESTIMATE = 1600
+STUB_PREFIX = "[Elided"
+STRATEGIES = ("summarize", "window", "stub")
+
+
+def _block_chars(block):
+    """Approximate the serialized size of one content block in characters."""
+    if "text" in block:
+        return len(block["text"])
+    if "toolResult" in block:
+        return 40 + sum(_block_chars(item) for item in block["toolResult"].get("content", []))
+    if "toolUse" in block:
+        return 40 + len(json.dumps(block["toolUse"].get("input", {}), default=str))
+    if "json" in block:
+        return len(json.dumps(block["json"], default=str))
+    if "image" in block or "document" in block or "video" in block:
+        return MEDIA_TOKEN_ESTIMATE * CHARS_PER_TOKEN
+    return len(json.dumps(block, default=str))
+
+
+def estimate_tokens(messages):
+    """
+    Cheaply estimate how many input tokens a message list will cost.
+
+    Args:
+        messages: strands Messages (list of {"role", "content"} dicts)
+
+    Returns:
+        Estimated token count (characters / 4, with a flat cost for images/documents)
+    """
+    chars = sum(_block_chars(block) for message in messages for block in message.get("content", []))
+    return chars // CHARS_PER_TOKEN
+
+
+class BudgetConversationManager(ConversationManager):
+    """
+    Keep conversation history under a token budget.
+
+    Args:
+        token_budget: Target upper bound for the estimated history size, in tokens
+        strategy: "summarize" to summarize older turns, "window" to drop them, "stub" to only elide tool results
+        keep_recent_tool_results: Number of most recent tool results never stubbed
+        stub_min_chars: Tool results shorter than this are left alone
+        preserve_recent_messages: Messages always kept verbatim by the summarize/window strategies
+        summary_ratio: Fraction of older messages summarized per reduction (summarize strategy)
+    """
+
+    def __init__(
+        self,
+        token_budget=24000,
+        strategy="summarize",
+        keep_recent_tool_results=2,
+        stub_min_chars=500,
+        preserve_recent_messages=8,
+        summary_ratio=0.4,
+    ):
+        super().__init__()
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown context strategy '{strategy}', expected one of {', '.join(STRATEGIES)}")
+        self.token_budget = token_budget
+        self.strategy = strategy
+        self.keep_recent_tool_results = keep_recent_tool_results
+        self.stub_min_chars = stub_min_chars
+        self.stubbed_results = 0
+        self.reductions = 0
+        if strategy == "summarize":
+            self._delegate = SummarizingConversationManager(
+                summary_ratio=summary_ratio, preserve_recent_messages=preserve_recent_messages
+            )
+        elif strategy == "window":
+            self._delegate = SlidingWindowConversationManager(
+                window_size=preserve_recent_messages, should_truncate_results=False
+            )
+        else:
+            self._delegate = None
+
+    def apply_management(self, agent, **kwargs):
+        """Bring the history back under budget after each turn."""
+        if estimate_tokens(agent.messages) <= self.token_budget:
+            return
+        self._stub_tool_results(agent.messages, self.keep_recent_tool_results)
+        self._reduce_until(agent, lambda: estimate_tokens(agent.messages) <= self.token_budget)
+
+    def reduce_context(self, agent, e=None, **kwargs):
+        """
+        Shrink history on a context overflow (e set) or proactive request.
+
+        Stubbing every tool result but the latest is tried first; only if that frees
+        nothing is the configured strategy applied.
+        """
+        if self._stub_tool_results(agent.messages, 1):
+            return
+        if self._delegate is None:
+            if e is not None:
+                raise e
+            return
+        before = len(agent.messages)
+        self._delegate_reduce(agent, e)
+        if e is not None and len(agent.messages) >= before:
+            raise e
+
+    def _reduce_until(self, agent, satisfied, max_rounds=10):
+        if self._delegate is None:
+            return
+        for _ in range(max_rounds):
+            if satisfied():
+                return
+            before = len(agent.messages)
+            try:
+                self._delegate_reduce(agent, None)
+            except Exception as e:
+                logger.debug("context reduction stopped: %s", e)
+                return
+            if len(agent.messages) >= before:
+                return
+
+    def _delegate_reduce(self, agent, e):
+        removed_before = self._delegate.removed_message_count
+        self._delegate.reduce_context(agent, e)
+        self.removed_message_count += self._delegate.removed_message_count - removed_before
+        self.reductions += 1
+
+    def _stub_tool_results(self, messages, keep_recent):
+        """
+        Replace large tool results with a short stub, newest `keep_recent` excluded.
+
+        Returns:
+            Number of tool results stubbed
+        """
+        tool_names = {}
+        positions = []
+        for message in messages:
+            for block in message.get("content", []):
+                if "toolUse" in block:
+                    tool_names[block["toolUse"]["toolUseId"]] = block["toolUse"]["name"]
+                elif "toolResult" in block:
+                    positions.append(block["toolResult"])
+
+        stubbed = 0
+        candidates = positions[:-keep_recent] if keep_recent else positions
+        for result in candidates:
+            content = result.get("content", [])
+            size = sum(_block_chars(item) for item in content)
+            if size < self.stub_min_chars or (content and content[0].get("text", "").startswith(STUB_PREFIX)):
+                continue
+            preview = " ".join(
+                " ".join(item["text"].split()) for item in content if "text" in item
+            )[:200]
+            name = tool_names.get(result.get("toolUseId"), "tool")
+            result["content"] = [{
+                "text": f"{STUB_PREFIX} {name} result: {size} chars. Call the tool again if you need it.] {preview}"
+            }]
+            stubbed += 1
+        self.stubbed_results += stubbed
+        return stubbed
+
+    def get_state(self):
+        state = super().get_state()
+        state["stubbed_results"] = self.stubbed_results
+        return state
+
+    def restore_from_session(self, state):
+        self.stubbed_results = state.get("stubbed_results", 0)
+        return super().restore_from_session(state)
+
+
+def from_env():
+    """Build a BudgetConversationManager from CONTEXT_* environment variables."""
+    return BudgetConversationManager(
+        token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "24000")),
+        strategy=os.getenv("CONTEXT_STRATEGY", "summarize"),
+        keep_recent_tool_results=int(os.getenv("CONTEXT_KEEP_TOOL_RESULTS", "2")),
+    )
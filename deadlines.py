@@ -0,0 +1,170 @@
+"""
+Turn budgets and per-tool deadlines.
+
+A turn gets a latency budget (TURN_BUDGET_S). TurnBudget, a hook provider,
+starts the clock when the turn starts and gives every tool call a deadline:
+the earlier of its own timeout (TOOL_TIMEOUTS, by tool class or name) and the
+end of the turn budget.
+
+- The deadline is enforced around the call: when it passes, the call is
+  cancelled and the model receives a structured timeout result instead of
+  waiting forever on a hung request.
+- The deadline is also published in a context variable, so code running inside
+  the tool (atlassian_request) can size its own socket and queue timeouts.
+- Tool calls requested after the budget is spent are cancelled up front.
+
+Configure with:
+    TURN_BUDGET_S=120
+    TOOL_TIMEOUTS=atlassian=30,web=30,io=10,default=60,generate_image=120
+"""
+import asyncio
+import contextvars
+import json
+import os
+import time
+import weakref
+
+from strands.hooks import HookProvider, HookRegistry, BeforeInvocationEvent, BeforeToolCallEvent
+
+from tool_executor import ProxyTool, run_tool, tool_class, tool_result, parse_pairs
+
+
+DEFAULT_TURN_BUDGET_S = 120.0
+DEFAULT_TOOL_TIMEOUTS = {"atlassian": 30, "web": 30, "io": 10, "default": 60, "generate_image": 120,
+                         "jira_aggregate": 120, "jira_bulk_update": 120,
+                         "jira_download_attachments": 300}
+
+# Absolute time.monotonic() deadline of the tool call running in this context (None outside tool calls)
+current_deadline = contextvars.ContextVar("current_deadline", default=None)
+
+TIMEOUT_MARKER = "tool_timeout"
+
+
+def remaining(default=None):
+    """Seconds left before the current tool call's deadline, or `default` when no deadline is set."""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return default
+    return max(0.0, deadline - time.monotonic())
+
+
+def timeout_result(tool_use_id, tool_name, reason, timeout_s, elapsed_s):
+    """
+    Build the tool result returned to the model when a call runs out of time.
+
+    Args:
+        tool_use_id: ID of the tool use being answered
+        tool_name: Name of the tool
+        reason: "tool_timeout" or "turn_budget_exhausted"
+        timeout_s: Time the call was allowed
+        elapsed_s: Time actually spent
+
+    Returns:
+        An error ToolResult whose text is a JSON object
+    """
+    hint = (
+        "The tool did not answer in time. Try narrower arguments or a different tool."
+        if reason == "tool_timeout"
+        else "The time budget for this turn is spent. Answer with the information you already have."
+    )
+    payload = {
+        "error": TIMEOUT_MARKER,
+        "reason": reason,
+        "tool": tool_name,
+        "timeout_s": round(timeout_s, 2),
+        "elapsed_s": round(elapsed_s, 2),
+        "hint": hint,
+    }
+    return tool_result(tool_use_id, json.dumps(payload), "error")
+
+
+def timeout_reason(result):
+    """Return the timeout reason recorded in a tool result, or None if it is not a timeout result."""
+    if not result or result.get("status") != "error":
+        return None
+    for block in result.get("content", []):
+        text = block.get("text", "")
+        if TIMEOUT_MARKER in text:
+            try:
+                return json.loads(text).get("reason")
+            except ValueError:
+                return None
+    return None
+
+
+class DeadlineTool(ProxyTool):
+    """Run a tool under a deadline, returning a timeout result when it passes."""
+
+    def __init__(self, delegate, deadline, timeout_s, reason):
+        super().__init__(delegate)
+        self.deadline = deadline
+        self.timeout_s = timeout_s
+        self.reason = reason
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        started = time.monotonic()
+        token = current_deadline.set(self.deadline)
+        try:
+            yield await asyncio.wait_for(
+                run_tool(self.delegate, tool_use, invocation_state, **kwargs),
+                max(0.0, self.deadline - started),
+            )
+        except asyncio.TimeoutError:
+            yield timeout_result(
+                tool_use["toolUseId"], self.tool_name, self.reason, self.timeout_s, time.monotonic() - started
+            )
+        finally:
+            current_deadline.reset(token)
+
+
+class TurnBudget(HookProvider):
+    """
+    Give every tool call a deadline derived from its timeout and the turn budget.
+
+    Args:
+        budget_s: Latency budget for a whole turn (None or 0 disables the turn limit)
+        tool_timeouts: Seconds per tool class or tool name; names take precedence
+    """
+
+    def __init__(self, budget_s=DEFAULT_TURN_BUDGET_S, tool_timeouts=None):
+        self.budget_s = budget_s
+        self.tool_timeouts = {**DEFAULT_TOOL_TIMEOUTS, **(tool_timeouts or {})}
+        self._turn_deadlines = weakref.WeakKeyDictionary()
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._on_turn_start)
+        registry.add_callback(BeforeToolCallEvent, self._on_tool_call)
+
+    def timeout_for(self, tool_name):
+        timeouts = self.tool_timeouts
+        return float(timeouts.get(tool_name, timeouts.get(tool_class(tool_name), timeouts["default"])))
+
+    def _on_turn_start(self, event: BeforeInvocationEvent) -> None:
+        if self.budget_s:
+            self._turn_deadlines[event.agent] = time.monotonic() + self.budget_s
+        else:
+            self._turn_deadlines.pop(event.agent, None)
+
+    def _on_tool_call(self, event: BeforeToolCallEvent) -> None:
+        tool = event.selected_tool
+        if tool is None or isinstance(tool, DeadlineTool):
+            return
+        now = time.monotonic()
+        timeout_s = self.timeout_for(tool.tool_name)
+        deadline, reason = now + timeout_s, "tool_timeout"
+        turn_deadline = self._turn_deadlines.get(event.agent)
+        if turn_deadline is not None and turn_deadline < deadline:
+            deadline, reason = turn_deadline, "turn_budget_exhausted"
+            if deadline <= now:
+                result = timeout_result(event.tool_use["toolUseId"], tool.tool_name, reason, 0.0, 0.0)
+                event.cancel_tool = result["content"][0]["text"]
+                return
+        event.selected_tool = DeadlineTool(tool, deadline, deadline - now, reason)
+
+
+def from_env():
+    """Build a TurnBudget from TURN_BUDGET_S and TOOL_TIMEOUTS."""
+    return TurnBudget(
+        float(os.getenv("TURN_BUDGET_S", str(DEFAULT_TURN_BUDGET_S))),
+        parse_pairs(os.getenv("TOOL_TIMEOUTS"), float),
+    )
@@ -0,0 +1,517 @@
+"""
+Local stand-ins for Bedrock and Atlassian, for exercising the agents offline.
+
+- FakeModel: a strands Model that plans tool calls from keywords in the prompt
+  and answers from the tool results, with configurable latency.
+- A stand-in Jira/Confluence REST server with synthetic data, covering the
+  endpoints used by the direct API tools.
+
+Run the stand-in Atlassian server on its own:
+    python fake_services.py --port 8081
+then point JIRA_URL and CONFLUENCE_URL at http://127.0.0.1:8081.
+"""
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from strands.models.model import Model
+
+
+# ============= FAKE MODEL =============
+
+def default_tool_plan(prompt):
+    """
+    Map a user prompt to the tool calls the fake model should make.
+
+    Args:
+        prompt: The latest user prompt text
+
+    Returns:
+        List of (tool_name, input) pairs, emitted together in one assistant message
+    """
+    text = prompt.lower()
+    plan = []
+    issue_keys = re.findall(r"\b[A-Z][A-Z0-9]+-\d+\b", prompt)
+    for key in issue_keys:
+        plan.append(("jira_get_issue", {"issue_key": key}))
+    if not issue_keys and ("issue" in text or "jira" in text):
+        plan.append(("jira_search_issues", {"jql": "assignee = currentUser() AND status != Done", "max_results": 10}))
+    if "space" in text:
+        plan.append(("confluence_list_spaces", {}))
+    for page_id in re.findall(r"\bpage (\d+)\b", text):
+        plan.append(("confluence_get_page", {"page_id": page_id}))
+    if "time" in text or "date" in text:
+        plan.append(("get_current_datetime", {}))
+    return plan
+
+
+class FakeModel(Model):
+    """
+    A scripted model that speaks the strands streaming protocol.
+
+    On a fresh user prompt it emits the tool calls returned by `tool_plan`; once
+    tool results come back it answers with a short digest of them.
+    """
+
+    def __init__(self, tool_plan=None, latency=0.05, chunk_delay=0.0, **config):
+        """
+        Args:
+            tool_plan: Callable mapping a prompt to [(tool_name, input), ...] (default: keyword based)
+            latency: Seconds to wait before the first streamed chunk (simulated prefill)
+            chunk_delay: Seconds to wait between streamed text chunks
+            **config: Stored and returned by get_config()
+        """
+        self.tool_plan = tool_plan or default_tool_plan
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.config = {"model_id": "fake-model", **config}
+
+    def update_config(self, **model_config):
+        self.config.update(model_config)
+
+    def get_config(self):
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        # No model to fill the fields: the instance only has the pydantic model's defaults
+        await asyncio.sleep(self.latency)
+        yield {"output": output_model.model_construct()}
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        input_tokens = len(json.dumps(messages, default=str)) // 4
+        if system_prompt:
+            input_tokens += len(system_prompt) // 4
+        available = {spec["name"] for spec in tool_specs or []}
+
+        last = messages[-1] if messages else {"content": []}
+        tool_results = [block["toolResult"] for block in last.get("content", []) if "toolResult" in block]
+
+        yield {"messageStart": {"role": "assistant"}}
+        if tool_results:
+            text = self._digest(tool_results)
+            calls = []
+        else:
+            prompt = " ".join(block.get("text", "") for block in last.get("content", []))
+            calls = [(name, args) for name, args in self.tool_plan(prompt) if name in available]
+            text = "" if calls else f"You said: {prompt.strip()}"
+
+        output_tokens = 0
+        if text:
+            yield {"contentBlockStart": {"start": {}}}
+            for chunk in re.findall(r"\S+\s*", text):
+                if self.chunk_delay:
+                    await asyncio.sleep(self.chunk_delay)
+                output_tokens += 1
+                yield {"contentBlockDelta": {"delta": {"text": chunk}}}
+            yield {"contentBlockStop": {}}
+
+        for name, args in calls:
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": f"tooluse_{uuid.uuid4().hex[:12]}", "name": name}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(args)}}}}
+            yield {"contentBlockStop": {}}
+            output_tokens += 10
+
+        yield {"messageStop": {"stopReason": "tool_use" if calls else "end_turn"}}
+        yield {
+            "metadata": {
+                "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens, "totalTokens": input_tokens + output_tokens},
+                "metrics": {"latencyMs": int(self.latency * 1000)},
+            }
+        }
+
+    @staticmethod
+    def _digest(tool_results):
+        """Summarize tool results in a sentence per tool."""
+        lines = []
+        for result in tool_results:
+            texts = []
+            for block in result.get("content", []):
+                if "text" in block:
+                    texts.append(block["text"])
+                elif "json" in block:
+                    texts.append(json.dumps(block["json"]))
+            body = " ".join(" ".join(texts).split())
+            lines.append(f"[{result.get('status', 'success')}] {body[:160]}")
+        return "Here is what I found:\n" + "\n".join(lines)
+
+
+# ============= STAND-IN ATLASSIAN SERVER =============
+
+STATUSES = ["To Do", "In Progress", "In Review", "Done"]
+PRIORITIES = ["Highest", "High", "Medium", "Low"]
+ASSIGNEES = ["Ada Lovelace", "Alan Turing", "Grace Hopper", None]
+ISSUE_TYPES = ["Task", "Bug", "Story"]
+
+
+class FakeAtlassianData:
+    """In-memory Jira issues and Confluence spaces/pages with deterministic content."""
+
+    def __init__(self, issue_count=120, space_count=8, page_count=30):
+        self.lock = threading.Lock()
+        base = datetime(2026, 1, 5, 9, 0, 0)
+        self.issues = {}
+        for n in range(1, issue_count + 1):
+            key = f"DEMO-{n}"
+            created = base + timedelta(hours=7 * n)
+            self.issues[key] = {
+                "id": str(10000 + n),
+                "key": key,
+                "fields": {
+                    "summary": f"Synthetic issue {n}: {['login fails', 'slow dashboard', 'export broken', 'update docs'][n % 4]}",
+                    "description": f"Steps to reproduce issue {n}. " * 3,
+                    "status": {"name": STATUSES[n % len(STATUSES)]},
+                    "priority": {"name": PRIORITIES[n % len(PRIORITIES)]},
+                    "assignee": {"displayName": ASSIGNEES[n % len(ASSIGNEES)]} if ASSIGNEES[n % len(ASSIGNEES)] else None,
+                    "reporter": {"displayName": "Reporter Bot"},
+                    "issuetype": {"name": ISSUE_TYPES[n % len(ISSUE_TYPES)]},
+                    "created": created.strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+                    "updated": (created + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+                    "comment": {"comments": []},
+                    "attachment": [],
+                },
+            }
+        # Every tenth issue has a log attachment, served from /rest/api/3/attachment/content/<id>
+        self.attachments = {}
+        for n in range(10, issue_count + 1, 10):
+            attachment_id = str(20000 + n)
+            content = "".join(f"{n:06d} line {i}: service-{n % 7} heartbeat ok\n" for i in range(8000)).encode()
+            self.attachments[attachment_id] = content
+            self.issues[f"DEMO-{n}"]["fields"]["attachment"].append({
+                "id": attachment_id,
+                "filename": f"service-{n}.log",
+                "size": len(content),
+                "mimeType": "text/plain",
+                "content": f"/rest/api/3/attachment/content/{attachment_id}",
+            })
+        self.spaces = [
+            {"id": 100 + n, "key": f"SP{n}", "name": f"Space {n}", "type": "global"}
+            for n in range(1, space_count + 1)
+        ]
+        self.pages = {}
+        for n in range(1, page_count + 1):
+            page_id = str(5000 + n)
+            sections = "".join(
+                f"<h2>Section {s}</h2><p>Runbook step {s} for page {n}: restart service-{s} and check logs.</p>"
+                for s in range(1, 6)
+            )
+            self.pages[page_id] = {
+                "id": page_id,
+                "type": "page",
+                "title": f"Runbook {n}",
+                "space": {"key": self.spaces[n % len(self.spaces)]["key"]},
+                "version": {"number": 1},
+                "body": {"storage": {"value": sections, "representation": "storage"}},
+                "_links": {"webui": f"/spaces/{self.spaces[n % len(self.spaces)]['key']}/pages/{page_id}"},
+            }
+
+    def touch(self, key):
+        """Bump an issue's updated timestamp after a write."""
+        self.issues[key]["fields"]["updated"] = datetime.now().strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+
+def _adf_text(doc):
+    """Flatten an Atlassian Document Format body to plain text."""
+    if isinstance(doc, str):
+        return doc
+    parts = []
+    for node in doc.get("content", []):
+        if node.get("type") == "text":
+            parts.append(node.get("text", ""))
+        else:
+            parts.append(_adf_text(node))
+    return "".join(parts)
+
+
+def _match_jql(issue, jql):
+    """Apply the handful of JQL clauses the stand-in understands (key in, status, assignee, project)."""
+    fields = issue["fields"]
+    keys = re.search(r"key\s+in\s*\(([^)]*)\)", jql, re.I)
+    if keys and issue["key"] not in [k.strip().strip('"') for k in keys.group(1).split(",")]:
+        return False
+    for op, value in re.findall(r"status\s*(!=|=)\s*\"?([\w ]+?)\"?(?:\s+AND|\s+ORDER|$)", jql, re.I):
+        equal = fields["status"]["name"].lower() == value.strip().lower()
+        if (op == "=") != equal:
+            return False
+    text = re.search(r"text\s*~\s*\"([^\"]+)\"", jql, re.I)
+    if text and text.group(1).lower() not in (fields["summary"] + " " + fields["description"]).lower():
+        return False
+    return True
+
+
+class FixedWindowThrottle:
+    """Reject requests beyond `max_rps` per one-second window, like Atlassian's 429 responses."""
+
+    def __init__(self, max_rps):
+        self.max_rps = max_rps
+        self.lock = threading.Lock()
+        self.window = 0
+        self.count = 0
+        self.rejected = 0
+
+    def check(self):
+        """Return None if the request may proceed, otherwise the headers for a 429 response."""
+        with self.lock:
+            now = time.time()
+            if int(now) != self.window:
+                self.window, self.count = int(now), 0
+            self.count += 1
+            remaining = max(0, self.max_rps - self.count)
+            headers = {
+                "X-RateLimit-Limit": str(self.max_rps),
+                "X-RateLimit-Remaining": str(remaining),
+                "X-RateLimit-Reset": datetime.fromtimestamp(self.window + 1, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+            if self.count <= self.max_rps:
+                return None
+            self.rejected += 1
+            headers["Retry-After"] = "1"
+            return headers
+
+
+def make_handler(data, latency=0.0, throttle=None):
+    """Build a request handler class bound to a data set."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, headers=None):
+            payload = json.dumps(body).encode() if not isinstance(body, bytes) else body
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _route(self, method):
+            if latency:
+                time.sleep(latency)
+            if throttle is not None:
+                limited = throttle.check()
+                if limited is not None:
+                    if method != "GET":
+                        self._body()  # drain the request body so the connection stays usable
+                    return self._send(429, {"errorMessages": ["Rate limit exceeded"]}, limited)
+            parsed = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+            path = parsed.path.rstrip("/")
+            for pattern, handler_method, name in ROUTES:
+                match = re.fullmatch(pattern, path)
+                if match and handler_method == method:
+                    return getattr(self, name)(query, *match.groups())
+            return self._send(404, {"errorMessages": [f"No route for {method} {path}"]})
+
+        def do_GET(self):
+            self._route("GET")
+
+        def do_POST(self):
+            self._route("POST")
+
+        def do_PUT(self):
+            self._route("PUT")
+
+        # ----- Jira -----
+
+        def search(self, query):
+            jql = query.get("jql", "")
+            max_results = int(query.get("maxResults", 50))
+            start = int(query.get("nextPageToken") or query.get("startAt") or 0)
+            with data.lock:
+                matches = [issue for issue in data.issues.values() if _match_jql(issue, jql)]
+            page = matches[start:start + max_results]
+            body = {"issues": page, "isLast": start + max_results >= len(matches)}
+            if not body["isLast"]:
+                body["nextPageToken"] = str(start + max_results)
+            return self._send(200, body)
+
+        def get_issue(self, query, key):
+            with data.lock:
+                issue = data.issues.get(key)
+            if issue is None:
+                return self._send(404, {"errorMessages": ["Issue does not exist or you do not have permission to see it."]})
+            attachments = [
+                {**attachment, "content": f"http://{self.headers.get('Host')}{attachment['content']}"}
+                for attachment in issue["fields"].get("attachment", [])
+            ]
+            return self._send(200, {**issue, "fields": {**issue["fields"], "attachment": attachments}})
+
+        def get_attachment(self, query, attachment_id):
+            content = data.attachments.get(attachment_id)
+            if content is None:
+                return self._send(404, {"errorMessages": ["Attachment not found"]})
+            match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+            if match and int(match.group(1)) < len(content):
+                start = int(match.group(1))
+                headers = {"Content-Range": f"bytes {start}-{len(content) - 1}/{len(content)}"}
+                return self._send(206, content[start:], headers)
+            return self._send(200, content)
+
+        def create_issue(self, query):
+            fields = self._body()["fields"]
+            with data.lock:
+                n = len(data.issues) + 1
+                key = f"{fields['project']['key']}-{n}"
+                now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+                data.issues[key] = {
+                    "id": str(10000 + n),
+                    "key": key,
+                    "fields": {
+                        "summary": fields["summary"],
+                        "description": _adf_text(fields.get("description", "")),
+                        "status": {"name": "To Do"},
+                        "priority": {"name": "Medium"},
+                        "assignee": None,
+                        "reporter": {"displayName": "Reporter Bot"},
+                        "issuetype": fields.get("issuetype", {"name": "Task"}),
+                        "created": now,
+                        "updated": now,
+                        "comment": {"comments": []},
+                    },
+                }
+            return self._send(201, {"id": str(10000 + n), "key": key})
+
+        def update_issue(self, query, key):
+            fields = self._body().get("fields", {})
+            with data.lock:
+                if key not in data.issues:
+                    return self._send(404, {"errorMessages": ["Issue does not exist"]})
+                if "summary" in fields:
+                    data.issues[key]["fields"]["summary"] = fields["summary"]
+                if "description" in fields:
+                    data.issues[key]["fields"]["description"] = _adf_text(fields["description"])
+                data.touch(key)
+            return self._send(204, b"")
+
+        def get_transitions(self, query, key):
+            return self._send(200, {"transitions": [
+                {"id": str(i + 11), "name": name, "to": {"name": name}} for i, name in enumerate(STATUSES)
+            ]})
+
+        def do_transition(self, query, key):
+            transition_id = int(self._body()["transition"]["id"])
+            with data.lock:
+                if key not in data.issues:
+                    return self._send(404, {"errorMessages": ["Issue does not exist"]})
+                data.issues[key]["fields"]["status"] = {"name": STATUSES[transition_id - 11]}
+                data.touch(key)
+            return self._send(204, b"")
+
+        def add_comment(self, query, key):
+            body = _adf_text(self._body()["body"])
+            with data.lock:
+                if key not in data.issues:
+                    return self._send(404, {"errorMessages": ["Issue does not exist"]})
+                comments = data.issues[key]["fields"]["comment"]["comments"]
+                comments.append({"id": str(len(comments) + 1), "body": body})
+                data.touch(key)
+            return self._send(201, {"id": str(len(comments))})
+
+        # ----- Confluence -----
+
+        def list_spaces(self, query):
+            limit = int(query.get("limit", 25))
+            start = int(query.get("start", 0))
+            page = data.spaces[start:start + limit]
+            links = {"base": f"http://{self.headers.get('Host')}/wiki"}
+            if start + limit < len(data.spaces):
+                links["next"] = f"/rest/api/space?limit={limit}&start={start + limit}"
+            return self._send(200, {"results": page, "start": start, "limit": limit, "size": len(page), "_links": links})
+
+        def search_content(self, query):
+            cql = query.get("cql", "")
+            limit = int(query.get("limit", 25))
+            start = int(query.get("start", 0))
+            term = re.search(r"text\s*~\s*\"([^\"]*)\"", cql)
+            needle = term.group(1).lower() if term else ""
+            with data.lock:
+                matches = [
+                    page for page in data.pages.values()
+                    if needle in (page["title"] + " " + page["body"]["storage"]["value"]).lower()
+                ]
+            page = [{k: v for k, v in item.items() if k != "body"} for item in matches[start:start + limit]]
+            links = {"base": f"http://{self.headers.get('Host')}/wiki"}
+            if start + limit < len(matches):
+                links["next"] = f"/rest/api/content/search?cql={cql}&limit={limit}&start={start + limit}"
+            return self._send(200, {"results": page, "start": start, "limit": limit, "size": len(page),
+                                    "totalSize": len(matches), "_links": links})
+
+        def get_page(self, query, page_id):
+            with data.lock:
+                page = data.pages.get(page_id)
+            if page is None:
+                return self._send(404, {"message": f"No content found with id: {page_id}"})
+            return self._send(200, page)
+
+    ROUTES = [
+        (r"/rest/api/3/search/jql", "GET", "search"),
+        (r"/rest/api/3/issue", "POST", "create_issue"),
+        (r"/rest/api/3/issue/([A-Z][A-Z0-9]*-\d+)", "GET", "get_issue"),
+        (r"/rest/api/3/issue/([A-Z][A-Z0-9]*-\d+)", "PUT", "update_issue"),
+        (r"/rest/api/3/issue/([A-Z][A-Z0-9]*-\d+)/transitions", "GET", "get_transitions"),
+        (r"/rest/api/3/issue/([A-Z][A-Z0-9]*-\d+)/transitions", "POST", "do_transition"),
+        (r"/rest/api/3/issue/([A-Z][A-Z0-9]*-\d+)/comment", "POST", "add_comment"),
+        (r"/rest/api/3/attachment/content/(\d+)", "GET", "get_attachment"),
+        (r"/wiki/rest/api/space", "GET", "list_spaces"),
+        (r"/wiki/rest/api/content/search", "GET", "search_content"),
+        (r"/wiki/rest/api/content/(\d+)", "GET", "get_page"),
+    ]
+
+    return Handler
+
+
+def start_fake_atlassian(host="127.0.0.1", port=0, latency=0.0, data=None, max_rps=None):
+    """
+    Start the stand-in Atlassian server on a background thread.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        latency: Seconds of artificial delay added to every request
+        data: Optional FakeAtlassianData instance to serve
+        max_rps: Optional requests-per-second limit; excess requests get 429 + Retry-After
+
+    Returns:
+        (server, base_url) - call server.shutdown() to stop it; server.throttle holds the throttle (or None)
+    """
+    throttle = FixedWindowThrottle(max_rps) if max_rps else None
+    server = ThreadingHTTPServer((host, port), make_handler(data or FakeAtlassianData(), latency, throttle))
+    server.throttle = throttle
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in Jira/Confluence REST server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of delay per request")
+    parser.add_argument("--issues", type=int, default=120, help="Number of synthetic Jira issues")
+    parser.add_argument("--max-rps", type=int, default=None, help="Answer 429 above this many requests per second")
+    args = parser.parse_args()
+
+    server, base_url = start_fake_atlassian(args.host, args.port, args.latency,
+                                            FakeAtlassianData(issue_count=args.issues), args.max_rps)
+    print(f"[OK] Stand-in Atlassian server listening on {base_url}")
+    print(f"   export JIRA_URL={base_url} CONFLUENCE_URL={base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("\nGoodbye!")
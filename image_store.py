@@ -0,0 +1,296 @@
+"""
+Content-addressed store for generate_image outputs.
+
+The stock generate_image tool writes a new file per call and returns the image
+bytes inline, so every later turn re-sends the picture and an identical request
+pays for a new Bedrock image call. The replacement tool here:
+
+- keys each request on (model, prompt, parameters) and keeps the image bytes in
+  a content_store.ContentStore, so identical requests are served from disk
+- returns a small JSON record (handle, path, format, size, parameters) instead
+  of the image bytes; the path is a copy in IMAGE_OUTPUT_DIR, so editing it
+  leaves the stored image intact
+- with background=true, returns a job id immediately and generates on a worker
+  thread; image_job_status reports progress and the result until the finished
+  job expires (IMAGE_JOB_TTL_S)
+
+A request without a seed is treated as "any image for this prompt" and reuses
+the stored one; pass a seed to ask for a specific variation.
+
+Configure with:
+    IMAGE_STORE_MAX_MB=1024
+    IMAGE_OUTPUT_DIR=output
+    IMAGE_JOB_WORKERS=2
+    IMAGE_JOB_TTL_S=3600
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config as BotocoreConfig
+from strands import tool
+from strands.types.tools import AgentTool
+
+from content_store import CACHE_DIR, ContentStore, SingleFlight
+from tool_executor import tool_result
+
+
+DEFAULTS = {
+    "model_id": "stability.stable-image-core-v1:1",
+    "region": "us-west-2",
+    "aspect_ratio": "1:1",
+    "output_format": "jpeg",
+    "negative_prompt": "bad lighting, harsh lighting",
+    "seed": None,
+}
+
+
+def _tool_spec():
+    from strands_tools.generate_image import TOOL_SPEC
+
+    spec = json.loads(json.dumps(TOOL_SPEC))
+    spec["description"] += (
+        ". Identical requests are served from a local image store. Returns a JSON record with the image "
+        "path and handle, not the image itself."
+    )
+    spec["inputSchema"]["json"]["properties"]["background"] = {
+        "type": "boolean",
+        "description": "Return a job id immediately and generate in the background; "
+                       "check it with image_job_status (default: false)",
+    }
+    return spec
+
+
+def request_params(tool_input):
+    """Normalize generate_image input to the parameters that determine the image."""
+    params = {name: tool_input.get(name, default) for name, default in DEFAULTS.items()}
+    params["prompt"] = " ".join(str(tool_input.get("prompt", "")).split())
+    params["output_format"] = str(params["output_format"]).lower()
+    return params
+
+
+class ImageStore:
+    """
+    Generated images keyed by request, stored content-addressed on disk.
+
+    Args:
+        store: ContentStore holding the image bytes
+        output_dir: Directory where readable copies are placed
+        workers: Threads available to background jobs
+        job_ttl: Seconds a finished job's record is kept for image_job_status
+    """
+
+    def __init__(self, store, output_dir="output", workers=2, job_ttl=3600):
+        self.store = store
+        self.output_dir = output_dir
+        self.job_ttl = job_ttl
+        self.flight = SingleFlight()
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="image-jobs")
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self._clients = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(params):
+        return "image:" + hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+    def _client(self, region):
+        with self.lock:
+            client = self._clients.get(region)
+            if client is None:
+                config = BotocoreConfig(user_agent_extra="strands-agents-generate-image")
+                client = self._clients[region] = boto3.client("bedrock-runtime", region_name=region, config=config)
+            return client
+
+    def _invoke(self, params):
+        """Call the Bedrock image model and return the image bytes."""
+        body = {
+            "prompt": params["prompt"],
+            "aspect_ratio": params["aspect_ratio"],
+            "seed": params["seed"] if params["seed"] is not None else random.randint(0, 4294967295),
+            "output_format": params["output_format"],
+            "negative_prompt": params["negative_prompt"],
+        }
+        response = self._client(params["region"]).invoke_model(modelId=params["model_id"], body=json.dumps(body))
+        images = json.loads(response["body"].read().decode("utf-8")).get("images") or []
+        if not images:
+            raise ValueError("No image data found in the response")
+        return base64.b64decode(images[0])
+
+    def _link(self, entry):
+        """Place a readable <prompt>_<hash>.<format> copy of the blob in the output directory."""
+        slug = re.sub(r"[^\w\s-]", "", entry.meta["params"]["prompt"].lower())
+        slug = re.sub(r"\s+", "_", slug.strip())[:60] or "image"
+        path = os.path.join(self.output_dir, f"{slug}_{entry.digest[:8]}.{entry.meta['params']['output_format']}")
+        if not os.path.exists(path):
+            os.makedirs(self.output_dir, exist_ok=True)
+            # A copy rather than a hard link: a link shares the blob's inode, so editing the
+            # output file would change the stored image behind its digest
+            temp = f"{path}.{threading.get_ident()}.tmp"
+            shutil.copyfile(self.store.path(entry.digest), temp)
+            os.replace(temp, path)
+        return path
+
+    def describe(self, entry, cached):
+        """Small metadata record returned to the model instead of the image."""
+        params = entry.meta["params"]
+        return {
+            "handle": f"img-{entry.digest[:16]}",
+            "path": self._link(entry),
+            "format": params["output_format"],
+            "bytes": entry.size,
+            "model_id": params["model_id"],
+            "prompt": params["prompt"],
+            "seed": params["seed"],
+            "aspect_ratio": params["aspect_ratio"],
+            "cached": cached,
+        }
+
+    def generate(self, params):
+        """Return the metadata record for params, generating the image only if it is not stored yet."""
+        key = self.key(params)
+        entry = self.store.get(key)
+        if entry is not None:
+            self.hits += 1
+            return self.describe(entry, cached=True)
+
+        def fill():
+            self.misses += 1
+            data = self._invoke(params)
+            return self.store.put(key, data, {"params": params, "generated": time.time()})
+
+        return self.describe(self.flight.do(key, fill), cached=False)
+
+    def submit(self, params):
+        """Start a background job for params and return its id (identical requests share a job)."""
+        job_id = "job-" + self.key(params).split(":", 1)[1][:12]
+        with self.lock:
+            self._expire_jobs()
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] == "error":
+                job = self.jobs[job_id] = {"status": "running", "submitted": time.time(), "params": params}
+                job["future"] = self.pool.submit(self._run_job, job)
+        return job_id
+
+    def _expire_jobs(self):
+        """Drop finished jobs older than job_ttl (caller holds self.lock)."""
+        cutoff = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.get("finished", cutoff + 1) < cutoff]:
+            del self.jobs[job_id]
+
+    def _run_job(self, job):
+        try:
+            job["result"] = self.generate(job["params"])
+            job["status"] = "done"
+        except Exception as e:
+            job["error"] = str(e)
+            job["status"] = "error"
+        job["finished"] = time.time()
+
+    def job(self, job_id):
+        """Status record of a background job, or None for an unknown or expired id."""
+        with self.lock:
+            self._expire_jobs()
+            job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        record = {"job_id": job_id, "status": job["status"], "prompt": job["params"]["prompt"]}
+        end = job.get("finished", time.time())
+        record["elapsed_s"] = round(end - job["submitted"], 1)
+        if "result" in job:
+            record["result"] = job["result"]
+        if "error" in job:
+            record["error"] = job["error"]
+        return record
+
+    def stats(self):
+        running = sum(1 for job in self.jobs.values() if job["status"] == "running")
+        return {**self.store.stats(), "hits": self.hits, "misses": self.misses, "jobs_running": running}
+
+
+class StoredImageTool(AgentTool):
+    """generate_image backed by an ImageStore."""
+
+    def __init__(self, images):
+        super().__init__()
+        self.images = images
+        self._spec = _tool_spec()
+
+    @property
+    def tool_name(self):
+        return "generate_image"
+
+    @property
+    def tool_spec(self):
+        return self._spec
+
+    @property
+    def tool_type(self):
+        return "python"
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        tool_use_id = tool_use["toolUseId"]
+        tool_input = tool_use.get("input") or {}
+        params = request_params(tool_input)
+        if not params["prompt"]:
+            yield tool_result(tool_use_id, "Error: prompt is required", "error")
+            return
+        try:
+            if tool_input.get("background"):
+                job_id = self.images.submit(params)
+                yield tool_result(tool_use_id, json.dumps(self.images.job(job_id)))
+            else:
+                yield tool_result(tool_use_id, json.dumps(await asyncio.to_thread(self.images.generate, params)))
+        except Exception as e:
+            yield tool_result(tool_use_id, f"Error generating image: {e}", "error")
+
+
+_shared_images = None
+
+
+def from_env():
+    """Return the process-wide ImageStore built from IMAGE_* settings."""
+    global _shared_images
+    if _shared_images is None:
+        max_bytes = int(float(os.getenv("IMAGE_STORE_MAX_MB", "1024")) * 1024 * 1024)
+        _shared_images = ImageStore(
+            ContentStore(os.path.join(CACHE_DIR, "images"), max_bytes),
+            output_dir=os.getenv("IMAGE_OUTPUT_DIR", "output"),
+            workers=int(os.getenv("IMAGE_JOB_WORKERS", "2")),
+            job_ttl=float(os.getenv("IMAGE_JOB_TTL_S", "3600")),
+        )
+    return _shared_images
+
+
+def stored_generate_image():
+    """The generate_image tool backed by the shared image store."""
+    return StoredImageTool(from_env())
+
+
+@tool
+def image_job_status(job_id: str) -> str:
+    """
+    Check a background image generation job started with generate_image(background=true).
+
+    Args:
+        job_id: The job id returned by generate_image
+
+    Returns:
+        JSON with the job status ("running", "done" or "error") and, when done,
+        the image record (handle, path, format, size)
+    """
+    record = from_env().job(job_id)
+    if record is None:
+        return f"Error: unknown or expired image job '{job_id}'"
+    return json.dumps(record, indent=2)
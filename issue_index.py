@@ -0,0 +1,518 @@
+"""
+Local similar-issue search over a CPU-only vector index.
+
+Finding duplicates used to mean the model inventing JQL text searches and
+reading many issues. IssueIndex instead keeps one vector per Jira issue, built
+from its summary and description:
+- hashed word unigrams, word bigrams and character trigrams
+- log term frequency, signed feature hashing into ISSUE_INDEX_DIM dimensions
+- L2-normalized, so a dot product is the cosine similarity
+
+No model or network call is needed, and a query against tens of thousands of
+issues is one matrix-vector product, i.e. milliseconds.
+
+The index is filled from data the Jira tools already fetch. IssueIndexer is a
+hook provider that adds every issue seen in a jira_search_issues or
+jira_get_issue result. `python issue_index.py --sync "<JQL>"` pages through a
+whole project to add or refresh it in bulk. Issues whose text is unchanged are
+skipped; changed ones are re-embedded in place.
+
+On disk (CC_AGENT_CACHE_DIR/issue_index) the vectors are a raw float32 matrix
+that is loaded with np.memmap, so opening a large index reads nothing up
+front. Next to it, index.json holds the keys, text digests and summaries as
+of the last compaction, and a journal holds the rows added or changed since.
+Processes sharing the directory serialize their writes on an OS file lock.
+
+Search results carry no description. An issue first seen in one is indexed
+from its summary, and only a jira_get_issue result or a --sync replaces that
+with the full text; later searches leave it alone.
+
+Configure with:
+    ISSUE_INDEX=1          (0 disables the indexer hook)
+    ISSUE_INDEX_DIM=1024
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+from strands import tool
+from strands.hooks import HookProvider, HookRegistry, AfterToolCallEvent
+
+from content_store import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+INDEXED_TOOLS = {"jira_search_issues", "jira_get_issue"}
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "the", "this", "to", "was", "when", "with",
+}
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Hold an exclusive OS lock on path while other processes may write the same index."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+
+def adf_text(doc):
+    """Plain text of a description that may be an Atlassian Document Format body."""
+    if doc is None:
+        return ""
+    if isinstance(doc, str):
+        return doc
+    if isinstance(doc, list):
+        return " ".join(adf_text(node) for node in doc)
+    if doc.get("type") == "text":
+        return doc.get("text", "")
+    return " ".join(adf_text(node) for node in doc.get("content", []))
+
+
+def features(text):
+    """Weighted features of a text: words, word bigrams and character trigrams."""
+    words = [word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS]
+    weights = {}
+    for word in words:
+        weights["w:" + word] = weights.get("w:" + word, 0.0) + 1.0
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            gram = "c:" + padded[i:i + 3]
+            weights[gram] = weights.get(gram, 0.0) + 0.5
+    for first, second in zip(words, words[1:]):
+        gram = f"b:{first} {second}"
+        weights[gram] = weights.get(gram, 0.0) + 1.0
+    return weights
+
+
+def embed(text, dim):
+    """Hashed, log-scaled, L2-normalized float32 vector of a text."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, weight in features(text).items():
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += (1.0 if h & 0x80000000 else -1.0) * np.log1p(weight)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def issue_text(summary, description):
+    # The summary carries most of the signal for duplicates; count it twice
+    return f"{summary}\n{summary}\n{adf_text(description)}"
+
+
+class IssueIndex:
+    """
+    Persistent matrix of issue vectors with incremental add and top-k search.
+
+    Several processes (e.g. two REPLs) may share one index directory. Writers
+    take an OS file lock, and every add or search first picks up what the
+    other processes have written.
+
+    Args:
+        root: Directory holding vectors.f32, index.json and the journal
+        dim: Vector dimensions (changing it starts a new, empty index)
+    """
+
+    def __init__(self, root, dim=1024):
+        self.root = root
+        self.dim = dim
+        self.lock = threading.Lock()
+        self.keys = []
+        self.digests = []
+        self.summaries = []
+        self.rows = {}
+        self._matrix = None
+        self.generation = 0
+        self._snapshot_stamp = None  # (mtime, size) of the index.json the state was loaded from
+        self._journal_offset = 0  # bytes of the journal applied so far
+        self._journal_lines = 0
+        self._reset_pending = False  # the files on disk are unusable; the next add starts them over
+        self.added = 0
+        self.updated = 0
+        self.searches = 0
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    @property
+    def vectors_path(self):
+        return os.path.join(self.root, "vectors.f32")
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.root, "index.json")
+
+    @property
+    def journal_path(self):
+        return os.path.join(self.root, f"journal-{self.generation}.jsonl")
+
+    @property
+    def lock_path(self):
+        return os.path.join(self.root, "index.lock")
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.meta_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        """Read the snapshot, then replay the journal written after it."""
+        self.keys, self.digests, self.summaries, self.rows = [], [], [], {}
+        self._matrix = None
+        self.generation = 0
+        self._journal_offset = self._journal_lines = 0
+        self._snapshot_stamp = self._stamp()
+        self._reset_pending = self._snapshot_stamp is None  # the first add writes index.json, with the dim
+        if self._reset_pending:
+            return
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        if meta.get("dim") != self.dim:
+            print(f"[WARNING] Issue index at {self.root} has dim={meta.get('dim')}, not {self.dim}; rebuilding it")
+            self._reset_pending = True
+            return
+        self.generation = meta.get("generation", 0)
+        self.keys, self.digests, self.summaries = meta["keys"], meta["digests"], meta["summaries"]
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self._replay()
+        rows = len(self.keys)
+        if rows and (not os.path.exists(self.vectors_path) or os.path.getsize(self.vectors_path) < rows * self.dim * 4):
+            print(f"[WARNING] Issue index at {self.root} is truncated; rebuilding it")
+            self.keys, self.digests, self.summaries, self.rows = [], [], [], {}
+            self._reset_pending = True
+            return
+        self._map()
+
+    def _replay(self):
+        """Apply the journal lines written since the last replay, by this process or another one."""
+        try:
+            f = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            return  # nothing added since the snapshot, or compacted meanwhile (see _refresh)
+        with f:
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # being written by another process, or cut short by a crash
+                try:
+                    row, key, digest, summary = json.loads(line)
+                except ValueError:
+                    break
+                if row == len(self.keys):
+                    self.rows[key] = row
+                    self.keys.append(key)
+                    self.digests.append(digest)
+                    self.summaries.append(summary)
+                elif row < len(self.keys):
+                    self.digests[row] = digest
+                    self.summaries[row] = summary
+                else:
+                    break
+                self._journal_offset += len(line)
+                self._journal_lines += 1
+
+    def _refresh(self):
+        """Pick up what other processes sharing the directory have written since the last look."""
+        if self._stamp() != self._snapshot_stamp:
+            self._load()  # another process compacted or rebuilt the index
+            return
+        if self._reset_pending:
+            return
+        rows = len(self.keys)
+        self._replay()
+        if len(self.keys) != rows:
+            self._map()
+
+    def _map(self):
+        """(Re)map the vectors file read-only; rows past the recorded count are ignored."""
+        self._matrix = None
+        if self.keys:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.keys), self.dim))
+
+    def _compact(self):
+        """Write the whole state to a new index.json and start an empty journal."""
+        self.generation += 1
+        meta = {"dim": self.dim, "generation": self.generation, "keys": self.keys, "digests": self.digests,
+                "summaries": self.summaries}
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.meta_path)
+        for name in os.listdir(self.root):
+            if name.startswith("journal-") and name.endswith(".jsonl"):
+                os.remove(os.path.join(self.root, name))  # readers still on them see the new index.json
+        self._snapshot_stamp = self._stamp()
+        self._journal_offset = self._journal_lines = 0
+        self._reset_pending = False
+
+    def add(self, issues):
+        """
+        Add or refresh issues.
+
+        New and changed rows are appended to a journal, and index.json is only
+        rewritten once the journal is longer than the index itself (at least
+        1000 lines), so adding one issue does not rewrite the whole key list.
+
+        Args:
+            issues: Iterable of (key, summary, description) tuples. A description of None means the
+                result did not include one (search results): a new issue is indexed from its summary,
+                an indexed one is left as it is rather than losing its description
+
+        Returns:
+            (added, updated) counts; issues whose text is unchanged are skipped
+        """
+        issues = [issue for issue in issues if issue[0] and issue[1]]
+        if not issues:
+            return 0, 0
+        with self.lock, _file_lock(self.lock_path):
+            self._refresh()
+            new_rows, changed_rows, lines = [], [], []
+            first_new = len(self.keys)
+            for key, summary, description in issues:
+                row = self.rows.get(key)
+                if row is not None and description is None:
+                    continue
+                text = issue_text(summary, description)
+                digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+                if row is not None and self.digests[row] == digest:
+                    continue
+                vector = embed(text, self.dim)
+                if row is None:
+                    row = self.rows[key] = len(self.keys)
+                    self.keys.append(key)
+                    self.digests.append(digest)
+                    self.summaries.append(summary[:160])
+                    new_rows.append(vector)
+                else:
+                    self.digests[row] = digest
+                    self.summaries[row] = summary[:160]
+                    if row >= first_new:
+                        new_rows[row - first_new] = vector  # listed twice in this batch; not on disk yet
+                    else:
+                        changed_rows.append((row, vector))
+                lines.append(json.dumps([row, key, digest, summary[:160]]) + "\n")
+            if not new_rows and not changed_rows:
+                return 0, 0
+            self._matrix = None  # release the map before writing to the file
+            if changed_rows:
+                with open(self.vectors_path, "r+b") as f:
+                    for row, vector in changed_rows:
+                        f.seek(row * self.dim * 4)
+                        f.write(vector.tobytes())
+            if new_rows and self._reset_pending:
+                # Other processes may still have the old file mapped, and reading past the end of a
+                # shrunk mapping is a SIGBUS: write a new file and swap it in instead of truncating
+                tmp = self.vectors_path + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(np.vstack(new_rows).astype(np.float32).tobytes())
+                os.replace(tmp, self.vectors_path)
+            elif new_rows:
+                # Truncate first: rows past the recorded count are left over from an interrupted add
+                with open(self.vectors_path, "r+b" if os.path.exists(self.vectors_path) else "wb") as f:
+                    f.seek((len(self.keys) - len(new_rows)) * self.dim * 4)
+                    f.truncate()
+                    f.write(np.vstack(new_rows).astype(np.float32).tobytes())
+            if self._reset_pending or self._journal_lines + len(lines) > max(1000, len(self.keys)):
+                self._compact()
+            else:
+                with open(self.journal_path, "ab") as f:
+                    f.truncate(self._journal_offset)  # drop a line left unfinished by a crashed writer
+                    data = "".join(lines).encode("utf-8")
+                    f.write(data)
+                self._journal_offset += len(data)
+                self._journal_lines += len(lines)
+            self._map()
+            self.added += len(new_rows)
+            self.updated += len(changed_rows)
+        return len(new_rows), len(changed_rows)
+
+    def search(self, text=None, issue_key=None, top_k=5, min_score=0.0):
+        """
+        Issues most similar to a text or to an indexed issue.
+
+        Returns:
+            List of {"key", "score", "summary"}, best first (the query issue itself excluded)
+        """
+        with self.lock:
+            self._refresh()
+            matrix, keys, summaries = self._matrix, list(self.keys), list(self.summaries)
+            row = self.rows.get(issue_key) if issue_key else None
+        if matrix is None:
+            return []
+        query = np.array(matrix[row]) if row is not None else embed(text or "", self.dim)
+        scores = matrix @ query
+        if row is not None:
+            scores[row] = -1.0
+        k = min(top_k, len(keys))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        self.searches += 1
+        return [
+            {"key": keys[i], "score": round(float(scores[i]), 3), "summary": summaries[i]}
+            for i in best if scores[i] >= min_score
+        ]
+
+    def stats(self):
+        return {
+            "issues": len(self.keys),
+            "dim": self.dim,
+            "bytes": len(self.keys) * self.dim * 4,
+            "added": self.added,
+            "updated": self.updated,
+            "searches": self.searches,
+        }
+
+
+def _issues_in_result(tool_name, text):
+    """(key, summary, description) tuples in a jira_search_issues / jira_get_issue result."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return []
+    if tool_name == "jira_get_issue" and isinstance(data, dict):
+        return [(data.get("key"), data.get("summary"), data.get("description") or "")]
+    issues = data.get("issues", []) if isinstance(data, dict) else []
+    # Search results carry no description: None tells IssueIndex.add to keep the one it has
+    return [
+        (issue.get("key"), issue.get("summary"), (issue.get("description") or "") if "description" in issue else None)
+        for issue in issues if isinstance(issue, dict)
+    ]
+
+
+class IssueIndexer(HookProvider):
+    """Add the issues returned by Jira read tools to an IssueIndex."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(AfterToolCallEvent, self._index)
+
+    def _index(self, event: AfterToolCallEvent) -> None:
+        name = event.tool_use.get("name")
+        result = event.result
+        if name not in INDEXED_TOOLS or not result or result.get("status") != "success":
+            return
+        text = "".join(block.get("text", "") for block in result.get("content", []))
+        try:
+            self.index.add(_issues_in_result(name, text))
+        except OSError as e:
+            print(f"[WARNING] Could not update the issue index: {e}")
+
+
+def sync(index, jql, page_size=100):
+    """
+    Page through every issue matching jql and add or refresh it in the index.
+
+    Returns:
+        (issues seen, added, updated)
+    """
+    from jira_analytics import iter_issue_pages
+
+    seen = added = updated = 0
+    for page, _more in iter_issue_pages(jql, ["summary", "description"], page_size):
+        batch = [(issue["key"], issue["fields"].get("summary"), issue["fields"].get("description") or "")
+                 for issue in page]
+        seen += len(batch)
+        new, changed = index.add(batch)
+        added += new
+        updated += changed
+    return seen, added, updated
+
+
+_shared_index = None
+
+
+def from_env():
+    """Return the process-wide IssueIndex (ISSUE_INDEX_DIM dimensions, under CC_AGENT_CACHE_DIR)."""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = IssueIndex(
+            os.path.join(CACHE_DIR, "issue_index"), dim=int(os.getenv("ISSUE_INDEX_DIM", "1024"))
+        )
+    return _shared_index
+
+
+def indexer():
+    """An IssueIndexer hook bound to the shared index, or None when ISSUE_INDEX=0."""
+    if os.getenv("ISSUE_INDEX", "1").lower() in ("0", "false", "off", "no"):
+        return None
+    return IssueIndexer(from_env())
+
+
+@tool
+def find_similar_issues(text: str = None, issue_key: str = None, top_k: int = 5, min_score: float = 0.2) -> str:
+    """
+    Find Jira issues similar to a text or to a known issue, e.g. to spot duplicates.
+    Searches a local index of every issue seen so far, so it is instant and costs no Jira calls.
+
+    Args:
+        text: Text to compare against (e.g., a bug summary or description)
+        issue_key: Alternatively, an indexed issue to find look-alikes of (e.g., "PROJ-123")
+        top_k: Number of results (default: 5)
+        min_score: Minimum cosine similarity between 0 and 1 (default: 0.2)
+
+    Returns:
+        JSON list of {"key", "score", "summary"}, most similar first, plus the index size
+    """
+    index = from_env()
+    if not text and not issue_key:
+        return "Error: pass text or issue_key"
+    if issue_key and issue_key.strip().upper() not in index.rows:
+        if not text:
+            return (f"Error: {issue_key} is not in the local index yet. Fetch it with jira_get_issue first, "
+                    f"or pass its summary as text.")
+        issue_key = None
+    started = time.perf_counter()
+    matches = index.search(text=text, issue_key=issue_key and issue_key.strip().upper(),
+                           top_k=max(1, min(top_k, 50)), min_score=min_score)
+    return json.dumps({
+        "matches": matches,
+        "indexed_issues": len(index.keys),
+        "search_ms": round((time.perf_counter() - started) * 1000, 2),
+    }, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the local similar-issue index")
+    parser.add_argument("--sync", metavar="JQL", help="Add or refresh every issue matching this JQL")
+    parser.add_argument("--query", help="Print the issues most similar to this text")
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    index = from_env()
+    if args.sync:
+        started = time.monotonic()
+        seen, added, updated = sync(index, args.sync)
+        print(f"[OK] Synced {seen} issues in {time.monotonic() - started:.1f}s: {added} added, {updated} updated, "
+              f"{len(index.keys)} in the index")
+    if args.query:
+        for match in index.search(text=args.query, top_k=args.top_k):
+            print(f"{match['score']:.3f}  {match['key']}  {match['summary']}")
+    if not args.sync and not args.query:
+        print(json.dumps(index.stats(), indent=2))
@@ -0,0 +1,265 @@
+"""
+Speculative prefetch of Jira issue details after a search.
+
+Our most common tool pattern is jira_search_issues followed by jira_get_issue
+on several of the keys it returned, each one waiting for another model turn
+plus an HTTP round trip. When a search succeeds, IssuePrefetcher fetches the
+top N keys in the background into a short-lived in-memory cache. The
+follow-up jira_get_issue calls are then served from it:
+- a finished prefetch is returned at once
+- a prefetch still in flight is awaited instead of sending a second request
+
+Entries live for JIRA_PREFETCH_TTL seconds. A tool call that writes to an
+issue (any tool other than jira_get_issue that takes an issue_key, or
+issue_keys / operations like jira_bulk_update) drops that issue's entry before
+and after it runs.
+
+stats() reports hits, wasted fetches (expired or invalidated without being
+read) and the hit ratio, for tuning N.
+
+Enable with JIRA_PREFETCH_TOP_N=3 (0, the default, disables it). Also:
+    JIRA_PREFETCH_TTL=60
+    JIRA_PREFETCH_WORKERS=2
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from strands.hooks import HookProvider, HookRegistry, BeforeToolCallEvent, AfterToolCallEvent
+
+from tool_executor import ProxyTool, run_tool, tool_result
+
+
+SEARCH_TOOL = "jira_search_issues"
+GET_TOOL = "jira_get_issue"
+
+
+def _normalize_key(key):
+    return str(key or "").strip().upper()
+
+
+def _entry_key(key, site=None):
+    """Cache key of an issue; issues from another Atlassian site (see atlassian_sites) are kept apart."""
+    key = _normalize_key(key)
+    return f"{site}:{key}" if site and key else key
+
+
+def _search_keys(result):
+    """(issue key, site or None) pairs in a successful jira_search_issues result, in result order."""
+    if not result or result.get("status") != "success":
+        return []
+    text = "".join(block.get("text", "") for block in result.get("content", []))
+    try:
+        issues = json.loads(text).get("issues") or []
+    except (ValueError, AttributeError):
+        return []
+    return [(issue["key"], issue.get("site")) for issue in issues if isinstance(issue, dict) and issue.get("key")]
+
+
+def _written_keys(tool_input):
+    """Issue keys a (possibly bulk) write tool call touches: issue_key, issue_keys, operations[].issue_key."""
+    keys = [tool_input.get("issue_key"), *(tool_input.get("issue_keys") or [])]
+    keys += [op.get("issue_key") for op in tool_input.get("operations") or [] if isinstance(op, dict)]
+    return [key for key in keys if key]
+
+
+def _is_error(text):
+    return not isinstance(text, str) or text.startswith("Error")
+
+
+class PrefetchedIssue(ProxyTool):
+    """jira_get_issue answered from a prefetch; falls back to the real tool if the prefetch failed."""
+
+    def __init__(self, delegate, prefetcher, key, entry):
+        super().__init__(delegate)
+        self.prefetcher = prefetcher
+        self.key = key
+        self.entry = entry
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        future = self.entry["future"]
+        waited = not future.done()
+        try:
+            # shield: a caller that times out must not cancel the prefetch other callers may share
+            text = await asyncio.shield(asyncio.wrap_future(future))
+        except Exception:
+            text = None
+        if _is_error(text):
+            self.prefetcher.record_error(self.key, self.entry)
+            yield await run_tool(self.delegate, tool_use, invocation_state, **kwargs)
+            return
+        self.prefetcher.record_hit(self.entry, waited)
+        yield tool_result(tool_use["toolUseId"], text)
+
+
+class IssuePrefetcher(HookProvider):
+    """
+    Prefetch the top search results and serve jira_get_issue from them.
+
+    Register it after the ToolConcurrencyLimiter and before the TurnBudget, so
+    a miss still runs on the atlassian pool and waiting on a prefetch is
+    bounded by the tool's deadline.
+
+    Args:
+        fetch: Callable fetch(issue_key=..., site=...) returning jira_get_issue's text (the @tool itself);
+            site is only passed for issues tagged with one
+        top_n: Keys prefetched per search
+        ttl: Seconds a prefetched issue may be served
+        workers: Threads doing prefetches
+        max_entries: Entries kept at most; the oldest are dropped first
+    """
+
+    def __init__(self, fetch, top_n=3, ttl=60.0, workers=2, max_entries=200):
+        self.fetch = fetch
+        self.top_n = top_n
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="jira-prefetch")
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.prefetched = 0
+        self.hits = 0
+        self.waited = 0
+        self.wasted = 0
+        self.errors = 0
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeToolCallEvent, self._before)
+        registry.add_callback(AfterToolCallEvent, self._after)
+
+    def _before(self, event: BeforeToolCallEvent) -> None:
+        name = event.tool_use.get("name")
+        tool_input = event.tool_use.get("input") or {}
+        if name == GET_TOOL:
+            key = _entry_key(tool_input.get("issue_key"), tool_input.get("site"))
+            entry = self.lookup(key)
+            if entry is not None and event.selected_tool is not None:
+                event.selected_tool = PrefetchedIssue(event.selected_tool, self, key, entry)
+        elif name != SEARCH_TOOL:
+            for key in _written_keys(tool_input):
+                self.invalidate(key)
+
+    def _after(self, event: AfterToolCallEvent) -> None:
+        name = event.tool_use.get("name")
+        tool_input = event.tool_use.get("input") or {}
+        if name == SEARCH_TOOL:
+            self.prefetch(_search_keys(event.result)[:self.top_n])
+        elif name != GET_TOOL:
+            for key in _written_keys(tool_input):
+                self.invalidate(key)
+
+    def prefetch(self, keys):
+        """Start background fetches for (issue key, site or None) pairs that have no fresh entry yet."""
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            for issue_key, site in keys:
+                key = _entry_key(issue_key, site)
+                if not key or key in self.entries:
+                    continue
+                while len(self.entries) >= self.max_entries:
+                    self._drop(next(iter(self.entries)))
+                self.entries[key] = {
+                    "future": self.pool.submit(self.fetch, issue_key=_normalize_key(issue_key),
+                                               **({"site": site} if site else {})),
+                    "expires": now + self.ttl,
+                    "used": False,
+                }
+                self.prefetched += 1
+
+    def lookup(self, key):
+        """The fresh entry for key, or None."""
+        with self.lock:
+            self._expire(time.monotonic())
+            return self.entries.get(key)
+
+    def invalidate(self, key):
+        """Drop an issue's entries, including copies prefetched from any other site."""
+        key = _normalize_key(key)
+        with self.lock:
+            for entry_key in [k for k in self.entries if k == key or k.endswith(":" + key)]:
+                self._drop(entry_key)
+
+    def record_hit(self, entry, waited):
+        with self.lock:
+            if not entry["used"]:
+                entry["used"] = True
+                self.hits += 1
+                self.waited += waited
+
+    def record_error(self, key, entry):
+        with self.lock:
+            if self.entries.get(key) is entry:
+                del self.entries[key]
+                self.errors += 1
+
+    def _drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None and not entry["used"]:
+            self.wasted += 1
+
+    def _expire(self, now):
+        for key in [key for key, entry in self.entries.items() if entry["expires"] <= now]:
+            self._drop(key)
+
+    def results(self):
+        """Texts of the finished, successful prefetches currently held."""
+        with self.lock:
+            futures = [entry["future"] for entry in self.entries.values()]
+        return [future.result() for future in futures if future.done() and future.exception() is None]
+
+    def stats(self):
+        with self.lock:
+            self._expire(time.monotonic())
+            resolved = self.hits + self.wasted
+            return {
+                "top_n": self.top_n,
+                "entries": len(self.entries),
+                "prefetched": self.prefetched,
+                "hits": self.hits,
+                "hits_waited": self.waited,
+                "wasted": self.wasted,
+                "errors": self.errors,
+                "hit_ratio": round(self.hits / resolved, 3) if resolved else None,
+            }
+
+    def format_stats(self):
+        stats = self.stats()
+        ratio = f"{stats['hit_ratio']:.0%}" if stats["hit_ratio"] is not None else "n/a"
+        return (
+            f"[INFO] Jira prefetch (top {stats['top_n']}): {stats['prefetched']} fetched, {stats['hits']} used "
+            f"({stats['hits_waited']} still in flight), {stats['wasted']} wasted, {stats['errors']} failed; "
+            f"hit ratio {ratio}"
+        )
+
+
+_shared_prefetcher = None
+
+
+def shared():
+    """The process-wide IssuePrefetcher, or None if from_env has not created one."""
+    return _shared_prefetcher
+
+
+def from_env(fetch):
+    """
+    Return the process-wide IssuePrefetcher, or None unless JIRA_PREFETCH_TOP_N is set above 0.
+
+    Args:
+        fetch: The jira_get_issue tool (called as fetch(issue_key=...))
+    """
+    global _shared_prefetcher
+    top_n = int(os.getenv("JIRA_PREFETCH_TOP_N", "0"))
+    if top_n <= 0:
+        return None
+    if _shared_prefetcher is None:
+        _shared_prefetcher = IssuePrefetcher(
+            fetch,
+            top_n=top_n,
+            ttl=float(os.getenv("JIRA_PREFETCH_TTL", "60")),
+            workers=int(os.getenv("JIRA_PREFETCH_WORKERS", "2")),
+        )
+    return _shared_prefetcher
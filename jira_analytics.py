@@ -0,0 +1,192 @@
+"""
+Local aggregation over Jira search results.
+
+Questions like "how many open bugs per assignee" used to mean pulling issue
+lists through jira_search_issues and having the model count them in context.
+That is slow and token-heavy, and wrong beyond the 50 issues a search returns.
+
+jira_aggregate pages through every issue matching a JQL query instead. It
+requests only the fields the chosen dimensions need and counts each page into
+a Counter before fetching the next one. Memory stays bounded by the number of
+distinct groups (at most MAX_GROUPS; the rest are counted as "(other)"), not
+by the number of issues. Only the compact aggregate table is returned.
+
+If the tool's deadline is about to pass, the pages counted so far are returned
+with "complete": false.
+
+Configure with:
+    JIRA_AGGREGATE_PAGE_SIZE=100
+"""
+import json
+import os
+import time
+from collections import Counter
+from datetime import date
+
+import requests
+from strands import tool
+
+import deadlines
+from atlassian_http import JIRA_URL, get_jira_auth_headers, atlassian_request
+
+
+PAGE_SIZE = int(os.getenv("JIRA_AGGREGATE_PAGE_SIZE", "100"))
+MAX_GROUPS = 5000
+OTHER = "(other)"
+
+
+def _name(field, attribute="name", missing="None"):
+    return (field or {}).get(attribute) or missing
+
+
+def _week(timestamp):
+    year, week, _ = date.fromisoformat(timestamp[:10]).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+# dimension -> (Jira field to request or None, value function over (issue key, fields))
+DIMENSIONS = {
+    "status": ("status", lambda key, f: _name(f.get("status"))),
+    "assignee": ("assignee", lambda key, f: _name(f.get("assignee"), "displayName", "Unassigned")),
+    "reporter": ("reporter", lambda key, f: _name(f.get("reporter"), "displayName", "Unknown")),
+    "priority": ("priority", lambda key, f: _name(f.get("priority"))),
+    "issue_type": ("issuetype", lambda key, f: _name(f.get("issuetype"))),
+    "resolution": ("resolution", lambda key, f: _name(f.get("resolution"), missing="Unresolved")),
+    "project": (None, lambda key, f: key.rsplit("-", 1)[0]),
+    "created_week": ("created", lambda key, f: _week(f["created"]) if f.get("created") else "None"),
+    "updated_week": ("updated", lambda key, f: _week(f["updated"]) if f.get("updated") else "None"),
+    "created_month": ("created", lambda key, f: f["created"][:7] if f.get("created") else "None"),
+}
+
+# Dimensions shown in time order (a histogram) rather than by count
+TIME_DIMENSIONS = {"created_week", "updated_week", "created_month"}
+
+
+def iter_issue_pages(jql, fields, page_size=PAGE_SIZE):
+    """
+    Yield pages of issues matching jql, following nextPageToken.
+
+    Args:
+        jql: JQL query
+        fields: Jira fields to request (only these are returned)
+        page_size: Issues per request
+
+    Yields:
+        (issues, more) per page: the raw issue dicts and whether another page follows
+    """
+    url = f"{JIRA_URL}/rest/api/3/search/jql"
+    params = {"jql": jql, "maxResults": page_size, "fields": ",".join(fields) or "key"}
+    while True:
+        response = atlassian_request("GET", url, headers=get_jira_auth_headers(), params=params)
+        response.raise_for_status()
+        data = response.json()
+        token = data.get("nextPageToken")
+        more = bool(token) and not data.get("isLast", False)
+        yield data.get("issues", []), more
+        if not more:
+            return
+        params["nextPageToken"] = token
+
+
+def aggregate(pages, dimensions, max_issues, max_groups=MAX_GROUPS):
+    """
+    Count issues per combination of dimension values.
+
+    Args:
+        pages: Iterable of issue pages (see iter_issue_pages)
+        dimensions: Names from DIMENSIONS
+        max_issues: Stop after this many issues
+        max_groups: Distinct groups kept; later new groups are counted under "(other)"
+
+    Returns:
+        (Counter of value tuples, issues counted, complete?, stop reason or None)
+    """
+    functions = [DIMENSIONS[name][1] for name in dimensions]
+    counts = Counter()
+    counted = 0
+    page_started = time.monotonic()
+    for page, more in pages:
+        for index, issue in enumerate(page):
+            group = tuple(function(issue.get("key", ""), issue.get("fields") or {}) for function in functions)
+            if group not in counts and len(counts) >= max_groups:
+                group = (OTHER,) * len(functions)
+            counts[group] += 1
+            counted += 1
+            if counted >= max_issues:
+                # Reaching the cap on the last matching issue still counts every issue
+                if more or index + 1 < len(page):
+                    return counts, counted, False, f"stopped at max_issues={max_issues}"
+                return counts, counted, True, None
+        # Stop before a page that would likely overrun the tool deadline
+        page_time = time.monotonic() - page_started
+        left = deadlines.remaining()
+        if more and left is not None and left < 2 * page_time + 1:
+            return counts, counted, False, "stopped before the tool deadline"
+        page_started = time.monotonic()
+    return counts, counted, True, None
+
+
+def format_groups(counts, dimensions, top):
+    """
+    Rows of the aggregate table.
+
+    Groups are sorted by count, descending, and the top rows kept. A single time
+    dimension is a histogram instead: in time order, keeping the most recent buckets.
+
+    Returns:
+        (rows, number of groups left out, issues in those groups)
+    """
+    if len(dimensions) == 1 and dimensions[0] in TIME_DIMENSIONS:
+        ordered = sorted(counts.items())
+        shown, rest = ordered[-top:], ordered[:-top]
+    else:
+        ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        shown, rest = ordered[:top], ordered[top:]
+    rows = [{**dict(zip(dimensions, group)), "count": count} for group, count in shown]
+    return rows, len(rest), sum(count for _, count in rest)
+
+
+@tool
+def jira_aggregate(jql: str, group_by: str = "status", top: int = 50, max_issues: int = 100000) -> str:
+    """
+    Count Jira issues matching a JQL query, grouped by one or more fields, without listing the issues.
+    Use this instead of jira_search_issues for "how many" questions and breakdowns.
+
+    Args:
+        jql: JQL query selecting the issues (e.g., "project = PROJ AND issuetype = Bug AND statusCategory != Done")
+        group_by: Comma-separated dimensions: status, assignee, reporter, priority, issue_type,
+            resolution, project, created_week, updated_week, created_month (e.g., "assignee" or "status,priority")
+        top: Maximum rows returned (for a time dimension, the most recent ones); the
+            groups left out are summed into one line
+        max_issues: Stop counting after this many issues
+
+    Returns:
+        JSON with the number of issues counted, whether the count is complete, and one row
+        per group with its count (time dimensions are returned in time order, as a histogram)
+    """
+    dimensions = [name.strip().lower() for name in group_by.split(",") if name.strip()]
+    unknown = [name for name in dimensions if name not in DIMENSIONS]
+    if not dimensions or unknown:
+        return f"Error: unknown group_by {unknown or group_by!r}. Choose from: {', '.join(DIMENSIONS)}"
+    fields = sorted({DIMENSIONS[name][0] for name in dimensions if DIMENSIONS[name][0]})
+    started = time.monotonic()
+    try:
+        counts, counted, complete, note = aggregate(iter_issue_pages(jql, fields), dimensions, max(1, max_issues))
+    except requests.exceptions.HTTPError as e:
+        return f"Error aggregating Jira issues (HTTP {e.response.status_code}): {e.response.text}"
+    except Exception as e:
+        return f"Error aggregating Jira issues: {str(e)}"
+    rows, other_groups, other_count = format_groups(counts, dimensions, max(1, top))
+    result = {
+        "jql": jql,
+        "group_by": dimensions,
+        "issues_counted": counted,
+        "complete": complete,
+        "groups": rows,
+        "elapsed_s": round(time.monotonic() - started, 2),
+    }
+    if other_groups:
+        result["remaining"] = {"groups": other_groups, "issues": other_count}
+    if note:
+        result["note"] = note
+    return json.dumps(result, indent=2)
@@ -0,0 +1,169 @@
+"""
+Streaming download of Jira issue attachments.
+
+Logs and heap dumps used to be reachable only through http_request, which
+reads the whole body into memory and into the prompt. jira_download_attachments
+writes them to disk and returns only paths and sizes, so the model can inspect
+them selectively afterwards with read_file:
+- each attachment is streamed in ATTACHMENT_CHUNK_KB chunks to a .part file
+  and renamed when complete
+- an interrupted download (error or tool deadline) keeps its .part file, and
+  the next call resumes it with an HTTP Range request
+- a file already on disk with the expected size is not downloaded again
+- up to JIRA_DOWNLOAD_WORKERS attachments download at once; every request goes
+  through atlassian_request and so through the shared rate limiter
+
+Files land in ATTACHMENT_DIR/<ISSUE-KEY>/<filename> (default attachments/).
+Attachments of one issue that share a file name are saved as <id>-<filename>.
+"""
+import contextvars
+import fnmatch
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from strands import tool
+
+import atlassian_sites
+import deadlines
+from atlassian_http import JIRA_URL, get_jira_auth_headers, atlassian_request
+
+
+ATTACHMENT_DIR = os.getenv("ATTACHMENT_DIR", "attachments")
+DOWNLOAD_WORKERS = int(os.getenv("JIRA_DOWNLOAD_WORKERS", "4"))
+CHUNK_SIZE = int(os.getenv("ATTACHMENT_CHUNK_KB", "1024")) * 1024
+
+
+def safe_filename(name, attachment_id):
+    """A file name that cannot escape the issue directory."""
+    name = re.sub(r"[^\w.\- ]", "_", os.path.basename(name or "")).strip(". ")
+    return name or f"attachment-{attachment_id}"
+
+
+def local_names(attachments):
+    """
+    {attachment id: file name} for an issue's attachments.
+
+    Re-uploaded files often share a name; those are prefixed with their
+    attachment id ("10042-service.log") so each gets its own file and .part file.
+    """
+    names = {a.get("id"): safe_filename(a.get("filename"), a.get("id")) for a in attachments}
+    counts = {}
+    for name in names.values():
+        counts[name.lower()] = counts.get(name.lower(), 0) + 1
+    return {
+        attachment_id: f"{attachment_id}-{name}" if counts[name.lower()] > 1 else name
+        for attachment_id, name in names.items()
+    }
+
+
+def download(attachment, path, auth_headers=None):
+    """
+    Stream one attachment to path, resuming a partial .part file if one exists.
+
+    Args:
+        attachment: Jira attachment record (id, filename, size, content URL)
+        path: Destination file
+        auth_headers: Headers of the site the attachment is on (default: JIRA_URL's credentials)
+
+    Returns:
+        Report dict: path, bytes, status ("downloaded", "resumed", "already present", "partial" or "error")
+    """
+    expected = attachment.get("size")
+    report = {"filename": os.path.basename(path), "path": path, "bytes": 0}
+    if os.path.exists(path) and (expected is None or os.path.getsize(path) == expected):
+        return {**report, "bytes": os.path.getsize(path), "status": "already present"}
+
+    part = path + ".part"
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    headers = {key: value for key, value in (auth_headers or get_jira_auth_headers()).items()
+               if key != "Content-Type"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+    try:
+        response = atlassian_request("GET", attachment["content"], headers=headers, stream=True)
+        with response:
+            # 416: the .part file already holds the whole attachment
+            if response.status_code != 416:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    offset = 0  # the server ignored the range; start over
+                with open(part, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+                        left = deadlines.remaining()
+                        if left is not None and left < 1:
+                            size = f.tell()
+                            return {**report, "bytes": size, "status": "partial",
+                                    "error": f"tool deadline reached after {size} of {expected} bytes; "
+                                             f"call again to resume"}
+        size = os.path.getsize(part)
+        if expected is not None and size != expected:
+            return {**report, "bytes": size, "status": "partial",
+                    "error": f"got {size} of {expected} bytes; call again to resume"}
+        os.replace(part, path)
+        return {**report, "bytes": size, "status": "resumed" if offset else "downloaded"}
+    except Exception as e:
+        size = os.path.getsize(part) if os.path.exists(part) else 0
+        return {**report, "bytes": size, "status": "error", "error": str(e)[:200]}
+
+
+@tool
+def jira_download_attachments(issue_key: str, filename_pattern: str = "*", output_dir: str = None,
+                              site: str = None) -> str:
+    """
+    Download a Jira issue's attachments (logs, heap dumps, screenshots) to local files.
+    Returns only paths and sizes; inspect the files afterwards with read_file or list_files.
+
+    Args:
+        issue_key: The issue key (e.g., "PROJ-123")
+        filename_pattern: Glob matched against attachment file names (e.g., "*.log"; default: all)
+        output_dir: Base directory (default: ATTACHMENT_DIR, "attachments"); files go to <output_dir>/<issue_key>/
+            (<output_dir>/<site>/<issue_key>/ with a site)
+        site: Site tag from jira_search_issues, when several Atlassian sites are configured
+
+    Returns:
+        JSON with one entry per attachment (path, bytes, status) and the total bytes downloaded
+    """
+    try:
+        base, headers = JIRA_URL, get_jira_auth_headers()
+        if site:
+            target = atlassian_sites.get(site)
+            base, headers = target.jira_url, target.jira_headers()
+        response = atlassian_request("GET", f"{base}/rest/api/3/issue/{issue_key}", headers=headers,
+                                     params={"fields": "attachment"})
+        response.raise_for_status()
+        attachments = response.json()["fields"].get("attachment") or []
+    except requests.exceptions.HTTPError as e:
+        return f"Error getting attachments of {issue_key} (HTTP {e.response.status_code}): {e.response.text}"
+    except Exception as e:
+        return f"Error getting attachments of {issue_key}: {str(e)}"
+
+    selected = [a for a in attachments if fnmatch.fnmatch(a.get("filename", ""), filename_pattern or "*")]
+    if not selected:
+        names = ", ".join(a.get("filename", "?") for a in attachments) or "none"
+        return f"No attachments of {issue_key} match '{filename_pattern}' (attachments: {names})"
+
+    directory = os.path.join(output_dir or ATTACHMENT_DIR, *([safe_filename(site, site)] if site else []),
+                             safe_filename(issue_key, issue_key))
+    os.makedirs(directory, exist_ok=True)
+    names = local_names(attachments)  # over all attachments, so a file's name does not depend on the pattern
+    started = time.monotonic()
+    with ThreadPoolExecutor(min(DOWNLOAD_WORKERS, len(selected)), thread_name_prefix="jira-download") as pool:
+        # Each worker gets a copy of this context, so the tool deadline bounds its download too
+        futures = [
+            pool.submit(contextvars.copy_context().run, download, attachment,
+                        os.path.join(directory, names[attachment.get("id")]), headers)
+            for attachment in selected
+        ]
+        files = [future.result() for future in futures]
+    return json.dumps({
+        "issue_key": issue_key,
+        "directory": directory,
+        "files": files,
+        "total_bytes": sum(report["bytes"] for report in files),
+        "elapsed_s": round(time.monotonic() - started, 2),
+    }, indent=2)
@@ -0,0 +1,524 @@
+"""
+Config-driven MCP server startup.
+
+MCPManager starts every configured MCP server at the same time, stdio and
+streamable HTTP alike, so startup takes as long as the slowest server instead
+of the sum of all of them.
+
+- Each server has a startup deadline. Tools from servers that are ready by
+  their deadline are returned for the Agent's tool list.
+- Servers that are still connecting keep going in the background. When one
+  comes up, its tools are added to every agent the manager is hooked into,
+  before that agent's next turn.
+- A server that fails only loses its own tools.
+- Ready servers are pinged every MCP_HEALTH_INTERVAL seconds. A server whose
+  ping fails, or whose transport is found dead during a tool call, is
+  reconnected in the background with exponential backoff. A server that
+  failed at startup is retried the same way.
+- A tool call that hits a dead connection waits briefly for the reconnect.
+  It is then retried once if the tool is idempotent (read-only by its MCP
+  annotations, or named get/search/list/read/fetch). Other calls return an
+  error without being retried, so a write is never sent twice.
+- status() reports reconnects, total downtime, retried calls and failed pings
+  per server.
+
+Servers are read from MCP_SERVERS_FILE (default mcp_servers.json) in the usual
+"mcpServers" format, with ${VAR} interpolation (see mcp_servers.example.json):
+    {"mcpServers": {
+        "atlassian": {"command": "python", "args": ["-m", "mcp_atlassian"], "env": {...}},
+        "atlassian-cloud": {"url": "https://mcp.atlassian.com/v1/mcp", "headers": {...},
+                            "startup_deadline": 5}
+    }}
+
+Per-server keys besides the standard ones:
+    startup_deadline   seconds to wait before starting without this server (default MCP_STARTUP_DEADLINE=10)
+    startup_timeout    seconds the connection may take at all (default 60); later servers are hot-added
+    disabled           true to keep an entry in the file without starting it
+    idempotent_tools   tool names that are safe to retry after a reconnect (adds to the default rule)
+
+Health and reconnect settings:
+    MCP_HEALTH_INTERVAL=30     seconds between pings of a ready server
+    MCP_PING_TIMEOUT=5         seconds a ping may take
+    MCP_RECONNECT_BASE=1       first reconnect delay; doubles per failed attempt
+    MCP_RECONNECT_MAX=60       cap on the reconnect delay
+    MCP_RECONNECT_WAIT=10      seconds a tool call waits for a reconnect before giving up
+"""
+import asyncio
+import atexit
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+from mcp.shared.exceptions import MCPError
+from mcp.types import CONNECTION_CLOSED
+from strands.hooks import HookProvider, HookRegistry, BeforeInvocationEvent
+from strands.tools.mcp import MCPClient
+
+import deadlines
+from tool_executor import ProxyTool, run_tool, tool_result
+
+
+DEFAULT_CONFIG_FILE = "mcp_servers.json"
+DEFAULT_STARTUP_DEADLINE = 10.0
+DEFAULT_STARTUP_TIMEOUT = 60
+DEFAULT_HEALTH_INTERVAL = 30.0
+DEFAULT_PING_TIMEOUT = 5.0
+DEFAULT_RECONNECT_BASE = 1.0
+DEFAULT_RECONNECT_MAX = 60.0
+DEFAULT_RECONNECT_WAIT = 10.0
+
+# Tool names that only read, used when the server does not annotate its tools
+IDEMPOTENT_NAME = re.compile(r"(^|_)(get|search|list|read|fetch)(_|$)")
+
+# The self-hosted Atlassian server, used when no config file exists
+DEFAULT_SERVERS = {
+    "atlassian": {
+        "command": sys.executable,
+        "args": ["-m", "mcp_atlassian"],
+        "env": {
+            "JIRA_URL": "${JIRA_URL}",
+            "JIRA_USERNAME": "${JIRA_USERNAME}",
+            "JIRA_API_TOKEN": "${JIRA_API_TOKEN}",
+            "CONFLUENCE_URL": "${CONFLUENCE_URL}",
+            "CONFLUENCE_USERNAME": "${CONFLUENCE_USERNAME}",
+            "CONFLUENCE_API_TOKEN": "${CONFLUENCE_API_TOKEN}",
+        },
+    },
+}
+
+# Keys this module reads itself; everything else is passed to MCPClient.load_servers
+MANAGER_KEYS = {"startup_deadline", "idempotent_tools"}
+
+
+def load_config(path=None, default=None):
+    """
+    Read the server mapping from a JSON config file.
+
+    Args:
+        path: Config file (default: MCP_SERVERS_FILE or mcp_servers.json)
+        default: Mapping used when the file does not exist (default: DEFAULT_SERVERS)
+
+    Returns:
+        {server name: server config}
+    """
+    path = path or os.getenv("MCP_SERVERS_FILE", DEFAULT_CONFIG_FILE)
+    if not os.path.exists(path):
+        return dict(default if default is not None else DEFAULT_SERVERS)
+    with open(path) as f:
+        config = json.load(f)
+    return config.get("mcpServers", config)
+
+
+def is_idempotent(tool, extra_names=()):
+    """Whether a call to this MCP tool may safely be sent twice."""
+    if tool.tool_name in extra_names:
+        return True
+    annotations = getattr(getattr(tool, "mcp_tool", None), "annotations", None)
+    if annotations is not None:
+        if annotations.read_only_hint or annotations.idempotent_hint:
+            return True
+        if annotations.destructive_hint:
+            return False
+    return bool(IDEMPOTENT_NAME.search(tool.tool_name))
+
+
+class MCPServer:
+    """
+    One configured MCP server, its connection state and its reconnect loop.
+
+    Args:
+        name: Server name from the config
+        config: Server config (mcpServers format plus the MANAGER_KEYS)
+        startup_deadline: Default seconds to wait for the server at startup
+        reconnect_base: First reconnect delay in seconds
+        reconnect_max: Cap on the reconnect delay
+    """
+
+    def __init__(self, name, config, startup_deadline=DEFAULT_STARTUP_DEADLINE,
+                 reconnect_base=DEFAULT_RECONNECT_BASE, reconnect_max=DEFAULT_RECONNECT_MAX):
+        self.name = name
+        self.config = {key: value for key, value in config.items() if key not in MANAGER_KEYS}
+        self.config.setdefault("startup_timeout", DEFAULT_STARTUP_TIMEOUT)
+        self.startup_deadline = float(config.get("startup_deadline", startup_deadline))
+        self.idempotent_tools = set(config.get("idempotent_tools", ()))
+        self.reconnect_base = reconnect_base
+        self.reconnect_max = reconnect_max
+        self.state = "pending"
+        self.client = None
+        self.tools = {}
+        self.error = None
+        self.started = None
+        self.ready_s = None
+        self.ready = threading.Event()       # the first connection attempt finished
+        self.connected = threading.Event()   # a live connection is available now
+        self.lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._reconnector = None
+        self._attempts = 0
+        self.down_since = None
+        self.last_ping = 0.0
+        self.reconnects = 0
+        self.downtime_s = 0.0
+        self.retried_calls = 0
+        self.failed_pings = 0
+
+    def _open(self):
+        """Start a new client and list its tools (blocking)."""
+        clients = MCPClient.load_servers({self.name: self.config})
+        if not clients:
+            raise ValueError("server is disabled or its configuration could not be resolved")
+        client = clients[0].start()
+        try:
+            tools, token = [], None
+            while True:
+                page = client.list_tools_sync(pagination_token=token)
+                tools.extend(page)
+                token = getattr(page, "pagination_token", None)
+                if not token:
+                    break
+        except Exception:
+            _stop_client(client)
+            raise
+        return client, {tool.tool_name: tool for tool in tools}
+
+    def connect(self):
+        """First connection attempt; records the outcome instead of raising."""
+        self.state = "starting"
+        self.started = time.monotonic()
+        try:
+            self.client, self.tools = self._open()
+            self.ready_s = time.monotonic() - self.started
+            self.state = "ready"
+            self.last_ping = time.monotonic()
+            self.connected.set()
+        except Exception as e:
+            self.error = str(e)
+            self.state = "failed"
+        finally:
+            self.ready.set()
+
+    def ping(self, timeout=DEFAULT_PING_TIMEOUT):
+        """
+        Send an MCP ping over the current connection.
+
+        MCPClient has no public ping, so this runs the session's send_ping on the
+        client's background loop, the same way its *_sync methods run requests.
+        """
+        client = self.client
+        self.last_ping = time.monotonic()
+        try:
+            if client is None or not client._is_session_active():
+                raise ConnectionError("transport is closed")
+            session = client._background_thread_session
+            client._invoke_on_background_thread(session.send_ping()).result(timeout)
+            return True
+        except MCPError as e:
+            # Any JSON-RPC error reply (e.g. a server without ping) still proves the transport works
+            if e.error.code != CONNECTION_CLOSED:
+                return True
+            self.failed_pings += 1
+            self.error = f"ping failed: {e}"
+            return False
+        except Exception as e:
+            self.failed_pings += 1
+            self.error = f"ping failed: {e or type(e).__name__}"
+            return False
+
+    def mark_down(self, reason):
+        """Record a lost connection and start reconnecting in the background."""
+        with self.lock:
+            if self.state == "ready":
+                self.state = "reconnecting"
+                self.error = reason
+                self.down_since = time.monotonic()
+                self._attempts = 0
+                self.connected.clear()
+                print(f"[WARNING] MCP server '{self.name}' connection lost ({reason}); reconnecting")
+        self.ensure_reconnecting()
+
+    def ensure_reconnecting(self):
+        """Start the reconnect loop unless it is running or the server is up or stopped."""
+        with self.lock:
+            if self.state not in ("reconnecting", "failed") or self._stopping.is_set():
+                return
+            if self._reconnector is not None and self._reconnector.is_alive():
+                return
+            self._reconnector = threading.Thread(
+                target=self._reconnect_loop, name=f"mcp-reconnect-{self.name}", daemon=True
+            )
+            self._reconnector.start()
+
+    def backoff(self):
+        """Delay before the next attempt: base * 2^(attempts-1), capped, with jitter."""
+        delay = min(self.reconnect_max, self.reconnect_base * 2 ** max(0, self._attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _reconnect_loop(self):
+        while not self._stopping.is_set():
+            old, self.client = self.client, None
+            if old is not None:
+                _stop_client(old)
+            try:
+                client, tools = self._open()
+            except Exception as e:
+                self._attempts += 1
+                self.error = str(e)
+                if self._stopping.wait(self.backoff()):
+                    return
+                continue
+            with self.lock:
+                if self._stopping.is_set():
+                    _stop_client(client)
+                    return
+                self.client, self.tools = client, tools
+                recovered = self.down_since is not None
+                if recovered:
+                    down = time.monotonic() - self.down_since
+                    self.downtime_s += down
+                    self.reconnects += 1
+                    self.down_since = None
+                elif self.ready_s is None:
+                    self.ready_s = time.monotonic() - self.started
+                self.state = "ready"
+                self.error = None
+                self.last_ping = time.monotonic()
+                self.connected.set()
+            if recovered:
+                print(f"[OK] MCP server '{self.name}' reconnected after {down:.1f}s ({self._attempts + 1} attempts)")
+            else:
+                print(f"[OK] MCP server '{self.name}' started on retry: {len(tools)} tools")
+            return
+
+    def stop(self):
+        self._stopping.set()
+        with self.lock:
+            client, self.client = self.client, None
+            self.state = "stopped"
+            self.connected.clear()
+        if client is not None:
+            _stop_client(client)
+
+    def status(self):
+        downtime = self.downtime_s
+        if self.down_since is not None:
+            downtime += time.monotonic() - self.down_since
+        return {
+            "state": self.state,
+            "tools": len(self.tools),
+            "ready_s": round(self.ready_s, 2) if self.ready_s is not None else None,
+            "reconnects": self.reconnects,
+            "downtime_s": round(downtime, 1),
+            "retried_calls": self.retried_calls,
+            "failed_pings": self.failed_pings,
+            "error": self.error,
+        }
+
+
+def _stop_client(client):
+    try:
+        client.stop(None, None, None)
+    except Exception:
+        pass
+
+
+class MCPTool(ProxyTool):
+    """
+    Agent-facing tool that calls whichever client currently serves it.
+
+    A call that finds the connection dead marks the server down, waits up to
+    reconnect_wait seconds for the reconnect, and is retried once if the tool
+    is idempotent.
+    """
+
+    def __init__(self, server, tool, reconnect_wait=DEFAULT_RECONNECT_WAIT):
+        super().__init__(tool)
+        self.server = server
+        self.reconnect_wait = reconnect_wait
+        self.idempotent = is_idempotent(tool, server.idempotent_tools)
+
+    async def _wait_connected(self):
+        if self.server.connected.is_set():
+            return True
+        if self.server.state == "stopped":
+            return False
+        self.server.ensure_reconnecting()
+        wait = min(self.reconnect_wait, deadlines.remaining(self.reconnect_wait))
+        return await asyncio.to_thread(self.server.connected.wait, wait)
+
+    async def _call(self, tool_use, invocation_state, **kwargs):
+        tool = self.server.tools.get(self.tool_name)
+        if tool is None:
+            return tool_result(tool_use["toolUseId"], f"Error: MCP server '{self.server.name}' no longer offers "
+                                                      f"'{self.tool_name}'", "error")
+        try:
+            return await run_tool(tool, tool_use, invocation_state, **kwargs)
+        except Exception as e:
+            return tool_result(tool_use["toolUseId"], f"Tool execution failed: {e}", "error")
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        server = self.server
+        if not await self._wait_connected():
+            yield tool_result(tool_use["toolUseId"], f"Error: MCP server '{server.name}' is {server.state}", "error")
+            return
+        result = await self._call(tool_use, invocation_state, **kwargs)
+        if result.get("status") != "error" or result.get("cancelled"):
+            yield result
+            return
+        # A failed call may just be a tool error; only a failed ping means the transport is gone
+        if await asyncio.to_thread(server.ping, min(DEFAULT_PING_TIMEOUT, deadlines.remaining(DEFAULT_PING_TIMEOUT))):
+            yield result
+            return
+        server.mark_down(server.error)
+        if not self.idempotent:
+            yield tool_result(
+                tool_use["toolUseId"],
+                f"Error: the connection to MCP server '{server.name}' was lost during this call, and "
+                f"'{self.tool_name}' may have side effects, so it was not retried. Check whether it took "
+                f"effect before calling it again.",
+                "error",
+            )
+            return
+        if not await self._wait_connected():
+            yield tool_result(
+                tool_use["toolUseId"], f"Error: MCP server '{server.name}' is {server.state} ({server.error})", "error"
+            )
+            return
+        server.retried_calls += 1
+        yield await self._call(tool_use, invocation_state, **kwargs)
+
+
+class MCPManager(HookProvider):
+    """
+    Start MCP servers concurrently, keep them healthy, and keep agents' tool lists in step with them.
+
+    Args:
+        servers: {name: config} mapping (see load_config)
+        startup_deadline: Default seconds to wait for each server before starting without it
+        health_interval: Seconds between pings of each ready server (0 disables pings)
+        ping_timeout: Seconds a ping may take before the server counts as down
+        reconnect_base: First reconnect delay in seconds (doubles per failed attempt)
+        reconnect_max: Cap on the reconnect delay
+        reconnect_wait: Seconds a tool call waits for a reconnect
+    """
+
+    def __init__(self, servers, startup_deadline=DEFAULT_STARTUP_DEADLINE, health_interval=DEFAULT_HEALTH_INTERVAL,
+                 ping_timeout=DEFAULT_PING_TIMEOUT, reconnect_base=DEFAULT_RECONNECT_BASE,
+                 reconnect_max=DEFAULT_RECONNECT_MAX, reconnect_wait=DEFAULT_RECONNECT_WAIT):
+        self.servers = [
+            MCPServer(name, config, startup_deadline, reconnect_base, reconnect_max)
+            for name, config in servers.items()
+            if not config.get("disabled")
+        ]
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.reconnect_wait = reconnect_wait
+        self._proxies = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._started = False
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._add_late_tools)
+
+    def start(self):
+        """
+        Launch all servers concurrently and wait for each up to its startup deadline.
+
+        Returns:
+            Tools from the servers that were ready in time
+        """
+        if not self._started:
+            self._started = True
+            atexit.register(self.stop)
+            for server in self.servers:
+                threading.Thread(target=self._connect, args=(server,), name=f"mcp-{server.name}", daemon=True).start()
+            threading.Thread(target=self._monitor, name="mcp-health", daemon=True).start()
+        launched = time.monotonic()
+        for server in self.servers:
+            server.ready.wait(max(0.0, launched + server.startup_deadline - time.monotonic()))
+            if server.state == "ready":
+                print(f"[OK] MCP server '{server.name}': {len(server.tools)} tools ({server.ready_s:.1f}s)")
+            elif server.state in ("failed", "reconnecting"):
+                print(f"[WARNING] MCP server '{server.name}' failed to start: {server.error} (retrying in background)")
+            else:
+                print(f"[INFO] MCP server '{server.name}' still starting; its tools will be added when it is ready")
+        return self.tools()
+
+    def _connect(self, server):
+        server.connect()
+        if server.state == "failed":
+            server.ensure_reconnecting()
+
+    def _monitor(self):
+        """Ping ready servers every health_interval seconds; mark the ones that do not answer as down."""
+        if self.health_interval <= 0:
+            return
+        while not self._stopping.wait(min(1.0, self.health_interval)):
+            for server in self.servers:
+                if server.state != "ready" or time.monotonic() - server.last_ping < self.health_interval:
+                    continue
+                if not server.ping(self.ping_timeout) and not self._stopping.is_set():
+                    server.mark_down(server.error)
+
+    def tools(self):
+        """Tools of every ready server (one proxy per tool name; the first server to offer a name wins)."""
+        tools = []
+        with self._lock:
+            for server in self.servers:
+                if server.state != "ready":
+                    continue
+                for name, tool in server.tools.items():
+                    proxy = self._proxies.get(name)
+                    if proxy is None:
+                        proxy = self._proxies[name] = MCPTool(server, tool, self.reconnect_wait)
+                    elif proxy.server is not server:
+                        continue
+                    tools.append(proxy)
+        return tools
+
+    def _add_late_tools(self, event: BeforeInvocationEvent) -> None:
+        registered = set(event.agent.tool_names)
+        added = {}
+        for tool in self.tools():
+            if tool.tool_name not in registered:
+                event.agent.tool_registry.register_tool(tool)
+                added[tool.server.name] = added.get(tool.server.name, 0) + 1
+        for name, count in added.items():
+            print(f"[INFO] MCP server '{name}' is now ready: {count} tools added")
+
+    def status(self):
+        return {server.name: server.status() for server in self.servers}
+
+    def format_status(self):
+        """One line per server that has had connection trouble, for printing after a run."""
+        lines = []
+        for name, status in self.status().items():
+            if status["reconnects"] or status["failed_pings"] or status["state"] != "ready":
+                lines.append(
+                    f"MCP {name}: {status['state']}, reconnects={status['reconnects']} "
+                    f"downtime={status['downtime_s']}s retried_calls={status['retried_calls']} "
+                    f"failed_pings={status['failed_pings']}"
+                )
+        return "\n".join(lines)
+
+    def stop(self):
+        self._stopping.set()
+        for server in self.servers:
+            server.stop()
+
+
+def from_env(default_servers=None):
+    """Build an MCPManager from MCP_SERVERS_FILE and the MCP_* startup, health and reconnect settings."""
+    return MCPManager(
+        load_config(default=default_servers),
+        startup_deadline=float(os.getenv("MCP_STARTUP_DEADLINE", str(DEFAULT_STARTUP_DEADLINE))),
+        health_interval=float(os.getenv("MCP_HEALTH_INTERVAL", str(DEFAULT_HEALTH_INTERVAL))),
+        ping_timeout=float(os.getenv("MCP_PING_TIMEOUT", str(DEFAULT_PING_TIMEOUT))),
+        reconnect_base=float(os.getenv("MCP_RECONNECT_BASE", str(DEFAULT_RECONNECT_BASE))),
+        reconnect_max=float(os.getenv("MCP_RECONNECT_MAX", str(DEFAULT_RECONNECT_MAX))),
+        reconnect_wait=float(os.getenv("MCP_RECONNECT_WAIT", str(DEFAULT_RECONNECT_WAIT))),
+    )
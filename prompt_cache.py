@@ -0,0 +1,127 @@
+"""
+Bedrock prompt caching for the agent entry points.
+
+Every turn re-sends the same prefix: the tool specs for the whole toolset, any
+system prompt, and the conversation so far. On models that support it,
+create_model() places Bedrock cache points on that stable prefix so repeated
+turns read it from the cache instead of paying full prefill again.
+
+Support differs per model family:
+- Anthropic Claude: cache points on tools, system prompt and messages
+- Amazon Nova: cache points on system prompt and messages (not tools)
+- anything else: caching is left off
+
+If Bedrock still rejects a cache point (older model version, region without
+caching), CachingBedrockModel turns caching off for that model and retries the
+request once, so the session keeps working without it.
+
+Configure with:
+    PROMPT_CACHE=auto      # auto (use when supported) | off
+    PROMPT_CACHE_TTL=5m    # optional, Claude only (e.g. 5m, 1h)
+"""
+import os
+
+from botocore.exceptions import ClientError
+from strands.models.bedrock import BedrockModel
+from strands.models.model import CacheConfig
+
+
+# Which parts of the request each model family accepts cache points on
+CACHE_SUPPORT = {
+    "anthropic.claude": {"tools", "system", "messages"},
+    "amazon.nova": {"system", "messages"},
+}
+
+
+def cache_support(model_id):
+    """Return the set of request sections the model can cache (empty when unsupported)."""
+    model_id = (model_id or "").lower()
+    for family, sections in CACHE_SUPPORT.items():
+        if family in model_id:
+            return set(sections)
+    return set()
+
+
+def cache_config_for(model_id, mode=None, ttl=None):
+    """
+    Build the CacheConfig for a model, or None when caching is off or unsupported.
+
+    Args:
+        model_id: Bedrock model ID
+        mode: "auto" or "off" (default: PROMPT_CACHE)
+        ttl: Cache TTL such as "5m" or "1h" (default: PROMPT_CACHE_TTL; only Claude honors it)
+
+    Returns:
+        A CacheConfig, or None
+    """
+    mode = (mode or os.getenv("PROMPT_CACHE", "auto")).lower()
+    sections = cache_support(model_id)
+    if mode == "off" or not sections:
+        return None
+    ttl = ttl or os.getenv("PROMPT_CACHE_TTL") or None
+    if "anthropic.claude" not in model_id.lower():
+        ttl = None
+    return CacheConfig(
+        strategy="anthropic",
+        ttl=ttl,
+        tools_ttl="tools" in sections,
+        system_prompt_ttl="system" in sections,
+    )
+
+
+def _is_cache_rejection(error):
+    """True when Bedrock rejected the request because of a cache point."""
+    if not isinstance(error, ClientError):
+        return False
+    code = error.response.get("Error", {}).get("Code")
+    return code == "ValidationException" and "cach" in str(error).lower()
+
+
+class CachingBedrockModel(BedrockModel):
+    """BedrockModel that drops its cache points and retries once if Bedrock rejects them."""
+
+    async def stream(self, *args, **kwargs):
+        started = False
+        try:
+            async for event in super().stream(*args, **kwargs):
+                started = True
+                yield event
+        except ClientError as e:
+            if started or not self.config.get("cache_config") or not _is_cache_rejection(e):
+                raise
+            print(f"\n[WARNING] Prompt caching rejected for {self.config.get('model_id')}; continuing without it")
+            self.update_config(cache_config=None)
+            async for event in super().stream(*args, **kwargs):
+                yield event
+
+    def caching_summary(self):
+        """Short description of what is cached, for startup banners."""
+        cache_config = self.config.get("cache_config")
+        strategy = cache_config.strategy if cache_config else None
+        if strategy == "auto":
+            # BedrockModel only places cache points itself on Claude models
+            model_id = (self.config.get("model_id") or "").lower()
+            strategy = "anthropic" if "claude" in model_id or "anthropic" in model_id else None
+        if strategy != "anthropic":
+            return "off"
+        sections = []
+        for name, section_ttl in (("tools", cache_config.tools_ttl), ("system prompt", cache_config.system_prompt_ttl)):
+            if section_ttl:
+                sections.append(f"{name} (ttl {section_ttl})" if isinstance(section_ttl, str) else name)
+        sections.append("conversation")
+        return ", ".join(sections) + (f" (ttl {cache_config.ttl})" if cache_config.ttl else "")
+
+
+def create_model(model_id, **kwargs):
+    """
+    Create a Bedrock model with prompt caching configured for its model family.
+
+    Args:
+        model_id: Bedrock model ID
+        **kwargs: Extra BedrockModel configuration
+
+    Returns:
+        A CachingBedrockModel
+    """
+    kwargs.setdefault("cache_config", cache_config_for(model_id))
+    return CachingBedrockModel(model_id=model_id, **kwargs)
@@ -0,0 +1,254 @@
+"""
+Adaptive token-bucket rate limiting for Atlassian REST calls.
+
+One bucket per host is shared by every thread in the process. Setting
+ATLASSIAN_RATE_LIMIT_FILE makes the bucket state live in that file (guarded
+by an OS file lock) so several agent processes on one machine share a budget.
+
+Buckets adapt to what the server says:
+- 429/503 halve the rate and pause the bucket for Retry-After seconds
+- X-RateLimit-Remaining/-Limit/-Reset (and X-RateLimit-NearLimit) slow the
+  rate down to what is left in the current window
+- successful responses slowly raise the rate back toward the configured maximum
+
+Callers block in acquire() instead of failing, so bursts are queued.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+THROTTLE_STATUSES = (429, 503)
+
+
+@contextlib.contextmanager
+def _locked_file(path):
+    """Open `path` for read/write under an exclusive OS lock."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        with os.fdopen(os.dup(fd), "r+") as f:
+            yield f
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+
+def parse_retry_after(value, now=None):
+    """Convert a Retry-After header (seconds or HTTP date) to seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - (now or time.time()))
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_reset(value, now):
+    """Convert X-RateLimit-Reset (ISO timestamp or epoch seconds) to seconds from now."""
+    if not value:
+        return None
+    try:
+        number = float(value)
+        return max(0.0, number - now) if number > 1e9 else number
+    except ValueError:
+        pass
+    try:
+        return max(0.0, datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() - now)
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    A thread-safe (and optionally cross-process) adaptive token bucket.
+
+    Args:
+        rate: Initial and maximum sustained requests per second
+        burst: Bucket capacity
+        min_rate: Floor the adaptive rate never drops below
+        state_file: Optional path; when set the bucket state is shared through this file
+    """
+
+    def __init__(self, rate=10.0, burst=20, min_rate=0.5, state_file=None):
+        self.max_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._state = self._initial_state()
+        self._counter_lock = threading.Lock()
+        self.waiting = 0
+        self.throttled = 0
+        self.requests = 0
+        self.waited_s = 0.0
+
+    def _initial_state(self):
+        return {"tokens": float(self.burst), "updated": time.time(), "rate": float(self.max_rate), "blocked_until": 0.0}
+
+    def _transact(self, fn):
+        """Apply fn to the bucket state atomically across threads (and processes when file-backed)."""
+        with self._lock:
+            if not self.state_file:
+                return fn(self._state)
+            with _locked_file(self.state_file) as f:
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else self._initial_state()
+                except ValueError:
+                    state = self._initial_state()
+                result = fn(state)
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                return result
+
+    def _refill(self, state, now):
+        state["tokens"] = min(self.burst, state["tokens"] + (now - state["updated"]) * state["rate"])
+        state["updated"] = now
+
+    def _try_take(self, state):
+        now = time.time()
+        self._refill(state, now)
+        if now < state["blocked_until"]:
+            return state["blocked_until"] - now
+        if state["tokens"] >= 1:
+            state["tokens"] -= 1
+            return 0.0
+        return (1 - state["tokens"]) / state["rate"]
+
+    def acquire(self, timeout=None):
+        """
+        Block until a token is available.
+
+        Args:
+            timeout: Maximum seconds to wait; None waits indefinitely
+
+        Returns:
+            True if a token was taken, False if the timeout would be exceeded
+        """
+        started = time.monotonic()
+        with self._counter_lock:
+            self.waiting += 1
+        try:
+            while True:
+                wait = self._transact(self._try_take)
+                if wait <= 0:
+                    return True
+                if timeout is not None and time.monotonic() - started + wait > timeout:
+                    return False
+                time.sleep(min(wait, 0.5))
+        finally:
+            with self._counter_lock:
+                self.waiting -= 1
+                self.requests += 1
+                self.waited_s += time.monotonic() - started
+
+    def observe(self, status_code, headers):
+        """
+        Adapt the rate from a response.
+
+        Args:
+            status_code: HTTP status of the response
+            headers: Response headers (case-insensitive mapping)
+
+        Returns:
+            Seconds the bucket is now paused for (0 when not throttled)
+        """
+        now = time.time()
+        retry_after = parse_retry_after(headers.get("Retry-After"), now)
+        remaining = headers.get("X-RateLimit-Remaining")
+        limit = headers.get("X-RateLimit-Limit")
+        reset_in = _parse_reset(headers.get("X-RateLimit-Reset"), now)
+        near_limit = str(headers.get("X-RateLimit-NearLimit", "")).lower() == "true"
+
+        def adjust(state):
+            self._refill(state, now)
+            if status_code in THROTTLE_STATUSES:
+                state["rate"] = max(self.min_rate, state["rate"] / 2)
+                pause = retry_after if retry_after is not None else min(30.0, 1 / state["rate"] * 4)
+                state["blocked_until"] = max(state["blocked_until"], now + pause)
+                state["tokens"] = 0.0
+                return state["blocked_until"] - now
+            if remaining is not None and limit and reset_in:
+                if float(remaining) <= float(limit) * 0.1:
+                    budget = float(remaining) / max(reset_in, 1.0)
+                    state["rate"] = max(self.min_rate, min(state["rate"], budget))
+                    return 0.0
+            if near_limit:
+                state["rate"] = max(self.min_rate, state["rate"] * 0.8)
+                return 0.0
+            # Additive increase back toward the configured ceiling
+            state["rate"] = min(self.max_rate, state["rate"] + self.max_rate * 0.05)
+            return 0.0
+
+        paused = self._transact(adjust)
+        if paused:
+            with self._counter_lock:
+                self.throttled += 1
+        return paused
+
+    def stats(self):
+        state = self._transact(lambda state: dict(state))
+        return {
+            "rate_per_s": round(state["rate"], 2),
+            "max_rate_per_s": self.max_rate,
+            "tokens": round(state["tokens"], 2),
+            "queue_depth": self.waiting,
+            "paused_for_s": round(max(0.0, state["blocked_until"] - time.time()), 2),
+            "throttled": self.throttled,
+            "requests": self.requests,
+            "avg_wait_ms": round(self.waited_s / self.requests * 1000, 1) if self.requests else 0.0,
+            "shared_file": self.state_file,
+        }
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def limiter_for(url):
+    """Return the process-wide bucket for the URL's host, creating it from ATLASSIAN_RATE_* settings."""
+    host = urlparse(url).netloc or "default"
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            state_file = os.getenv("ATLASSIAN_RATE_LIMIT_FILE")
+            if state_file:
+                state_file = f"{state_file}.{host.replace(':', '_')}"
+            bucket = TokenBucket(
+                rate=float(os.getenv("ATLASSIAN_RATE", "10")),
+                burst=int(os.getenv("ATLASSIAN_BURST", "20")),
+                state_file=state_file,
+            )
+            _buckets[host] = bucket
+        return bucket
+
+
+def stats():
+    """Current rate, queue depth and throttle counts for every host seen so far."""
+    with _buckets_lock:
+        buckets = dict(_buckets)
+    return {host: bucket.stats() for host, bucket in buckets.items()}
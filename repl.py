@@ -0,0 +1,227 @@
+"""
+Shared interactive loop for the agent entry points.
+
+Responses are streamed: text deltas are printed as they arrive from the
+agent's async stream, tool calls are shown inline as they start and finish,
+and each turn ends with its time-to-first-token, total and model time.
+
+Commands starting with "/" (/profile, /stats, /mem, /help) are REPL
+meta-commands handled by repl_diagnostics instead of being sent to the agent;
+/bg, /jobs, /wait and /cancel run commands as background jobs (repl_jobs).
+"""
+import asyncio
+import json
+import signal
+import sys
+import time
+
+from strands.hooks import (
+    HookProvider, HookRegistry, BeforeModelCallEvent, AfterModelCallEvent, BeforeToolCallEvent, AfterToolCallEvent,
+)
+
+import repl_jobs
+import response_cache
+from repl_diagnostics import SessionDiagnostics
+
+
+EXIT_COMMANDS = ['exit', 'quit', 'q']
+
+
+class StreamingDisplay(HookProvider):
+    """
+    Print a turn to the terminal as it happens.
+
+    Register it on the agent (agent.hooks.add_hook) so tool start/finish events are
+    shown inline; the agent should be created with callback_handler=None so the
+    text is not printed twice.
+    """
+
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self._line_open = False
+        self._tool_starts = {}
+        self._model_started = None
+        self.turn = None
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeModelCallEvent, self._on_model_start)
+        registry.add_callback(AfterModelCallEvent, self._on_model_end)
+        registry.add_callback(BeforeToolCallEvent, self._on_tool_start)
+        registry.add_callback(AfterToolCallEvent, self._on_tool_end)
+
+    def _write(self, text):
+        self.out.write(text)
+        self.out.flush()
+        self._line_open = not text.endswith("\n")
+
+    def _line(self, text):
+        if self._line_open:
+            self._write("\n")
+        self._write(text + "\n")
+
+    def _on_model_start(self, event: BeforeModelCallEvent) -> None:
+        self._model_started = time.perf_counter()
+
+    def _on_model_end(self, event: AfterModelCallEvent) -> None:
+        if self.turn is not None and self._model_started is not None:
+            self.turn["model_time_s"] += time.perf_counter() - self._model_started
+        self._model_started = None
+
+    def _on_tool_start(self, event: BeforeToolCallEvent) -> None:
+        tool_use = event.tool_use
+        self._tool_starts[tool_use["toolUseId"]] = time.perf_counter()
+        args = json.dumps(tool_use.get("input") or {}, default=str)
+        if len(args) > 80:
+            args = args[:77] + "..."
+        self._line(f"  [tool] {tool_use['name']} {args}")
+
+    def _on_tool_end(self, event: AfterToolCallEvent) -> None:
+        tool_use = event.tool_use
+        started = self._tool_starts.pop(tool_use["toolUseId"], None)
+        elapsed = time.perf_counter() - started if started else 0.0
+        status = event.result.get("status", "success")
+        if self.turn is not None:
+            self.turn["tools"] += 1
+            self.turn["tool_time_s"] += elapsed
+            self.turn["by_tool"][tool_use["name"]] = self.turn["by_tool"].get(tool_use["name"], 0.0) + elapsed
+        self._line(f"  [tool] {tool_use['name']} -> {status} ({elapsed:.2f}s)")
+
+    async def stream(self, agent, prompt):
+        """
+        Run one turn through agent.stream_async, printing as it goes.
+
+        Returns:
+            (AgentResult, timing dict with first_token_s, total_s, model_time_s, tools, tool_time_s
+            and by_tool, the seconds spent per tool name)
+        """
+        started = time.perf_counter()
+        self.turn = {"first_token_s": None, "total_s": None, "model_time_s": 0.0, "tools": 0, "tool_time_s": 0.0,
+                     "by_tool": {}}
+        result = None
+        async for event in agent.stream_async(prompt):
+            if event.get("data"):
+                if self.turn["first_token_s"] is None:
+                    self.turn["first_token_s"] = time.perf_counter() - started
+                self._write(event["data"])
+            elif "result" in event:
+                result = event["result"]
+        if self._line_open:
+            self._write("\n")
+        self.turn["total_s"] = time.perf_counter() - started
+        return result, self.turn
+
+    def run_turn(self, agent, prompt):
+        """Synchronous wrapper around stream() for one-shot entry points."""
+        return asyncio.run(self.stream(agent, prompt))
+
+    @staticmethod
+    def format_timing(turn):
+        first = f"{turn['first_token_s']:.2f}s" if turn["first_token_s"] is not None else "n/a"
+        line = f"[latency] first token {first} | total {turn['total_s']:.2f}s | model {turn['model_time_s']:.2f}s"
+        if turn["tools"]:
+            line += f" | {turn['tools']} tool call(s), {turn['tool_time_s']:.2f}s in tools"
+        return line
+
+
+def run_repl(agent, turn_metrics=None, cache=None, session=None, width=60, agent_factory=None):
+    """
+    Read commands until the user exits, streaming each response.
+
+    Everything runs on one event loop: the prompt is read on a worker thread, so
+    background jobs (see repl_jobs) keep running while the user types. Ctrl+C
+    cancels the foreground turn, or stops a /wait.
+
+    Args:
+        agent: Agent created with callback_handler=None
+        turn_metrics: Optional agent_metrics.TurnMetrics registered on the agent, printed after each turn
+        cache: Optional response_cache.ResponseCache consulted before running a turn
+        session: Optional session_log.SessionLog registered on the agent; also records cache hits
+        width: Width of the separator lines
+        agent_factory: Optional callable returning a new agent for each /bg job (without it /bg is refused)
+    """
+    asyncio.run(_repl_loop(agent, turn_metrics, cache, session, width, agent_factory))
+
+
+async def _repl_loop(agent, turn_metrics, cache, session, width, agent_factory):
+    display = StreamingDisplay()
+    agent.hooks.add_hook(display)
+    diagnostics = SessionDiagnostics(agent)
+    jobs = repl_jobs.from_env(agent_factory)
+    loop = asyncio.get_running_loop()
+    foreground = None
+
+    def interrupt():
+        if foreground is not None and not foreground.done():
+            foreground.cancel()
+        else:
+            print("\n[INFO] Type 'exit' to quit")
+
+    try:
+        loop.add_signal_handler(signal.SIGINT, interrupt)
+    except (NotImplementedError, RuntimeError):
+        pass  # e.g. Windows: Ctrl+C keeps its default behavior
+
+    try:
+        while True:
+            try:
+                command = await loop.run_in_executor(
+                    None, input, "\nEnter a command (or 'exit' to quit, /help for meta-commands): "
+                )
+            except EOFError:
+                command = "exit"
+
+            if command.lower() in EXIT_COMMANDS:
+                print("\nGoodbye!")
+                break
+
+            if not command.strip():
+                continue
+
+            if command.strip().lower() == "/help":
+                print(repl_jobs.HELP)
+            try:
+                foreground = asyncio.ensure_future(jobs.handle(command))
+                if await foreground:
+                    continue
+            except asyncio.CancelledError:
+                continue
+            finally:
+                foreground = None
+
+            if diagnostics.handle(command):
+                continue
+
+            print("\n" + "=" * width)
+            print("Agent Response:")
+            print("=" * width + "\n")
+
+            try:
+                # Revalidation makes HTTP requests; keep it off the loop so /bg jobs keep running
+                hit = await asyncio.to_thread(cache.lookup, agent, command) if cache else None
+                if hit:
+                    print(hit.text)
+                    print(hit.banner())
+                    response_cache.remember_exchange(agent, command, hit.text)
+                    if session:
+                        session.sync(agent)
+                else:
+                    foreground = asyncio.ensure_future(diagnostics.run(display.stream, agent, command))
+                    response, timing = await foreground
+                    diagnostics.record_turn(timing)
+                    print("\n" + display.format_timing(timing))
+                    if diagnostics.profiling:
+                        print(diagnostics.format_profile())
+                    if turn_metrics:
+                        print(turn_metrics.format_last())
+                    if cache and response is not None:
+                        await asyncio.to_thread(cache.store, agent, command, response)
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                print("\n[INTERRUPTED] Turn cancelled")
+            except Exception as e:
+                print(f"[ERROR] {e}")
+            finally:
+                foreground = None
+
+            print("\n" + "=" * width)
+    finally:
+        await jobs.shutdown()
@@ -0,0 +1,215 @@
+"""
+REPL meta-commands for finding out why a session is slow or growing.
+
+Commands typed at the REPL prompt that start with "/" are handled here and
+never sent to the model:
+    /profile on|off   run every following turn under cProfile and print its hottest functions
+    /profile [N]      show the top N functions of the last profiled turn again
+    /stats            per-turn model vs tool time, and the slowest tools of the session
+    /mem              tracemalloc snapshot: allocation growth since the previous /mem, and
+                      the size of the in-memory structures that grow with a session
+    /mem off          stop tracing allocations
+    /help             list the commands
+
+cProfile only sees the REPL thread, i.e. the event loop streaming the model
+response and running the hooks (including those of background jobs running
+during the turn). Tools run on worker threads and show up in /stats as tool
+time instead. tracemalloc slows Python allocations down noticeably, so it
+only runs between the first /mem and /mem off.
+"""
+import cProfile
+import io
+import json
+import pstats
+import tracemalloc
+
+import issue_prefetch
+import tool_memo
+
+
+HELP = """Meta-commands:
+  /profile on|off   profile each turn with cProfile and print its hottest functions
+  /profile [N]      show the top N functions of the last profiled turn
+  /stats            model vs tool time per turn, slowest tools
+  /mem              allocation growth since the previous /mem and sizes of session structures
+  /mem off          stop tracing allocations
+  /help             this list"""
+
+
+def _json_size(value):
+    return len(json.dumps(value, default=str))
+
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+class SessionDiagnostics:
+    """
+    Profiling, timing and memory meta-commands for one REPL session.
+
+    Args:
+        agent: The REPL's agent, whose history and caches /mem measures
+        top: Functions listed per profile
+    """
+
+    def __init__(self, agent, top=15):
+        self.agent = agent
+        self.top = top
+        self.profiling = False
+        self.last_profile = None
+        self.turns = []
+        self._snapshot = None
+        self._sizes = {}
+
+    def handle(self, command):
+        """Run a meta-command; returns False when the command is not one."""
+        words = command.strip().split()
+        if not words or not words[0].startswith("/"):
+            return False
+        name, args = words[0].lower(), [word.lower() for word in words[1:]]
+        if name == "/profile":
+            print(self._profile_command(args))
+        elif name == "/stats":
+            print(self.format_stats())
+        elif name == "/mem":
+            print(self._mem_command(args))
+        elif name == "/help":
+            print(HELP)
+        else:
+            print(f"[WARNING] Unknown command {name}\n{HELP}")
+        return True
+
+    # ----- profiling -----
+
+    def _profile_command(self, args):
+        if args and args[0] == "on":
+            self.profiling = True
+            return "[OK] Profiling every turn (/profile off to stop)"
+        if args and args[0] == "off":
+            self.profiling = False
+            return "[OK] Profiling off"
+        if self.last_profile is None:
+            return "[INFO] No profiled turn yet; use /profile on"
+        return self.format_profile(int(args[0]) if args and args[0].isdigit() else self.top)
+
+    async def run(self, fn, *args):
+        """Await fn(*args), under cProfile when profiling is on."""
+        if not self.profiling:
+            return await fn(*args)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return await fn(*args)
+        finally:
+            profiler.disable()
+            self.last_profile = pstats.Stats(profiler)
+
+    def format_profile(self, top=None):
+        out = io.StringIO()
+        self.last_profile.stream = out
+        self.last_profile.sort_stats("tottime", "cumulative").print_stats(top or self.top)
+        # Drop pstats' preamble; keep the column header and rows
+        lines = out.getvalue().splitlines()
+        start = next((i for i, line in enumerate(lines) if "ncalls" in line), 0)
+        return "[profile] Hottest functions of the last turn (by own time):\n" + "\n".join(lines[start:]).rstrip()
+
+    # ----- timing -----
+
+    def record_turn(self, timing):
+        """Keep a finished turn's timing (see repl.StreamingDisplay.stream) for /stats."""
+        self.turns.append(timing)
+
+    def format_stats(self, recent=10):
+        if not self.turns:
+            return "[INFO] No turns yet"
+        lines = ["[stats] turn   total   model   tools(summed)  other  tool calls"]
+        first = max(0, len(self.turns) - recent)
+        for number, turn in enumerate(self.turns[first:], start=first + 1):
+            other = max(0.0, turn["total_s"] - turn["model_time_s"] - turn["tool_time_s"])
+            lines.append(
+                f"        {number:>4} {turn['total_s']:>6.2f}s {turn['model_time_s']:>6.2f}s "
+                f"{turn['tool_time_s']:>12.2f}s {other:>6.2f}s  {turn['tools']}"
+            )
+        total = sum(turn["total_s"] for turn in self.turns)
+        model = sum(turn["model_time_s"] for turn in self.turns)
+        tools = sum(turn["tool_time_s"] for turn in self.turns)
+        share = f" ({model / total:.0%})" if total else ""
+        lines.append(
+            f"[stats] session: {len(self.turns)} turns, {total:.2f}s total, {model:.2f}s model{share}, "
+            f"{tools:.2f}s in tools"
+        )
+        by_tool = {}
+        for turn in self.turns:
+            for name, seconds in turn.get("by_tool", {}).items():
+                by_tool[name] = by_tool.get(name, 0.0) + seconds
+        if by_tool:
+            slowest = sorted(by_tool.items(), key=lambda item: -item[1])[:5]
+            lines.append("[stats] slowest tools: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in slowest))
+        return "\n".join(lines)
+
+    # ----- memory -----
+
+    def _mem_command(self, args):
+        if args and args[0] == "off":
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._snapshot = None
+            return "[OK] Allocation tracing off"
+        lines = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            lines.append("[INFO] Allocation tracing started; run /mem again later to see what grew")
+        else:
+            snapshot = _snapshot()
+            if self._snapshot is not None:
+                lines.append("[mem] Largest allocation growth since the previous /mem:")
+                for stat in snapshot.compare_to(self._snapshot, "lineno")[:10]:
+                    frame = stat.traceback[0]
+                    lines.append(
+                        f"      {_format_bytes(stat.size_diff):>8} ({stat.count_diff:+d} blocks)  "
+                        f"{frame.filename}:{frame.lineno}"
+                    )
+            self._snapshot = snapshot
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"[mem] traced now {_format_bytes(current)}, peak {_format_bytes(peak)}")
+        if self._snapshot is None and tracemalloc.is_tracing():
+            self._snapshot = _snapshot()
+        lines.append("[mem] Session structures (serialized size, change since the previous /mem):")
+        for name, (count, size) in self.structure_sizes().items():
+            delta = size - self._sizes.get(name, (0, size))[1]
+            lines.append(f"      {name:<22} {count:>5} items  {_format_bytes(size):>8}  ({_format_bytes(delta)})")
+            self._sizes[name] = (count, size)
+        return "\n".join(lines)
+
+    def structure_sizes(self):
+        """{structure: (items, approximate bytes)} for the in-memory state that grows with a session."""
+        messages = self.agent.messages
+        tool_results = [
+            block["toolResult"] for message in messages for block in message.get("content", [])
+            if "toolResult" in block
+        ]
+        sizes = {
+            "conversation history": (len(messages), _json_size(messages)),
+            "  of which tool results": (len(tool_results), _json_size(tool_results)),
+        }
+        memo = tool_memo.from_env()
+        if memo is not None:
+            results = memo.results(self.agent)
+            sizes["tool memo"] = (len(results), _json_size(results))
+        prefetcher = issue_prefetch.shared()
+        if prefetcher is not None:
+            results = prefetcher.results()
+            sizes["jira prefetch"] = (len(results), _json_size(results))
+        return sizes
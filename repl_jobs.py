@@ -0,0 +1,211 @@
+"""
+Background jobs for the interactive REPL.
+
+A long Confluence crawl or bulk update used to lock the terminal until it
+finished. Now a command can be submitted as a background job, and the REPL
+keeps reading commands while the job runs:
+    /bg <command>     run the command as a background job
+    /jobs             list jobs with their state, run time and tool calls so far
+    /wait [ID]        wait for a job (default: the latest) and print its answer
+    /cancel ID        cancel a running job
+
+Each job runs on its own agent, built by the entry point's agent factory,
+with an empty history of its own, so it cannot interleave with the
+foreground conversation. It only shares what the process shares: the model
+client, the Atlassian HTTP session and rate limits, the tool pools and the
+caches. Jobs are tasks on the REPL's event loop, next to the foreground turn.
+Tool calls run on worker threads, so a job never blocks the prompt.
+
+A job's text is collected instead of printed. When a job finishes, a one-line
+notice is shown and /wait prints the answer.
+
+Configure with:
+    REPL_MAX_JOBS=4    jobs allowed to run at once
+"""
+import asyncio
+import os
+import time
+
+from strands.hooks import HookProvider, HookRegistry, AfterToolCallEvent
+
+
+HELP = """Background jobs:
+  /bg <command>     run a command as a background job and keep working
+  /jobs             list jobs
+  /wait [ID]        wait for a job (default: the latest) and print its answer
+  /cancel ID        cancel a running job"""
+
+COMMANDS = ("/bg", "/jobs", "/wait", "/cancel")
+
+
+class _JobProgress(HookProvider):
+    """Count a job's finished tool calls for /jobs."""
+
+    def __init__(self, job):
+        self.job = job
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(AfterToolCallEvent, self._on_tool_end)
+
+    def _on_tool_end(self, event: AfterToolCallEvent) -> None:
+        self.job.tools += 1
+        self.job.last_tool = event.tool_use["name"]
+
+
+class Job:
+    """One background command and its outcome."""
+
+    def __init__(self, job_id, prompt):
+        self.id = job_id
+        self.prompt = prompt
+        self.state = "running"  # running, done, failed or cancelled
+        self.started = time.monotonic()
+        self.finished = None
+        self.tools = 0
+        self.last_tool = None
+        self.parts = []
+        self.error = None
+        self.task = None
+        self.waited_on = False  # a /wait prints the outcome, so no notice
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def summary(self, width=50):
+        prompt = self.prompt if len(self.prompt) <= width else self.prompt[:width - 3] + "..."
+        line = f"  [{self.id}] {self.state:<9} {self.elapsed:>7.1f}s  {self.tools:>3} tool call(s)  {prompt}"
+        if self.state == "running" and self.last_tool:
+            line += f"  (last: {self.last_tool})"
+        return line
+
+
+class BackgroundJobs:
+    """
+    Background jobs of one REPL session; all methods run on the REPL's event loop.
+
+    Args:
+        agent_factory: Callable returning a new Agent (created with callback_handler=None) per job,
+            or None when the entry point does not support background jobs
+        max_running: Jobs allowed to run at once; further /bg commands are refused
+    """
+
+    def __init__(self, agent_factory, max_running=4):
+        self.agent_factory = agent_factory
+        self.max_running = max_running
+        self.jobs = {}
+        self._next_id = 1
+
+    @property
+    def running(self):
+        return [job for job in self.jobs.values() if job.state == "running"]
+
+    async def handle(self, command):
+        """Run a job command; returns False when the command is not one."""
+        words = command.strip().split(None, 1)
+        if not words or words[0].lower() not in COMMANDS:
+            return False
+        name, rest = words[0].lower(), (words[1].strip() if len(words) > 1 else "")
+        if name == "/bg":
+            print(self.start(rest))
+        elif name == "/jobs":
+            print(self.format_jobs())
+        elif name == "/wait":
+            print(await self.wait(rest))
+        else:
+            print(self.cancel(rest))
+        return True
+
+    def start(self, prompt):
+        """Submit prompt as a background job; returns the message to show."""
+        if self.agent_factory is None:
+            return "[WARNING] Background jobs are not available in this entry point"
+        if not prompt:
+            return "[WARNING] Usage: /bg <command>"
+        if len(self.running) >= self.max_running:
+            return f"[WARNING] {self.max_running} jobs are already running; /wait or /cancel one first"
+        job = Job(self._next_id, prompt)
+        self._next_id += 1
+        self.jobs[job.id] = job
+        job.task = asyncio.get_running_loop().create_task(self._run(job))
+        return f"[OK] Started job {job.id} (/jobs to list, /wait {job.id} for its answer)"
+
+    async def _run(self, job):
+        try:
+            agent = self.agent_factory()
+            agent.hooks.add_hook(_JobProgress(job))
+            async for event in agent.stream_async(job.prompt):
+                if event.get("data"):
+                    job.parts.append(event["data"])
+            job.state = "done"
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+            raise
+        except Exception as e:
+            job.state = "failed"
+            job.error = str(e)
+        finally:
+            job.finished = time.monotonic()
+            if job.state != "cancelled" and not job.waited_on:
+                print(f"\n[job {job.id}] {job.state} after {job.elapsed:.1f}s ({job.tools} tool call(s)); "
+                      f"/wait {job.id} to show the answer")
+
+    def _find(self, job_id):
+        if not job_id:
+            return self.jobs[max(self.jobs)] if self.jobs else None
+        return self.jobs.get(int(job_id)) if job_id.isdigit() else None
+
+    async def wait(self, job_id=""):
+        """Wait for a job to finish and return its answer (Ctrl+C stops waiting, the job keeps running)."""
+        job = self._find(job_id)
+        if job is None:
+            return f"[WARNING] No job {job_id}" if job_id else "[INFO] No jobs yet"
+        if job.state == "running":
+            print(f"[INFO] Waiting for job {job.id}...")
+            job.waited_on = True
+            try:
+                await asyncio.shield(job.task)
+            except asyncio.CancelledError:
+                job.waited_on = False
+                if job.state == "running":
+                    return f"[INFO] Stopped waiting; job {job.id} is still running"
+        header = f"[job {job.id}] {job.state} after {job.elapsed:.1f}s: {job.prompt}"
+        if job.state == "failed":
+            return f"{header}\n[ERROR] {job.error}"
+        if job.state == "cancelled":
+            return header + (f"\n(partial answer)\n{job.text}" if job.text else "")
+        return f"{header}\n\n{job.text}"
+
+    def cancel(self, job_id):
+        """Cancel a running job; returns the message to show."""
+        job = self._find(job_id) if job_id else None
+        if job is None:
+            return "[WARNING] Usage: /cancel ID (see /jobs)" if not job_id else f"[WARNING] No job {job_id}"
+        if job.state != "running":
+            return f"[INFO] Job {job.id} already {job.state}"
+        job.task.cancel()
+        return f"[OK] Cancelling job {job.id} (tool calls already running finish in the background)"
+
+    def format_jobs(self):
+        if not self.jobs:
+            return "[INFO] No jobs yet; start one with /bg <command>"
+        return "[jobs]\n" + "\n".join(job.summary() for job in self.jobs.values())
+
+    async def shutdown(self):
+        """Cancel running jobs when the REPL exits."""
+        running = self.running
+        if not running:
+            return
+        print(f"[WARNING] Cancelling {len(running)} running job(s)")
+        for job in running:
+            job.task.cancel()
+        await asyncio.gather(*(job.task for job in running), return_exceptions=True)
+
+
+def from_env(agent_factory):
+    """Build the BackgroundJobs of a REPL session from REPL_MAX_JOBS."""
+    return BackgroundJobs(agent_factory, max_running=int(os.getenv("REPL_MAX_JOBS", "4")))
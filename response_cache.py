@@ -0,0 +1,420 @@
+"""
+Opt-in on-disk cache of whole agent answers for repeated prompts.
+
+Entries are keyed on the normalized prompt text, the conversation before it
+(its text only), the agent's tool set and the model id, live for a freshness
+window (RESPONSE_CACHE_TTL) and are evicted LRU once RESPONSE_CACHE_MAX_ENTRIES
+is exceeded. Keying on the prior conversation keeps follow-ups such as "tell
+me more" from being answered with a reply given in another conversation.
+
+While a turn runs, DependencyRecorder notes which Jira issues/searches,
+Confluence pages/searches and local files the answer was built from. A cached
+answer is only served while those are unchanged; the check is one small
+request per data source and is skipped for RESPONSE_CACHE_REVALIDATE_AFTER
+seconds after the last successful check. Turns that wrote anything, used a
+tool whose output cannot be revalidated, or read no data at all (nothing to
+revalidate) are never cached.
+
+Enable with RESPONSE_CACHE=1.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import weakref
+
+from strands.hooks import HookProvider, HookRegistry, BeforeInvocationEvent, AfterToolCallEvent
+
+import atlassian_sites
+import confluence_paging
+from atlassian_http import (
+    JIRA_URL, CONFLUENCE_URL, get_jira_auth_headers, get_confluence_auth_headers, atlassian_request,
+)
+
+
+CACHE_DIR = os.getenv("CC_AGENT_CACHE_DIR", ".cc_agent_cache")
+
+# Tools whose results can be revalidated cheaply; everything else makes a turn uncacheable
+REVALIDATABLE_TOOLS = {
+    "jira_search_issues", "jira_get_issue",
+    "confluence_search_content", "confluence_get_page", "confluence_list_spaces",
+    "read_file", "list_files", "calculate",
+}
+
+
+def normalize_prompt(prompt):
+    """Lowercase, drop punctuation and collapse whitespace so trivially different phrasings share a key."""
+    text = unicodedata.normalize("NFKC", prompt).lower()
+    text = re.sub(r"[^\w\s\-/=:.]", " ", text)
+    text = re.sub(r"[.:]+(\s|$)", r"\1", text)
+    return " ".join(text.split())
+
+
+def history_digest(messages):
+    """
+    Digest of a conversation's prompts and final answers.
+
+    Tool calls, tool results and text said along with a tool call are left out,
+    so a turn answered from the cache (see remember_exchange) leaves the same
+    digest as the turn it replays.
+    """
+    material = []
+    for message in messages:
+        content = message.get("content", [])
+        if any("toolUse" in block or "toolResult" in block for block in content):
+            continue
+        material.append((message.get("role"), [block["text"] for block in content if "text" in block]))
+    return hashlib.sha256(json.dumps(material).encode()).hexdigest()[:16]
+
+
+def _fingerprint(items):
+    return hashlib.sha256(json.dumps(sorted(items), default=str).encode()).hexdigest()[:16]
+
+
+def _result_json(result):
+    """Parse the JSON text a direct-API tool returned, or None for errors/plain text."""
+    if result.get("status") != "success":
+        return None
+    text = "".join(block.get("text", "") for block in result.get("content", []))
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def dependency_for(tool_name, tool_input, result):
+    """
+    Describe the data a successful tool call read, in a form that can be revalidated later.
+
+    Returns:
+        A dependency dict, {} for calls with nothing to revalidate, or None if the call makes the turn uncacheable
+    """
+    if tool_name not in REVALIDATABLE_TOOLS or result.get("status") != "success":
+        return None
+    if tool_name == "calculate":
+        return {}
+    if tool_name in ("read_file", "list_files"):
+        path = tool_input.get("filename") or tool_input.get("directory") or "."
+        try:
+            return {"kind": "path", "path": os.path.abspath(path), "mtime": os.stat(path).st_mtime}
+        except OSError:
+            return None
+
+    data = _result_json(result)
+    if data is None:
+        return None
+    site = tool_input.get("site")
+    if data.get("complete") is False:
+        return None  # some Atlassian site did not answer; the same search may well differ next time
+    if tool_name == "jira_search_issues":
+        items = [(issue.get("site"), issue["key"], issue["updated"]) for issue in data.get("issues", [])]
+        return {"kind": "jql", "jql": tool_input["jql"], "max_results": tool_input.get("max_results", 50),
+                "sites": "sites" in data, "fingerprint": _fingerprint(items)}
+    if tool_name == "jira_get_issue":
+        return {"kind": "issue", "key": data["key"], "updated": data["updated"], "site": site}
+    if tool_name == "confluence_get_page":
+        return {"kind": "page", "id": data["id"], "version": data["version"], "site": site}
+    if tool_name == "confluence_search_content":
+        items = [(item.get("site"), item["id"]) for item in data.get("results", [])]
+        return {"kind": "cql", "query": tool_input["query"], "limit": tool_input.get("limit", 25),
+                "cursor": tool_input.get("cursor"), "sites": "sites" in data, "total": data.get("total"),
+                "fingerprint": _fingerprint(items)}
+    if tool_name == "confluence_list_spaces":
+        cursor = tool_input.get("cursor")
+        return {"kind": "spaces", "start": int(cursor) if cursor else 0,
+                "limit": max(1, tool_input.get("limit", 100)), "fingerprint": _fingerprint([space["key"] for space in data.get("spaces", [])])}
+    return None
+
+
+def _jira_issues(jql, max_results, site=None, fields="updated"):
+    base = site.jira_url if site else JIRA_URL
+    headers = site.jira_headers() if site else get_jira_auth_headers()
+    response = atlassian_request(
+        "GET", f"{base}/rest/api/3/search/jql", headers=headers,
+        params={"jql": jql, "maxResults": max_results, "fields": fields},
+    )
+    response.raise_for_status()
+    return [{"key": issue["key"], **issue["fields"]} for issue in response.json().get("issues", [])]
+
+
+def _jql_items(jql, max_results, across_sites):
+    """(site, key, updated) of a search, merged across sites the way jira_search_issues merges them."""
+    if not across_sites:
+        return [(None, issue["key"], issue["updated"]) for issue in _jira_issues(jql, max_results)]
+    per_site = {
+        site.name: _jira_issues(jql, max_results, site, fields="updated,summary")
+        for site in atlassian_sites.configured()
+    }
+    merged = atlassian_sites.merge(
+        per_site, identity=lambda issue: (issue["key"], issue["summary"]),
+        sort_key=lambda issue: issue["updated"], reverse=True,
+    )
+    return [(issue["site"], issue["key"], issue["updated"]) for issue in merged[:max_results]]
+
+
+def _cql_items(dep):
+    """(total, [(site, id), ...]) of a content search page, as confluence_search_content reported it."""
+    names = [site.name for site in atlassian_sites.configured()] if dep["sites"] else None
+    links = confluence_paging.search_links(dep["query"], dep["cursor"], names)
+    total, items = 0, []
+    for name, link in links.items():
+        site = atlassian_sites.get(name) if name else None
+        if dep["limit"] <= 0:
+            _, _, data = confluence_paging.fetch_page(link, {"limit": 1}, site)
+            total += data.get("totalSize", data.get("size", 0))
+            continue
+        results, site_total, _ = confluence_paging.collect(link, dep["limit"], site)
+        total += site_total if site_total is not None else len(results)
+        items.extend((name, item["id"]) for item in results)
+    return total, items
+
+
+def dependencies_unchanged(dependencies):
+    """
+    Check recorded dependencies against the live systems, on the site each was read from.
+
+    Issues are checked in one batched JQL query per site, every other
+    dependency with one small request (or one per site) each. Any error
+    counts as changed.
+    """
+    try:
+        by_site = {}
+        for dep in dependencies:
+            if dep.get("kind") == "issue":
+                by_site.setdefault(dep.get("site"), {})[dep["key"]] = dep["updated"]
+        for name, issues in by_site.items():
+            keys = ", ".join(f'"{key}"' for key in issues)
+            site = atlassian_sites.get(name) if name else None
+            live = {issue["key"]: issue["updated"] for issue in _jira_issues(f"key in ({keys})", len(issues), site)}
+            if live != issues:
+                return False
+
+        for dep in dependencies:
+            kind = dep.get("kind")
+            if kind == "path":
+                if os.stat(dep["path"]).st_mtime != dep["mtime"]:
+                    return False
+            elif kind == "jql":
+                if _fingerprint(_jql_items(dep["jql"], dep["max_results"], dep.get("sites"))) != dep["fingerprint"]:
+                    return False
+            elif kind == "page":
+                site = atlassian_sites.get(dep["site"]) if dep.get("site") else None
+                response = atlassian_request(
+                    "GET", f"{site.confluence_url if site else CONFLUENCE_URL}/wiki/rest/api/content/{dep['id']}",
+                    headers=site.confluence_headers() if site else get_confluence_auth_headers(),
+                    params={"expand": "version"},
+                )
+                response.raise_for_status()
+                if response.json()["version"]["number"] != dep["version"]:
+                    return False
+            elif kind == "cql":
+                total, items = _cql_items(dep)
+                if total != dep["total"] or _fingerprint(items) != dep["fingerprint"]:
+                    return False
+            elif kind == "spaces":
+                # The same slice the answer listed: start and limit as the call had them
+                spaces, _, _ = confluence_paging.collect(
+                    f"/rest/api/space?start={dep['start']}&limit={dep['limit']}", dep["limit"]
+                )
+                if _fingerprint([space["key"] for space in spaces]) != dep["fingerprint"]:
+                    return False
+        return True
+    except Exception:
+        return False
+
+
+class DependencyRecorder(HookProvider):
+    """
+    Collect the dependencies of the current turn; `cacheable` turns False on any write or unknown tool.
+
+    `history` is the digest of the conversation before the turn's prompt, for the cache key.
+    """
+
+    def __init__(self):
+        self.dependencies = []
+        self.cacheable = True
+        self.tool_calls = 0
+        self.history = None
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._reset)
+        registry.add_callback(AfterToolCallEvent, self._record)
+
+    def _reset(self, event: BeforeInvocationEvent) -> None:
+        self.dependencies = []
+        self.cacheable = True
+        self.tool_calls = 0
+        self.history = history_digest(event.agent.messages)  # the prompt is not appended yet
+
+    def _record(self, event: AfterToolCallEvent) -> None:
+        self.tool_calls += 1
+        dep = dependency_for(event.tool_use["name"], event.tool_use.get("input") or {}, event.result)
+        if dep is None:
+            self.cacheable = False
+        elif dep and dep not in self.dependencies:
+            self.dependencies.append(dep)
+
+
+class CachedResponse:
+    """A cache hit: the stored answer plus when it was produced."""
+
+    def __init__(self, text, created, revalidated):
+        self.text = text
+        self.created = created
+        self.revalidated = revalidated
+        self.elapsed_ms = 0.0
+
+    def banner(self):
+        age = int(time.time() - self.created)
+        check = "revalidated" if self.revalidated else "fresh"
+        return f"[CACHE HIT] answer from {age}s ago ({check}, {self.elapsed_ms:.1f} ms)"
+
+
+class ResponseCache:
+    """
+    SQLite-backed answer cache with TTL, LRU eviction and dependency revalidation.
+
+    Args:
+        path: SQLite file location
+        ttl: Seconds an answer may be served at all (the freshness window)
+        max_entries: Entries kept before least-recently-used ones are evicted
+        revalidate_after: Seconds after a successful check during which no new check is made
+    """
+
+    def __init__(self, path=None, ttl=3600, max_entries=500, revalidate_after=60):
+        self.path = path or os.path.join(CACHE_DIR, "responses.sqlite")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.revalidate_after = revalidate_after
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, prompt TEXT, response TEXT, dependencies TEXT,"
+            " created REAL, checked REAL, last_access REAL)"
+        )
+        self.db.commit()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._recorders = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def key(prompt, history, tool_names, model_id):
+        material = "\0".join([normalize_prompt(prompt), history, ",".join(sorted(tool_names)), str(model_id)])
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    @staticmethod
+    def _agent_key(agent, prompt, history):
+        config = agent.model.get_config()
+        model_id = config.get("model_id") if isinstance(config, dict) else getattr(config, "model_id", None)
+        return ResponseCache.key(prompt, history, agent.tool_names, model_id)
+
+    def recorder(self, agent):
+        """Return the agent's DependencyRecorder, registering it on first use."""
+        recorder = self._recorders.get(agent)
+        if recorder is None:
+            recorder = DependencyRecorder()
+            agent.hooks.add_hook(recorder)
+            self._recorders[agent] = recorder
+        return recorder
+
+    def lookup(self, agent, prompt):
+        """Return a CachedResponse for the prompt, or None on a miss or stale entry."""
+        started = time.perf_counter()
+        self.recorder(agent)
+        key = self._agent_key(agent, prompt, history_digest(agent.messages))
+        with self.lock:
+            row = self.db.execute(
+                "SELECT response, dependencies, created, checked FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        now = time.time()
+        if row is None or now - row[2] > self.ttl:
+            self.misses += 1
+            return None
+
+        response, dependencies, created, checked = row
+        revalidated = False
+        if now - checked > self.revalidate_after:
+            if not dependencies_unchanged(json.loads(dependencies)):
+                self.invalidate(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            revalidated = True
+            checked = now
+        with self.lock:
+            self.db.execute("UPDATE responses SET checked = ?, last_access = ? WHERE key = ?", (checked, now, key))
+            self.db.commit()
+        self.hits += 1
+        hit = CachedResponse(response, created, revalidated)
+        hit.elapsed_ms = (time.perf_counter() - started) * 1000
+        return hit
+
+    def store(self, agent, prompt, response):
+        """Store the answer to the turn that just ran, if its recorder marked it cacheable."""
+        recorder = self._recorders.get(agent)
+        if recorder is None:
+            # The turn ran before any lookup registered a recorder, so its dependencies are unknown
+            self.recorder(agent)
+            return False
+        if not recorder.cacheable or not recorder.dependencies or not str(response).strip():
+            return False
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._agent_key(agent, prompt, recorder.history), normalize_prompt(prompt), str(response),
+                 json.dumps(recorder.dependencies), now, now, now),
+            )
+            self.db.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self.db.commit()
+        return True
+
+    def invalidate(self, key):
+        with self.lock:
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.db.commit()
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM responses")
+            self.db.commit()
+
+    def stats(self):
+        with self.lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+def remember_exchange(agent, prompt, text):
+    """Append a cached question/answer pair to the agent's history so follow-ups keep their context."""
+    agent.messages.append({"role": "user", "content": [{"text": prompt}]})
+    agent.messages.append({"role": "assistant", "content": [{"text": text}]})
+
+
+def from_env():
+    """Build a ResponseCache if RESPONSE_CACHE is enabled, otherwise return None."""
+    if os.getenv("RESPONSE_CACHE", "").lower() not in ("1", "true", "yes", "on"):
+        return None
+    return ResponseCache(
+        ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+        max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "500")),
+        revalidate_after=float(os.getenv("RESPONSE_CACHE_REVALIDATE_AFTER", "60")),
+    )
@@ -0,0 +1,203 @@
+"""
+Append-only conversation log, so a REPL session can be resumed after exit.
+
+SessionLog is a hook provider. Every message added to the agent's history
+(prompts, model replies, tool calls and tool results) is appended as one
+compact JSON line to CC_AGENT_CACHE_DIR/sessions/<name>.jsonl as soon as it is
+added, so even a session that is killed loses at most the message in flight.
+Large tool results are already reduced to spill_store handles before they
+reach the history. The spill store lives on disk too, so those handles stay
+valid after a resume.
+
+Resuming does not replay anything. The log is read backwards from its end, and
+only the most recent messages that fit in the CONTEXT_TOKEN_BUDGET are parsed,
+starting at a user prompt. Older lines are never decoded, so a long session
+resumes in milliseconds and no tool is called again.
+
+Configure with:
+    SESSION_LOG=1                 (0 disables the log)
+    SESSION_RESUME=latest|<name>  resume a session at startup (also: --resume [NAME])
+"""
+import base64
+import json
+import mmap
+import os
+import threading
+import time
+import uuid
+
+from strands.hooks import HookProvider, HookRegistry, MessageAddedEvent, AfterInvocationEvent
+
+from content_store import CACHE_DIR
+from conversation_memory import estimate_tokens
+
+
+SESSION_DIR = os.path.join(CACHE_DIR, "sessions")
+BYTES_KEY = "__bytes__"
+
+
+def _encode(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {BYTES_KEY: base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj):
+    if len(obj) == 1 and BYTES_KEY in obj:
+        return base64.b64decode(obj[BYTES_KEY])
+    return obj
+
+
+def _starts_turn(message):
+    """Whether a conversation can start at this message: a user prompt, not a tool result."""
+    return message.get("role") == "user" and not any("toolResult" in block for block in message.get("content", []))
+
+
+def _ends_turn(message):
+    """Whether this message completes a turn: an assistant reply that calls no tool."""
+    return message.get("role") == "assistant" and not any("toolUse" in block for block in message.get("content", []))
+
+
+def load_tail(path, token_budget):
+    """
+    The latest messages of a log that fit in token_budget, oldest first.
+
+    Lines are parsed from the end of the file backwards and parsing stops once
+    the budget is reached, so the cost depends on what is loaded, not on the
+    length of the log. The result starts at a user prompt and ends with the
+    answer of the last completed turn.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return []
+    messages = []
+    sizes = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        end = len(data)
+        while end > 0:
+            start = data.rfind(b"\n", 0, end - 1) + 1
+            line = data[start:end].strip()
+            end = start
+            if not line:
+                continue
+            try:
+                record = json.loads(line, object_hook=_decode)
+            except ValueError:
+                continue  # a line cut short when the process was killed
+            if "message" not in record:
+                continue
+            messages.append(record["message"])
+            sizes.append(estimate_tokens([record["message"]]))
+            if sum(sizes) > token_budget and _starts_turn(record["message"]):
+                break
+    messages.reverse()
+    sizes.reverse()
+    # Drop the oldest turn while it does not fit, then anything before the first prompt
+    while messages and sum(sizes) > token_budget:
+        later = next((i for i, message in enumerate(messages[1:], 1) if _starts_turn(message)), None)
+        if later is None:
+            break
+        messages, sizes = messages[later:], sizes[later:]
+    while messages and not _starts_turn(messages[0]):
+        messages.pop(0)
+    # End on a finished turn: an answer, not a tool call or result still waiting for one
+    while messages and not _ends_turn(messages[-1]):
+        messages.pop()
+    return messages
+
+
+def list_sessions(directory=SESSION_DIR):
+    """Session names in directory, most recently written first."""
+    if not os.path.isdir(directory):
+        return []
+    paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".jsonl")]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    return [os.path.basename(path)[:-len(".jsonl")] for path in paths]
+
+
+class SessionLog(HookProvider):
+    """
+    Append each message added to an agent's history to a JSON-lines file.
+
+    Args:
+        path: Log file; appended to if it exists
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path).rsplit(".", 1)[0]
+        self.lock = threading.Lock()
+        self.logged = set()  # tracking ids of messages already in the log
+        self.written = 0
+        self.resume_ms = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(MessageAddedEvent, self._on_message)
+        registry.add_callback(AfterInvocationEvent, self._on_turn_end)
+
+    def _on_message(self, event: MessageAddedEvent) -> None:
+        self.append(event.message)
+
+    def _on_turn_end(self, event: AfterInvocationEvent) -> None:
+        self.sync(event.agent)
+
+    def append(self, message):
+        """Write one message (once; messages are recognized by their tracking id)."""
+        tracking_id = message.get("tracking_id")
+        if not tracking_id:
+            # Messages appended to agent.messages directly (e.g. response cache hits) have none yet
+            tracking_id = message["tracking_id"] = str(uuid.uuid4())
+        with self.lock:
+            if tracking_id in self.logged:
+                return
+            self._file.write(json.dumps({"message": message}, separators=(",", ":"), default=_encode) + "\n")
+            self._file.flush()
+            self.logged.add(tracking_id)
+            self.written += 1
+
+    def sync(self, agent):
+        """Write any message in the agent's history that is not in the log yet."""
+        for message in list(agent.messages):
+            self.append(message)
+
+    def resume(self, agent, token_budget):
+        """
+        Load the end of this log into a new agent's history without calling any tool.
+
+        Returns:
+            Number of messages loaded
+        """
+        started = time.perf_counter()
+        messages = load_tail(self.path, token_budget)
+        with self.lock:
+            self.logged.update(message["tracking_id"] for message in messages if message.get("tracking_id"))
+        agent.messages[:] = messages
+        self.resume_ms = (time.perf_counter() - started) * 1000
+        return len(messages)
+
+    def close(self):
+        with self.lock:
+            self._file.close()
+
+
+def from_env(resume=None):
+    """
+    Open the session log for an interactive session, or return None when SESSION_LOG=0.
+
+    Args:
+        resume: Session name, "latest", or None to use SESSION_RESUME (a new session if unset)
+
+    Returns:
+        (SessionLog or None, whether an existing session is being resumed)
+    """
+    if os.getenv("SESSION_LOG", "1").lower() in ("0", "false", "off", "no"):
+        return None, False
+    resume = resume or os.getenv("SESSION_RESUME")
+    if resume:
+        name = (list_sessions() or [None])[0] if resume == "latest" else resume
+        if name and os.path.exists(os.path.join(SESSION_DIR, f"{name}.jsonl")):
+            return SessionLog(os.path.join(SESSION_DIR, f"{name}.jsonl")), True
+        print(f"[WARNING] No session '{resume}' to resume in {SESSION_DIR}; starting a new one")
+    name = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    return SessionLog(os.path.join(SESSION_DIR, f"{name}.jsonl")), False
@@ -0,0 +1,258 @@
+"""
+Spill store for large tool results.
+
+ResultSpiller is a hook provider that looks at every tool result, from any
+registered tool including MCP tools. When a result's text is larger than
+SPILL_THRESHOLD_CHARS, the full text goes into a local ContentStore and the
+model gets a short summary instead:
+- the size
+- the JSON shape, when the result is JSON
+- a preview
+- a handle
+
+The read_spilled_result tool pages, greps or slices the stored text by handle,
+and never returns more than a bounded number of characters. The context a
+turn adds therefore stays bounded however large the underlying result is.
+
+Configure with:
+    SPILL_THRESHOLD_CHARS=8000
+    SPILL_PREVIEW_CHARS=1500
+    SPILL_STORE_MAX_MB=256
+"""
+import hashlib
+import json
+import os
+import re
+
+from strands import tool
+from strands.hooks import HookProvider, HookRegistry, AfterToolCallEvent
+
+from content_store import CACHE_DIR, ContentStore
+
+
+READ_TOOL = "read_spilled_result"
+MAX_READ_CHARS = 8000
+
+
+def _result_text(result):
+    """Concatenate the text (and JSON) blocks of a tool result."""
+    parts = []
+    for block in result.get("content", []):
+        if "text" in block:
+            parts.append(block["text"])
+        elif "json" in block:
+            parts.append(json.dumps(block["json"], indent=2, default=str))
+    return "\n".join(parts)
+
+
+def describe_json(text, max_keys=12):
+    """One-line shape of a JSON document (top-level keys and list lengths), or None if not JSON."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(data, list):
+        return f"JSON array of {len(data)} items"
+    if not isinstance(data, dict):
+        return None
+    fields = []
+    for key, value in list(data.items())[:max_keys]:
+        if isinstance(value, list):
+            fields.append(f"{key}[{len(value)}]")
+        elif isinstance(value, dict):
+            fields.append(f"{key}{{{len(value)}}}")
+        else:
+            fields.append(f"{key}={json.dumps(value, default=str)[:40]}")
+    more = f", ... {len(data) - max_keys} more" if len(data) > max_keys else ""
+    return "JSON object: " + ", ".join(fields) + more
+
+
+def select_path(data, path):
+    """
+    Select part of a JSON document with a small path language.
+
+    Examples: "issues", "issues[0]", "issues[0:10].key", "fields.status.name"
+
+    Args:
+        data: Parsed JSON
+        path: Dotted keys with optional [index] or [start:end] selectors
+
+    Returns:
+        The selected value (slices of lists map the rest of the path over each item)
+    """
+    tokens = re.findall(r"[^.\[\]]+|\[-?\d*:?-?\d*\]", path)
+    return _select(data, tokens)
+
+
+def _select(data, tokens):
+    if not tokens:
+        return data
+    token, rest = tokens[0], tokens[1:]
+    if token.startswith("["):
+        inner = token[1:-1]
+        if not isinstance(data, list):
+            raise KeyError(f"{token} applied to a non-list")
+        if ":" in inner:
+            start, end = (int(part) if part else None for part in inner.split(":", 1))
+            return [_select(item, rest) for item in data[start:end]]
+        return _select(data[int(inner)], rest)
+    if isinstance(data, list):
+        return [_select(item, tokens) for item in data]
+    if not isinstance(data, dict) or token not in data:
+        raise KeyError(token)
+    return _select(data[token], rest)
+
+
+class SpillStore:
+    """
+    Full tool results kept on disk and addressed by handle.
+
+    Args:
+        store: ContentStore holding the text
+        threshold: Results longer than this many characters are spilled
+        preview_chars: Characters of the original text shown in the summary
+    """
+
+    def __init__(self, store, threshold=8000, preview_chars=1500):
+        self.store = store
+        self.threshold = threshold
+        self.preview_chars = preview_chars
+        self.spilled = 0
+        self.chars_spilled = 0
+
+    def put(self, tool_name, text):
+        """Store text and return its handle (identical results share a handle)."""
+        handle = "spill-" + hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        self.store.put(handle, text, {"tool": tool_name, "chars": len(text), "lines": text.count("\n") + 1})
+        self.spilled += 1
+        self.chars_spilled += len(text)
+        return handle
+
+    def get(self, handle):
+        """Return the stored text for a handle, or None."""
+        entry = self.store.get(handle)
+        return None if entry is None else self.store.read(entry).decode("utf-8")
+
+    def summary(self, tool_name, handle, text):
+        lines = [
+            f"[Large {tool_name} result stored as {handle}: {len(text)} chars, {text.count(chr(10)) + 1} lines]",
+        ]
+        shape = describe_json(text)
+        if shape:
+            lines.append(shape)
+        lines.append(f"Preview:\n{text[:self.preview_chars]}")
+        lines.append(
+            f"[... {max(0, len(text) - self.preview_chars)} more chars. Use {READ_TOOL}(handle=\"{handle}\") "
+            f"with offset/limit to page, grep=\"regex\" to search, or path=\"key[0:10].field\" to slice JSON.]"
+        )
+        return "\n".join(lines)
+
+    def stats(self):
+        return {**self.store.stats(), "spilled": self.spilled, "chars_spilled": self.chars_spilled}
+
+
+class ResultSpiller(HookProvider):
+    """Replace oversized tool results with a summary and a spill-store handle."""
+
+    def __init__(self, spill):
+        self.spill = spill
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(AfterToolCallEvent, self._spill)
+
+    def _spill(self, event: AfterToolCallEvent) -> None:
+        result = event.result
+        if not result or event.tool_use.get("name") == READ_TOOL:
+            return
+        text = _result_text(result)
+        if len(text) <= self.spill.threshold:
+            return
+        tool_name = event.tool_use.get("name", "tool")
+        handle = self.spill.put(tool_name, text)
+        others = [block for block in result.get("content", []) if "text" not in block and "json" not in block]
+        event.result = {
+            **result,
+            "content": [{"text": self.spill.summary(tool_name, handle, text)}, *others],
+        }
+
+
+_shared_spill = None
+
+
+def from_env():
+    """Return the process-wide SpillStore built from SPILL_* settings."""
+    global _shared_spill
+    if _shared_spill is None:
+        max_bytes = int(float(os.getenv("SPILL_STORE_MAX_MB", "256")) * 1024 * 1024)
+        _shared_spill = SpillStore(
+            ContentStore(os.path.join(CACHE_DIR, "spill"), max_bytes),
+            threshold=int(os.getenv("SPILL_THRESHOLD_CHARS", "8000")),
+            preview_chars=int(os.getenv("SPILL_PREVIEW_CHARS", "1500")),
+        )
+    return _shared_spill
+
+
+def spiller():
+    """A ResultSpiller hook bound to the shared spill store."""
+    return ResultSpiller(from_env())
+
+
+@tool
+def read_spilled_result(handle: str, offset: int = 0, limit: int = 4000, grep: str = None,
+                        path: str = None) -> str:
+    """
+    Read part of a large tool result that was stored instead of being shown in full.
+
+    Args:
+        handle: The spill handle from the summary (e.g., "spill-1a2b3c...")
+        offset: Character offset to start reading from (paging), or the match to start from with grep
+        limit: Maximum characters to return (capped at 8000)
+        grep: Optional regex; returns matching lines with their line numbers
+        path: Optional JSON path such as "issues[0:10].key" or "fields.status"; slices a JSON result
+
+    Returns:
+        The requested part of the stored result, with a hint for reading further
+    """
+    text = from_env().get(handle)
+    if text is None:
+        return f"Error: unknown or expired handle '{handle}'. Call the original tool again."
+    limit = max(1, min(limit, MAX_READ_CHARS))
+
+    if path:
+        try:
+            selected = select_path(json.loads(text), path)
+        except ValueError:
+            return "Error: the stored result is not JSON; use offset/limit or grep instead"
+        except (KeyError, IndexError) as e:
+            return f"Error: path '{path}' not found ({e}). {describe_json(text) or ''}"
+        text = json.dumps(selected, indent=2, default=str)
+
+    elif grep:
+        try:
+            pattern = re.compile(grep, re.IGNORECASE)
+        except re.error as e:
+            return f"Error: invalid regex: {e}"
+        matches = [f"{number}: {line}" for number, line in enumerate(text.splitlines(), 1) if pattern.search(line)]
+        output, used, shown = [], 0, 0
+        for line in matches[offset:]:
+            if used + len(line) > limit:
+                if not output:
+                    # A single line longer than limit (e.g. one-line JSON) is still shown, cut short,
+                    # so the next offset moves past it
+                    output.append(line[:limit] + " ... (line truncated; use offset/limit or path)")
+                    shown = 1
+                break
+            output.append(line)
+            used += len(line) + 1
+            shown += 1
+        footer = f"\n[{len(matches)} matching lines; showing {offset + 1}-{offset + shown}"
+        if offset + shown < len(matches):
+            footer += f"; next: offset={offset + shown}"
+        return "\n".join(output) + footer + "]"
+
+    chunk = text[offset:offset + limit]
+    end = offset + len(chunk)
+    footer = f"\n[chars {offset}-{end} of {len(text)}"
+    if end < len(text):
+        footer += f"; next: offset={end}"
+    return chunk + footer + "]"
@@ -0,0 +1,109 @@
+"""
+Offline checks of the HTTP agent service (cc_agent_server), driven through AgentService.handle
+with FakeModel and the stand-in Atlassian server from fake_services:
+    python -m pytest test_agent_server.py      or      python test_agent_server.py
+"""
+import asyncio
+import os
+import tempfile
+from http import HTTPStatus
+
+from fake_services import FakeModel, start_fake_atlassian
+
+server, base_url = start_fake_atlassian()
+os.environ.update(
+    JIRA_URL=base_url, CONFLUENCE_URL=base_url, JIRA_USERNAME="user", JIRA_API_TOKEN="token",
+    CC_AGENT_CACHE_DIR=os.environ.get("CC_AGENT_CACHE_DIR") or tempfile.mkdtemp(prefix="cc_agent_test_"),
+    TOOL_MEMO="0", ISSUE_INDEX="0",
+)
+
+import cc_agent_server  # noqa: E402  (reads JIRA_URL at import)
+import response_cache  # noqa: E402
+
+
+def _service(latency=0.0, tool_plan=lambda prompt: [], cache=None, **limits):
+    return cc_agent_server.build_service(FakeModel(tool_plan=tool_plan, latency=latency), cache=cache, **limits)
+
+
+async def _error_status(call):
+    """The HTTP status of the ServiceError a request raises (None if it succeeds)."""
+    try:
+        await call
+    except cc_agent_server.ServiceError as e:
+        return e.status
+    return None
+
+
+def test_session_create_and_chat():
+    async def run():
+        service = _service()
+        status, created = await service.handle("POST", "/v1/sessions", {})
+        assert status == HTTPStatus.CREATED
+        session_id = created["session_id"]
+        status, reply = await service.handle("POST", f"/v1/sessions/{session_id}/messages", {"prompt": "hello"})
+        assert status == HTTPStatus.OK
+        assert reply["session_id"] == session_id and reply["response"]
+        status, reply = await service.handle("POST", "/v1/chat", {"prompt": "hello", "session_id": session_id})
+        assert reply["session_id"] == session_id
+        assert service.pool.get(session_id).turns == 2
+
+    asyncio.run(run())
+
+
+def test_per_session_limit_returns_429():
+    async def run():
+        service = _service(latency=0.3, per_session=1)
+        session_id = (await service.handle("POST", "/v1/sessions", {}))[1]["session_id"]
+        path = f"/v1/sessions/{session_id}/messages"
+        first = asyncio.create_task(service.handle("POST", path, {"prompt": "one"}))
+        await asyncio.sleep(0.05)
+        assert await _error_status(service.handle("POST", path, {"prompt": "two"})) == HTTPStatus.TOO_MANY_REQUESTS
+        assert (await first)[0] == HTTPStatus.OK
+
+    asyncio.run(run())
+
+
+def test_full_queue_returns_503():
+    async def run():
+        service = _service(latency=0.3, max_concurrent=1, max_queue=1)
+        running = asyncio.create_task(service.handle("POST", "/v1/chat", {"prompt": "one"}))
+        await asyncio.sleep(0.05)
+        queued = asyncio.create_task(service.handle("POST", "/v1/chat", {"prompt": "two"}))
+        await asyncio.sleep(0.05)
+        assert service.scheduler.running == 1 and service.scheduler.queued == 1
+        rejected = await _error_status(service.handle("POST", "/v1/chat", {"prompt": "three"}))
+        assert rejected == HTTPStatus.SERVICE_UNAVAILABLE
+        assert [status for status, _ in await asyncio.gather(running, queued)] == [HTTPStatus.OK, HTTPStatus.OK]
+
+    asyncio.run(run())
+
+
+def test_delete_unknown_session_returns_404():
+    async def run():
+        service = _service()
+        assert await _error_status(service.handle("DELETE", "/v1/sessions/no-such-session", {})) == HTTPStatus.NOT_FOUND
+
+    asyncio.run(run())
+
+
+def test_response_cache_hit():
+    async def run():
+        cache = response_cache.ResponseCache(path=os.path.join(tempfile.mkdtemp(prefix="cc_agent_test_"), "r.db"))
+        service = _service(tool_plan=lambda prompt: [("jira_get_issue", {"issue_key": "DEMO-1"})], cache=cache)
+        _, first = await service.handle("POST", "/v1/chat", {"prompt": "show DEMO-1"})
+        _, second = await service.handle("POST", "/v1/chat", {"prompt": "show DEMO-1"})
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["response"] == first["response"]
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_session_create_and_chat()
+    test_per_session_limit_returns_429()
+    test_full_queue_returns_503()
+    test_delete_unknown_session_returns_404()
+    test_response_cache_hit()
+    print("[OK] agent server tests passed")
+    server.shutdown()
@@ -0,0 +1,101 @@
+"""
+Offline checks of IssueIndex persistence with two instances sharing one directory
+(as two processes would):
+    python -m pytest test_issue_index.py      or      python test_issue_index.py
+"""
+import glob
+import os
+import tempfile
+
+import numpy as np
+
+from issue_index import IssueIndex
+
+DIM = 64
+
+
+def _issue(number, summary=None, description="steps to reproduce"):
+    return f"DEMO-{number}", summary or f"issue number {number} about topic {number % 7}", description
+
+
+def _keys(results):
+    return [result["key"] for result in results]
+
+
+def test_other_instance_replays_the_journal():
+    root = tempfile.mkdtemp(prefix="issue_index_test_")
+    a, b = IssueIndex(root, DIM), IssueIndex(root, DIM)
+    assert a.add([_issue(1, "Login fails with SSO"), _issue(2, "Export to CSV is slow")]) == (2, 0)
+    assert a.add([_issue(3, "Dark mode colours wrong")]) == (1, 0)
+    assert glob.glob(os.path.join(root, "journal-*.jsonl"))
+
+    assert _keys(b.search("login fails sso", top_k=1)) == ["DEMO-1"]
+    assert len(b.keys) == 3
+    # b appends after a's rows instead of over them
+    assert b.add([_issue(4, "Printing crashes the app")]) == (1, 0)
+    assert _keys(a.search("printing crashes", top_k=1)) == ["DEMO-4"]
+    assert _keys(a.search("dark mode colours", top_k=1)) == ["DEMO-3"]
+    assert IssueIndex(root, DIM).keys == ["DEMO-1", "DEMO-2", "DEMO-3", "DEMO-4"]
+
+
+def test_half_written_journal_line_is_dropped():
+    root = tempfile.mkdtemp(prefix="issue_index_test_")
+    a = IssueIndex(root, DIM)
+    a.add([_issue(1, "Login fails with SSO")])
+    a.add([_issue(2, "Export to CSV is slow")])
+    with open(a.journal_path, "ab") as f:
+        f.write(b'[2, "DEMO-3", "abc')  # a writer that crashed mid-line
+
+    b = IssueIndex(root, DIM)
+    assert b.keys == ["DEMO-1", "DEMO-2"]
+    assert b.add([_issue(3, "Dark mode colours wrong")]) == (1, 0)
+    reopened = IssueIndex(root, DIM)
+    assert reopened.keys == ["DEMO-1", "DEMO-2", "DEMO-3"]
+    assert _keys(reopened.search("dark mode colours", top_k=1)) == ["DEMO-3"]
+
+
+def test_compaction_is_picked_up_by_the_other_instance():
+    root = tempfile.mkdtemp(prefix="issue_index_test_")
+    a, b = IssueIndex(root, DIM), IssueIndex(root, DIM)
+    a.add([_issue(1)])
+    b.search("anything")
+    generation = a.generation
+    a.add([_issue(number) for number in range(2, 602)])
+    assert a.generation == generation
+    # Re-describing every issue takes the journal past both its floor (1000 lines) and the
+    # index size: index.json is rewritten and the journal dropped
+    a.add([_issue(number, description="new details") for number in range(1, 602)])
+    assert a.generation > generation
+    assert not os.path.exists(os.path.join(root, f"journal-{generation}.jsonl"))
+
+    b.search("anything")
+    assert b.keys == a.keys and b.digests == a.digests
+    assert np.array_equal(np.asarray(b._matrix), np.asarray(a._matrix))
+    b.add([_issue(5000, "Printing crashes the app")])
+    assert IssueIndex(root, DIM).keys[-1] == "DEMO-5000"
+
+
+def test_reopen_with_another_dim_rebuilds_without_shrinking_mapped_vectors():
+    root = tempfile.mkdtemp(prefix="issue_index_test_")
+    a = IssueIndex(root, DIM)
+    a.add([_issue(number) for number in range(1, 50)])
+    mapped = a._matrix
+    before = os.stat(a.vectors_path).st_ino
+
+    b = IssueIndex(root, DIM * 2)
+    assert b.keys == []
+    assert b.add([_issue(1, "Login fails with SSO")]) == (1, 0)
+    # The new vectors go to a new file; a's mapping of the old one stays readable
+    assert os.stat(b.vectors_path).st_ino != before
+    assert np.isfinite(np.asarray(mapped).sum())
+
+    assert IssueIndex(root, DIM * 2).keys == ["DEMO-1"]
+    assert a.search("login sso") == []  # a sees the index it can no longer read was rebuilt
+
+
+if __name__ == "__main__":
+    test_other_instance_replays_the_journal()
+    test_half_written_journal_line_is_dropped()
+    test_compaction_is_picked_up_by_the_other_instance()
+    test_reopen_with_another_dim_rebuilds_without_shrinking_mapped_vectors()
+    print("[OK] issue index tests passed")
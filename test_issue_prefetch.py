@@ -0,0 +1,52 @@
+"""
+Offline check that Jira search results are prefetched at the default result size.
+
+Runs the direct-API agent against the stand-in Atlassian server (FakeModel +
+fake_services), so no credentials or network are needed:
+    python -m pytest test_issue_prefetch.py      or      python test_issue_prefetch.py
+"""
+import os
+import tempfile
+
+from fake_services import FakeModel, start_fake_atlassian
+
+server, base_url = start_fake_atlassian()
+os.environ.update(
+    JIRA_URL=base_url, CONFLUENCE_URL=base_url, JIRA_USERNAME="user", JIRA_API_TOKEN="token",
+    CC_AGENT_CACHE_DIR=os.environ.get("CC_AGENT_CACHE_DIR") or tempfile.mkdtemp(prefix="cc_agent_test_"),
+    TOOL_MEMO="0", ISSUE_INDEX="0",
+)
+
+import cc_agent_api_direct  # noqa: E402  (reads JIRA_URL at import)
+import issue_prefetch  # noqa: E402
+
+
+def _search_turn(max_results=None):
+    """Run one turn that searches Jira, and return the prefetcher registered on its agent."""
+    arguments = {"jql": "project = DEMO ORDER BY created DESC"}
+    if max_results is not None:
+        arguments["max_results"] = max_results
+    prefetcher = issue_prefetch.IssuePrefetcher(cc_agent_api_direct.jira_get_issue, top_n=3)
+    agent = cc_agent_api_direct.create_agent(
+        model=FakeModel(tool_plan=lambda prompt: [("jira_search_issues", arguments)], latency=0.0),
+        hooks=[prefetcher],
+        callback_handler=None,
+    )
+    agent("search jira")
+    return prefetcher
+
+
+def test_prefetch_at_default_search_size():
+    # 50 issues are far beyond SPILL_THRESHOLD_CHARS: the prefetcher must see the result before it is spilled
+    assert _search_turn().prefetched == 3
+
+
+def test_prefetch_small_search():
+    assert _search_turn(max_results=10).prefetched == 3
+
+
+if __name__ == "__main__":
+    test_prefetch_at_default_search_size()
+    test_prefetch_small_search()
+    print("[OK] prefetch tests passed")
+    server.shutdown()
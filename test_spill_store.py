@@ -0,0 +1,43 @@
+"""
+Offline checks of read_spilled_result paging:
+    python -m pytest test_spill_store.py      or      python test_spill_store.py
+"""
+import json
+import os
+import re
+import tempfile
+
+os.environ["CC_AGENT_CACHE_DIR"] = os.environ.get("CC_AGENT_CACHE_DIR") or tempfile.mkdtemp(prefix="cc_agent_test_")
+
+import spill_store  # noqa: E402  (reads CC_AGENT_CACHE_DIR at import)
+
+
+def test_grep_pages_past_a_line_longer_than_limit():
+    # One-line JSON, the usual shape of MCP output: the only matching line is far longer than limit
+    text = json.dumps({"items": [{"id": i, "name": f"item {i}"} for i in range(2000)]})
+    handle = spill_store.from_env().put("mcp_tool", text)
+
+    page = spill_store.read_spilled_result(handle=handle, grep="id", limit=500)
+    assert "(line truncated; use offset/limit or path)" in page
+    assert page.startswith('1: {"items"')
+    assert "[1 matching lines; showing 1-1]" in page
+    assert len(page) < 700
+
+
+def test_grep_next_offset_advances():
+    text = "\n".join(["short match"] + ["x match " + "y" * 300] * 3 + ["other"])
+    handle = spill_store.from_env().put("tool", text)
+    offset, seen = 0, []
+    while offset is not None:
+        page = spill_store.read_spilled_result(handle=handle, grep="match", offset=offset, limit=100)
+        seen += [line.split(":", 1)[0] for line in page.splitlines() if re.match(r"\d+: ", line)]
+        next_offset = re.search(r"next: offset=(\d+)", page)
+        assert next_offset is None or int(next_offset.group(1)) > offset
+        offset = int(next_offset.group(1)) if next_offset else None
+    assert seen == ["1", "2", "3", "4"]
+
+
+if __name__ == "__main__":
+    test_grep_pages_past_a_line_longer_than_limit()
+    test_grep_next_offset_advances()
+    print("[OK] spill store tests passed")
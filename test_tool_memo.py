@@ -0,0 +1,94 @@
+"""
+Offline checks of ToolMemo: repeats answered from memory, TTL expiry and invalidation after writes.
+    python -m pytest test_tool_memo.py      or      python test_tool_memo.py
+"""
+import time
+
+from strands import Agent, tool
+
+from fake_services import FakeModel
+from tool_memo import ToolMemo
+
+calls = {"jira_search_issues": 0, "jira_get_issue": 0, "jira_aggregate": 0}
+
+
+@tool
+def jira_search_issues(jql: str) -> str:
+    """Stand-in Jira search that counts its calls."""
+    calls["jira_search_issues"] += 1
+    return f"search {calls['jira_search_issues']}"
+
+
+@tool
+def jira_get_issue(issue_key: str) -> str:
+    """Stand-in issue read that counts its calls."""
+    calls["jira_get_issue"] += 1
+    return f"issue {calls['jira_get_issue']}"
+
+
+@tool
+def jira_aggregate(jql: str, group_by: str = "status") -> str:
+    """Stand-in aggregate that counts its calls."""
+    calls["jira_aggregate"] += 1
+    return f"aggregate {calls['jira_aggregate']}"
+
+
+@tool
+def jira_add_comment(issue_key: str, comment: str) -> str:
+    """Stand-in comment write."""
+    return '{"success": true}'
+
+
+PLANS = {
+    "search": [("jira_search_issues", {"jql": "ORDER BY updated DESC"})],
+    "aggregate": [("jira_aggregate", {"jql": "project = DEMO", "group_by": "updated_week"})],
+    "read": [("jira_get_issue", {"issue_key": "DEMO-1"})],
+    "comment": [("jira_add_comment", {"issue_key": "DEMO-1", "comment": "done"})],
+}
+
+
+def _agent(memo):
+    calls.update({name: 0 for name in calls})
+    return Agent(
+        model=FakeModel(tool_plan=lambda prompt: PLANS[prompt], latency=0.0),
+        tools=[jira_search_issues, jira_get_issue, jira_aggregate, jira_add_comment],
+        hooks=[memo],
+        callback_handler=None,
+    )
+
+
+def test_repeat_is_answered_from_memory():
+    memo = ToolMemo()
+    agent = _agent(memo)
+    agent("search")
+    agent("search")
+    assert calls["jira_search_issues"] == 1
+    assert memo.hits == 1 and memo.misses == 1
+
+
+def test_entry_expires_after_its_ttl():
+    memo = ToolMemo({"jira_search_issues": "0.2"})
+    agent = _agent(memo)
+    agent("search")
+    time.sleep(0.3)
+    agent("search")
+    assert calls["jira_search_issues"] == 2
+
+
+def test_comment_invalidates_reads_of_the_changed_issue():
+    memo = ToolMemo()
+    agent = _agent(memo)
+    for prompt in ("search", "aggregate", "read"):
+        agent(prompt)
+    agent("comment")
+    for prompt in ("search", "aggregate", "read"):
+        agent(prompt)
+    assert calls == {"jira_search_issues": 2, "jira_get_issue": 2, "jira_aggregate": 2}
+    assert memo.invalidated == 3
+
+
+if __name__ == "__main__":
+    test_repeat_is_answered_from_memory()
+    test_entry_expires_after_its_ttl()
+    test_comment_invalidates_reads_of_the_changed_issue()
+    print("[OK] tool memo tests passed")
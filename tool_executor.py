@@ -0,0 +1,238 @@
+"""
+Concurrent tool execution for multi-tool model turns.
+
+When the model asks for several tools in one message, strands runs them
+through the agent's tool executor. This module configures that step:
+
+- OrderedConcurrentToolExecutor runs the tool uses concurrently and returns the
+  results to the model in the order the tools were requested
+- ToolConcurrencyLimiter (a hook provider) routes each call through
+  - a dedicated thread pool per tool class (atlassian, io, web, default), so
+    blocking `requests` tools of one class cannot starve the others
+  - an optional per-tool concurrency cap (e.g. generate_image=1)
+
+Configure from the environment with from_env():
+    TOOL_EXECUTION=concurrent            # concurrent | sequential
+    TOOL_POOL_SIZES=atlassian=8,io=4,web=4,default=4
+    TOOL_CAPS=generate_image=1,write_file=1
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from pydantic import BaseModel
+from strands.hooks import HookProvider, HookRegistry, BeforeToolCallEvent
+from strands.tools.decorator import DecoratedFunctionTool
+from strands.tools.executors import ConcurrentToolExecutor, SequentialToolExecutor
+from strands.types.tools import AgentTool
+
+
+DEFAULT_POOL_SIZES = {"atlassian": 8, "io": 4, "web": 4, "default": 4}
+DEFAULT_CAPS = {"generate_image": 1, "write_file": 1}
+WEB_TOOLS = {"http_request", "tavily_search"}
+IO_TOOLS = {"read_file", "write_file", "list_files"}
+
+
+def tool_class(tool_name):
+    """Classify a tool by the resource it blocks on."""
+    if tool_name.startswith(("jira_", "confluence_")):
+        return "atlassian"
+    if tool_name in IO_TOOLS:
+        return "io"
+    if tool_name in WEB_TOOLS or tool_name.startswith("tavily_"):
+        return "web"
+    return "default"
+
+
+def parse_pairs(value, convert=int):
+    """Parse "a=1,b=2" into {"a": 1, "b": 2}."""
+    pairs = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            name, number = item.split("=", 1)
+            pairs[name.strip()] = convert(number)
+    return pairs
+
+
+def tool_result(tool_use_id, value, status="success"):
+    """Format a plain return value the way strands formats @tool results."""
+    if isinstance(value, dict) and "status" in value and "content" in value:
+        return {**value, "toolUseId": tool_use_id}
+    if isinstance(value, str):
+        text = value
+    elif isinstance(value, BaseModel):
+        text = value.model_dump_json()
+    else:
+        text = json.dumps(value, default=str)
+    return {"toolUseId": tool_use_id, "status": status, "content": [{"text": text}]}
+
+
+async def run_tool(tool, tool_use, invocation_state, **kwargs):
+    """
+    Run any AgentTool to completion and return its final ToolResult.
+
+    Intermediate stream events are dropped; the last event (a ToolResult, or an
+    SDK event carrying one) is the result.
+    """
+    last = None
+    async for event in tool.stream(tool_use, invocation_state, **kwargs):
+        last = event
+    result = getattr(last, "tool_result", None) or last
+    if not isinstance(result, dict) or "content" not in result:
+        return tool_result(tool_use["toolUseId"], f"Tool '{tool_use['name']}' did not return a result", "error")
+    return result
+
+
+class ProxyTool(AgentTool):
+    """An AgentTool that forwards to another tool; subclasses override stream() to add behaviour."""
+
+    def __init__(self, delegate):
+        super().__init__()
+        self.delegate = delegate
+
+    @property
+    def tool_name(self):
+        return self.delegate.tool_name
+
+    @property
+    def tool_spec(self):
+        return self.delegate.tool_spec
+
+    @property
+    def tool_type(self):
+        return self.delegate.tool_type
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        yield await run_tool(self.delegate, tool_use, invocation_state, **kwargs)
+
+
+def _plain_sync_function(tool):
+    """Return the underlying function of a synchronous @tool without framework-injected parameters, else None."""
+    if not isinstance(tool, DecoratedFunctionTool):
+        return None
+    func = inspect.unwrap(tool)
+    if inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func):
+        return None
+    if {"agent", "tool_context"} & set(inspect.signature(func).parameters):
+        return None
+    return func
+
+
+class PooledTool(ProxyTool):
+    """Run a tool on its class's thread pool, under an optional per-tool concurrency cap."""
+
+    def __init__(self, delegate, pool, cap=None):
+        super().__init__(delegate)
+        self.pool = pool
+        self.cap = cap
+        self._func = _plain_sync_function(delegate)
+        self._semaphores = weakref.WeakKeyDictionary()  # one asyncio.Semaphore per event loop
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.cap)
+        return semaphore
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        if self.cap:
+            async with self._semaphore():
+                yield await self._run(tool_use, invocation_state, **kwargs)
+        else:
+            yield await self._run(tool_use, invocation_state, **kwargs)
+
+    async def _run(self, tool_use, invocation_state, **kwargs):
+        if self._func is None:
+            return await run_tool(self.delegate, tool_use, invocation_state, **kwargs)
+        tool_use_id = tool_use["toolUseId"]
+        try:
+            arguments = self.delegate._metadata.validate_input(tool_use.get("input") or {})
+            call = functools.partial(contextvars.copy_context().run, self._func, **arguments)
+            value = await asyncio.get_running_loop().run_in_executor(self.pool, call)
+            return tool_result(tool_use_id, value)
+        except ValueError as e:
+            return tool_result(tool_use_id, f"Error: {e}", "error")
+        except Exception as e:
+            return tool_result(tool_use_id, f"Error: {type(e).__name__} - {e}", "error")
+
+
+class ToolConcurrencyLimiter(HookProvider):
+    """
+    Swap each selected tool for a PooledTool bound to its class's thread pool.
+
+    Pools are created lazily and shared by every agent using the same limiter.
+
+    Args:
+        pool_sizes: Worker threads per tool class
+        caps: Maximum concurrent calls per tool name
+    """
+
+    def __init__(self, pool_sizes=None, caps=None):
+        self.pool_sizes = {**DEFAULT_POOL_SIZES, **(pool_sizes or {})}
+        self.caps = {**DEFAULT_CAPS, **(caps or {})}
+        self._pools = {}
+        self._proxies = {}
+        self._lock = threading.Lock()
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeToolCallEvent, self._route)
+
+    def pool(self, name):
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                size = self.pool_sizes.get(name, self.pool_sizes["default"])
+                pool = self._pools[name] = ThreadPoolExecutor(size, thread_name_prefix=f"tools-{name}")
+            return pool
+
+    def _route(self, event: BeforeToolCallEvent) -> None:
+        tool = event.selected_tool
+        if tool is None or isinstance(tool, PooledTool):
+            return
+        key = (tool.tool_name, id(tool))
+        proxy = self._proxies.get(key)
+        if proxy is None or proxy.delegate is not tool:
+            proxy = PooledTool(tool, self.pool(tool_class(tool.tool_name)), self.caps.get(tool.tool_name))
+            self._proxies[key] = proxy
+        event.selected_tool = proxy
+
+    def shutdown(self):
+        for pool in self._pools.values():
+            pool.shutdown(wait=False)
+
+
+class OrderedConcurrentToolExecutor(ConcurrentToolExecutor):
+    """Concurrent executor that hands results back in the order the model requested the tools."""
+
+    async def _execute(self, agent, tool_uses, tool_results, *args, **kwargs):
+        async for event in super()._execute(agent, tool_uses, tool_results, *args, **kwargs):
+            yield event
+        order = {tool_use["toolUseId"]: index for index, tool_use in enumerate(tool_uses)}
+        tool_results.sort(key=lambda result: order.get(result.get("toolUseId"), len(order)))
+
+
+_shared_limiter = None
+
+
+def from_env():
+    """
+    Build the executor and the (process-wide) concurrency limiter from TOOL_* settings.
+
+    Returns:
+        (tool_executor, limiter) - pass tool_executor=... and hooks=[limiter] to Agent
+    """
+    global _shared_limiter
+    mode = os.getenv("TOOL_EXECUTION", "concurrent").lower()
+    executor = SequentialToolExecutor() if mode == "sequential" else OrderedConcurrentToolExecutor()
+    if _shared_limiter is None:
+        _shared_limiter = ToolConcurrencyLimiter(
+            parse_pairs(os.getenv("TOOL_POOL_SIZES")), parse_pairs(os.getenv("TOOL_CAPS"))
+        )
+    return executor, _shared_limiter
@@ -0,0 +1,250 @@
+"""
+Conversation-scoped memoization of identical tool calls.
+
+The model often repeats a call with the same arguments within one conversation,
+e.g. list_files("."), confluence_list_spaces() or the same JQL. ToolMemo is a
+hook provider that remembers each agent's successful results, keyed on the
+tool name and its canonical arguments, and answers a repeat from memory
+instead of running the tool again.
+
+Each tool has a policy:
+    "pure"     the result only depends on the arguments; kept for the whole conversation
+    seconds    kept for that long (reads of data that others may change)
+    "never"    never memoized (writes, clocks, tools with their own cache)
+Tools without a policy are never memoized.
+
+A successful write invalidates the reads it can affect. For example,
+jira_update_issue drops the memoized jira_get_issue for the same issue_key and
+every memoized jira_search_issues. A write without a rule of its own (any
+never-memoized tool named like create/update/delete/...) drops every memoized
+result of tools that share its prefix (jira_, confluence_, ...).
+
+Configure with:
+    TOOL_MEMO=1                              (0 disables memoization)
+    TOOL_MEMO_POLICY=list_files=10,calculate=pure,read_file=never
+    TOOL_MEMO_MAX_ENTRIES=256                per conversation
+"""
+import json
+import os
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from strands.hooks import HookProvider, HookRegistry, BeforeToolCallEvent, AfterToolCallEvent
+
+from deadlines import timeout_reason
+from tool_executor import ProxyTool, parse_pairs, tool_result
+
+
+DEFAULT_POLICIES = {
+    "calculate": "pure",
+    "read_spilled_result": "pure",
+    "list_files": 30,
+    "read_file": 30,
+    "jira_search_issues": 60,
+    "jira_get_issue": 60,
+    "jira_aggregate": 60,
+    "confluence_search_content": 300,
+    "confluence_get_page": 300,
+    "confluence_get_page_sections": 300,
+    "confluence_list_spaces": 600,
+    # Writes
+    "jira_create_issue": "never",
+    "jira_update_issue": "never",
+    "jira_add_comment": "never",
+    "jira_bulk_update": "never",
+    "write_file": "never",
+    "jira_download_attachments": "never",
+    # Results that change on their own, or that have their own cache
+    "get_current_datetime": "never",
+    "image_job_status": "never",
+    "generate_image": "never",
+    "http_request": "never",
+    "tavily_search": "never",
+}
+
+# write tool -> [(read tool, argument that must match, or None for every call of that tool)]
+INVALIDATES = {
+    "jira_update_issue": [("jira_get_issue", "issue_key"), ("jira_search_issues", None), ("jira_aggregate", None)],
+    # A comment bumps the issue's updated field, which searches and aggregates can sort or group on
+    "jira_add_comment": [("jira_get_issue", "issue_key"), ("jira_search_issues", None), ("jira_aggregate", None)],
+    "jira_create_issue": [("jira_search_issues", None), ("jira_aggregate", None)],
+    "jira_bulk_update": [("jira_get_issue", None), ("jira_search_issues", None), ("jira_aggregate", None)],
+    "write_file": [("read_file", "filename"), ("list_files", None)],
+    "jira_download_attachments": [("read_file", None), ("list_files", None)],
+}
+
+WRITE_NAME = re.compile(r"(^|_)(create|update|add|delete|remove|transition|write|edit|move|assign|link|upload)(_|$)")
+
+
+def parse_policy(value):
+    """Turn "pure", "never" or a number of seconds into a policy (None for never)."""
+    value = str(value).strip().lower()
+    if value == "pure":
+        return "pure"
+    if value in ("never", "", "0"):
+        return None
+    return float(value)
+
+
+def call_key(tool_name, tool_input):
+    """Canonical key of a call: the tool name plus its arguments with sorted keys."""
+    return tool_name + ":" + json.dumps(tool_input or {}, sort_keys=True, default=str)
+
+
+def _same(a, b):
+    return str(a).strip().casefold() == str(b).strip().casefold()
+
+
+class MemoHit(ProxyTool):
+    """Answer a call with the memoized result of an identical earlier call."""
+
+    def __init__(self, delegate, result):
+        super().__init__(delegate)
+        self.result = result
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        yield tool_result(tool_use["toolUseId"], self.result)
+
+
+class ToolMemo(HookProvider):
+    """
+    Memoize identical tool calls per agent (one agent is one conversation).
+
+    Register it after the concurrency limiter, prefetcher and turn budget, so a
+    hit replaces whatever tool they selected.
+
+    Args:
+        policies: {tool name: "pure" | "never" | seconds}, on top of DEFAULT_POLICIES
+        max_entries: Results kept per conversation; the least recently used go first
+    """
+
+    def __init__(self, policies=None, max_entries=256):
+        self.policies = {name: parse_policy(value) for name, value in {**DEFAULT_POLICIES, **(policies or {})}.items()}
+        self.max_entries = max_entries
+        self._memos = weakref.WeakKeyDictionary()  # agent -> OrderedDict(call key -> entry)
+        self._served = set()  # toolUseIds answered from memory in the running turn
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeToolCallEvent, self._lookup)
+        registry.add_callback(AfterToolCallEvent, self._record)
+
+    def _memo(self, agent):
+        memo = self._memos.get(agent)
+        if memo is None:
+            memo = self._memos[agent] = OrderedDict()
+        return memo
+
+    def _lookup(self, event: BeforeToolCallEvent) -> None:
+        name = event.tool_use.get("name")
+        if self.policies.get(name) is None or event.selected_tool is None:
+            return
+        key = call_key(name, event.tool_use.get("input"))
+        with self._lock:
+            memo = self._memo(event.agent)
+            entry = memo.get(key)
+            if entry is not None and entry["expires"] is not None and entry["expires"] <= time.monotonic():
+                del memo[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return
+            memo.move_to_end(key)
+            self.hits += 1
+            self._served.add(event.tool_use["toolUseId"])
+        event.selected_tool = MemoHit(event.selected_tool, entry["result"])
+
+    def _record(self, event: AfterToolCallEvent) -> None:
+        name = event.tool_use.get("name")
+        tool_use_id = event.tool_use.get("toolUseId")
+        with self._lock:
+            if tool_use_id in self._served:
+                self._served.discard(tool_use_id)
+                return
+        result = event.result
+        if not result or result.get("status") != "success" or timeout_reason(result):
+            return
+        policy = self.policies.get(name)
+        if policy is None:
+            self.invalidate_after(event.agent, name, event.tool_use.get("input") or {})
+            return
+        with self._lock:
+            memo = self._memo(event.agent)
+            memo[call_key(name, event.tool_use.get("input"))] = {
+                "tool": name,
+                "input": event.tool_use.get("input") or {},
+                "result": result,
+                "expires": None if policy == "pure" else time.monotonic() + policy,
+            }
+            while len(memo) > self.max_entries:
+                memo.popitem(last=False)
+
+    def invalidate_after(self, agent, tool_name, tool_input):
+        """Drop the memoized reads a successful call of a write tool can have changed."""
+        rules = INVALIDATES.get(tool_name)
+        if rules is None:
+            if not WRITE_NAME.search(tool_name):
+                return
+            prefix = tool_name.split("_", 1)[0] + "_"
+            rules = [(name, None) for name in self.policies if name.startswith(prefix)]
+        with self._lock:
+            memo = self._memos.get(agent)
+            if not memo:
+                return
+            for key, entry in list(memo.items()):
+                for read_tool, argument in rules:
+                    if entry["tool"] != read_tool:
+                        continue
+                    if argument is None or _same(entry["input"].get(argument, ""), tool_input.get(argument, "")):
+                        del memo[key]
+                        self.invalidated += 1
+                        break
+
+    def results(self, agent):
+        """The results memoized for one conversation, oldest first."""
+        with self._lock:
+            return [entry["result"] for entry in self._memos.get(agent, {}).values()]
+
+    def clear(self, agent):
+        """Forget everything memoized for one conversation."""
+        with self._lock:
+            self._memos.pop(agent, None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "invalidated": self.invalidated,
+            "conversations": len(self._memos),
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        return (
+            f"[INFO] Tool memo: {stats['hits']} repeated calls answered from memory, {stats['misses']} run, "
+            f"{stats['invalidated']} invalidated by writes"
+        )
+
+
+_shared_memo = None
+
+
+def from_env():
+    """Return the process-wide ToolMemo, or None when TOOL_MEMO=0."""
+    global _shared_memo
+    if os.getenv("TOOL_MEMO", "1").lower() in ("0", "false", "off", "no"):
+        return None
+    if _shared_memo is None:
+        _shared_memo = ToolMemo(
+            parse_pairs(os.getenv("TOOL_MEMO_POLICY"), convert=str),
+            max_entries=int(os.getenv("TOOL_MEMO_MAX_ENTRIES", "256")),
+        )
+    return _shared_memo
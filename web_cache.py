@@ -0,0 +1,351 @@
+"""
+Local HTTP response cache for the http_request and tavily_search tools.
+
+Both tools are wrapped so identical requests within a session and across
+sessions are answered from disk:
+
+- http_request: plain GETs (no body, cookies or signed auth) are fetched here
+  and cached following HTTP rules. Fresh entries (Cache-Control max-age,
+  Expires, or a Last-Modified heuristic) are served without a request; stale
+  ones are revalidated with If-None-Match / If-Modified-Since and a 304 reuses
+  the stored body. Everything else goes to the original tool uncached.
+- tavily_search: successful results are kept for WEB_CACHE_SEARCH_TTL seconds,
+  keyed on the normalized query and search options.
+
+Bodies live in a content_store.ContentStore (content-addressed, LRU-bounded to
+WEB_CACHE_MAX_MB), and concurrent identical requests share one fetch.
+
+Configure with:
+    WEB_CACHE=on               # on | off
+    WEB_CACHE_MAX_MB=256
+    WEB_CACHE_SEARCH_TTL=3600
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from strands.tools.tools import PythonAgentTool
+
+import deadlines
+from content_store import CACHE_DIR, ContentStore, SingleFlight
+from tool_executor import ProxyTool, run_tool, tool_result
+
+
+# Headers http_request copies into its result text
+RESULT_HEADERS = {"content-type", "content-length", "date", "server", "payment-required"}
+
+# auth_type values that only add request headers (so the request stays cacheable)
+HEADER_AUTH_TYPES = {None, "Bearer", "token", "custom", "api_key"}
+
+# Longest freshness granted from the Last-Modified heuristic
+HEURISTIC_MAX_S = 24 * 3600
+
+REQUEST_TIMEOUT = 30
+
+
+def parse_cache_control(value):
+    """Parse a Cache-Control header into {directive: value or True}."""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else True
+    return directives
+
+
+def _http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers, now):
+    """
+    Seconds a response may be served without revalidation (RFC 9111, private cache).
+
+    Returns:
+        Lifetime in seconds, or None when the response must not be stored
+    """
+    directives = parse_cache_control(headers.get("Cache-Control"))
+    if "no-store" in directives or headers.get("Vary", "").strip() == "*":
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    age = float(headers.get("Age", 0) or 0)
+    if "max-age" in directives:
+        try:
+            return max(0.0, float(directives["max-age"]) - age)
+        except ValueError:
+            return 0.0
+    date = _http_date(headers.get("Date")) or now
+    expires = _http_date(headers.get("Expires"))
+    if headers.get("Expires") is not None:
+        return max(0.0, (expires or 0) - date)
+    last_modified = _http_date(headers.get("Last-Modified"))
+    if last_modified:
+        return min(HEURISTIC_MAX_S, max(0.0, (date - last_modified) * 0.1))
+    return 0.0
+
+
+class WebCache:
+    """
+    Disk cache shared by the wrapped http_request and tavily_search tools.
+
+    Args:
+        store: ContentStore holding the bodies
+        search_ttl: Seconds a search result is reused
+    """
+
+    def __init__(self, store, search_ttl=3600):
+        self.store = store
+        self.search_ttl = search_ttl
+        self.flight = SingleFlight()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def key(kind, material):
+        return f"{kind}:" + hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _served(self, entry, how):
+        self.hits += 1
+        self.bytes_saved += entry.size
+        if how == "revalidated":
+            self.revalidated += 1
+        return {**entry.meta, "body": self.store.read(entry), "cache": how}
+
+    def fetch(self, url, headers=None, verify=True, timeout=None):
+        """
+        GET a URL through the cache.
+
+        Args:
+            url: Request URL
+            headers: Request headers (part of the cache key)
+            verify: TLS verification flag passed to requests
+            timeout: Socket timeout; defaults to the current tool deadline or 30s
+
+        Returns:
+            Dict with status, headers, url, history, body (bytes) and cache
+            ("hit", "revalidated", "miss" or "bypass")
+        """
+        headers = dict(headers or {})
+        request_directives = parse_cache_control(headers.get("Cache-Control") or headers.get("cache-control"))
+        if "no-store" in request_directives:
+            self.misses += 1
+            return self._get(url, headers, verify, timeout, "bypass")
+        key = self.key("http", ["GET", url, sorted((k.lower(), v) for k, v in headers.items()), verify])
+        return self.flight.do(key, lambda: self._fetch(key, url, headers, verify, timeout, request_directives))
+
+    def _get(self, url, headers, verify, timeout, how):
+        response = self.session.get(
+            url, headers=headers, verify=verify, timeout=timeout or deadlines.remaining(REQUEST_TIMEOUT)
+        )
+        return {
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "url": response.url,
+            "history": [r.status_code for r in response.history],
+            "body": response.content,
+            "cache": how,
+            "_response": response,
+        }
+
+    def _fetch(self, key, url, headers, verify, timeout, request_directives):
+        now = time.time()
+        entry = self.store.get(key)
+        if entry and entry.fresh(now) and "no-cache" not in request_directives:
+            return self._served(entry, "hit")
+
+        conditional = dict(headers)
+        if entry and entry.meta.get("etag"):
+            conditional["If-None-Match"] = entry.meta["etag"]
+        if entry and entry.meta.get("last_modified"):
+            conditional["If-Modified-Since"] = entry.meta["last_modified"]
+        fetched = self._get(url, conditional, verify, timeout, "miss")
+        response = fetched.pop("_response")
+
+        if entry and response.status_code == 304:
+            merged = {**entry.meta["headers"], **fetched["headers"]}
+            lifetime = freshness_lifetime(merged, now)
+            self.store.update(key, {**entry.meta, "headers": merged}, now + (lifetime or 0.0))
+            return self._served(entry, "revalidated")
+
+        self.misses += 1
+        lifetime = freshness_lifetime(response.headers, now) if response.status_code == 200 else None
+        validators = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        if lifetime is not None and (lifetime > 0 or validators):
+            meta = {
+                "status": fetched["status"],
+                "headers": fetched["headers"],
+                "url": fetched["url"],
+                "history": fetched["history"],
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            self.store.put(key, response.content, meta, now + lifetime)
+        return fetched
+
+    async def search(self, tool_name, arguments, run):
+        """
+        Return a cached search result, or await run() and cache a successful result.
+
+        Args:
+            tool_name: Name of the search tool
+            arguments: Tool input (the cache key, with the query normalized)
+            run: Coroutine function performing the search; returns a ToolResult
+
+        Returns:
+            (ToolResult, cache) where cache is "hit" or "miss"
+        """
+        arguments = dict(arguments)
+        arguments["query"] = " ".join(str(arguments.get("query", "")).lower().split())
+        key = self.key(tool_name, arguments)
+        entry = self.store.get(key)
+        if entry and entry.fresh():
+            served = self._served(entry, "hit")
+            return {"status": "success", "content": json.loads(served["body"])}, "hit"
+
+        async def fill():
+            result = await run()
+            self.misses += 1
+            if result.get("status") == "success":
+                self.store.put(key, json.dumps(result["content"]), {"tool": tool_name}, time.time() + self.search_ttl)
+            return result
+
+        return await self.flight.do_async(key, fill), "miss"
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            **self.store.stats(),
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "coalesced": self.flight.shared,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        return (
+            f"[web cache] hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits, {stats['revalidated']} revalidated, "
+            f"{stats['misses']} misses, {stats['coalesced']} coalesced), {stats['bytes_saved'] / 1024:.1f} KB saved"
+        )
+
+
+def _cacheable_get(tool_input):
+    """Return (url, headers, verify) for an http_request input this cache can serve, else None."""
+    if str(tool_input.get("method", "GET")).upper() != "GET":
+        return None
+    if tool_input.get("auth_type") not in HEADER_AUTH_TYPES:
+        return None
+    if any(tool_input.get(name) for name in ("body", "cookie", "cookie_jar", "session_config", "metrics")):
+        return None
+    if tool_input.get("allow_redirects") is False or tool_input.get("verify_ssl") is False:
+        return None
+    from strands_tools.http_request import process_auth_headers
+
+    headers = tool_input.get("headers") or {}
+    if isinstance(headers, str):
+        headers = json.loads(headers)
+    return tool_input["url"], process_auth_headers(dict(headers), tool_input), True
+
+
+class CachedHttpRequest(ProxyTool):
+    """http_request with plain GETs answered through a WebCache."""
+
+    def __init__(self, delegate, cache):
+        super().__init__(delegate)
+        self.cache = cache
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        try:
+            request = _cacheable_get(tool_use.get("input") or {})
+        except ValueError as e:
+            yield tool_result(tool_use["toolUseId"], f"Error: {e}", "error")
+            return
+        if request is None:
+            yield await run_tool(self.delegate, tool_use, invocation_state, **kwargs)
+            return
+        yield await asyncio.to_thread(self._fetch, tool_use, *request)
+
+    def _fetch(self, tool_use, url, headers, verify):
+        try:
+            response = self.cache.fetch(url, headers, verify)
+            content = response["body"].decode("utf-8", errors="replace")
+            if (tool_use.get("input") or {}).get("convert_to_markdown"):
+                from strands_tools.http_request import extract_content_from_html
+
+                if "html" in response["headers"].get("Content-Type", "").lower() or "<html" in content[:100].lower():
+                    content = extract_content_from_html(content)
+            lines = [f"Status Code: {response['status']}"]
+            if response["history"]:
+                chain = " -> ".join(str(code) for code in response["history"] + [response["status"]])
+                lines.append(f"Redirects: {len(response['history'])} redirects followed ({chain})")
+            headers_text = {k: v for k, v in response["headers"].items() if k.lower() in RESULT_HEADERS}
+            lines.append(f"Headers: {headers_text}")
+            lines.append(f"Body: {content}")
+            if response["cache"] in ("hit", "revalidated"):
+                lines.append(f"Cache: {response['cache']}")
+            return {"toolUseId": tool_use["toolUseId"], "status": "success", "content": [{"text": t} for t in lines]}
+        except Exception as e:
+            return tool_result(tool_use["toolUseId"], f"Error: {e}", "error")
+
+
+class CachedSearch(ProxyTool):
+    """A search tool whose successful results are reused for the cache's search TTL."""
+
+    def __init__(self, delegate, cache):
+        super().__init__(delegate)
+        self.cache = cache
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        async def run():
+            return await run_tool(self.delegate, tool_use, invocation_state, **kwargs)
+
+        result, _ = await self.cache.search(self.tool_name, tool_use.get("input") or {}, run)
+        yield {**result, "toolUseId": tool_use["toolUseId"]}
+
+
+_shared_cache = None
+
+
+def from_env():
+    """Return the process-wide WebCache, or None when WEB_CACHE=off."""
+    global _shared_cache
+    if os.getenv("WEB_CACHE", "on").lower() in ("0", "off", "false", "no"):
+        return None
+    if _shared_cache is None:
+        _shared_cache = WebCache(
+            ContentStore(os.path.join(CACHE_DIR, "web"), int(float(os.getenv("WEB_CACHE_MAX_MB", "256")) * 1024 * 1024)),
+            search_ttl=float(os.getenv("WEB_CACHE_SEARCH_TTL", "3600")),
+        )
+    return _shared_cache
+
+
+def cached_http_request(http_request_module):
+    """Wrap the strands_tools http_request module tool with the shared cache (unchanged when disabled)."""
+    cache = from_env()
+    if cache is None:
+        return http_request_module
+    tool = PythonAgentTool("http_request", http_request_module.TOOL_SPEC, http_request_module.http_request)
+    return CachedHttpRequest(tool, cache)
+
+
+def cached_search(search_tool):
+    """Wrap a search tool (e.g. tavily_search) with the shared cache (unchanged when disabled)."""
+    cache = from_env()
+    return search_tool if cache is None else CachedSearch(search_tool, cache)